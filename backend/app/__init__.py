@@ -1,4 +1,5 @@
 # app/__init__.py
+import os
 from flask import Flask
 from flask_cors import CORS
 
@@ -16,9 +17,19 @@ def create_app(testing=False):
     if testing:
         app.config['TESTING'] = True
         # Add any test-specific configuration
+    elif os.getenv('CLAUDE_API_KEY'):
+        # Open connections on the shared loop before the first game needs them
+        from app.strategies.haiku_strategy import DEFAULT_MODEL
+        from app.utils.client_pool import warm_client_pool
+        from app.utils.event_loop import get_event_loop_thread
+        get_event_loop_thread().submit(warm_client_pool(os.getenv('CLAUDE_API_KEY'), [DEFAULT_MODEL]))
     
     # Import and register routes
     from app.api.routes import bp as api_bp
     app.register_blueprint(api_bp)
+
+    # Pick up jobs queued before a restart (only when JOB_STORE_PATH persists them)
+    from app.utils.jobs import get_job_executor
+    get_job_executor().resume()
     
     return app
\ No newline at end of file
@@ -1,30 +1,81 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from flask_cors import CORS
 import asyncio
-from typing import Dict
+import concurrent.futures
+import json
+import os
+import threading
+from contextlib import ExitStack
+from typing import Dict, Optional
 from uuid import uuid4
 
 # Import our custom classes
 from app.models.game import Game
 from app.strategies import StrategyType, create_strategy, get_available_strategies
-from app.utils.storage import GameStorage
+from app.utils.storage import GameBusyError, create_game_storage
 from app.utils.history import GameHistory
 from app.strategies.ai_strategy import AIStrategy
+from app.utils.event_loop import get_event_loop_thread
+from app.utils.llm_scheduler import Priority, work_class
+from app.utils.rate_limiter import get_rate_limiter
+from app.utils.jobs import Job, JobStatus, get_job_executor
+from app.utils.bulk_games import BulkGameRunner, parse_game_specs
 
 bp = Blueprint('api', __name__, url_prefix='/api')
 
+# Start each AI player's next move as soon as the previous round is scored
+PREFETCH_AI_MOVES = os.getenv('PREFETCH_AI_MOVES', 'true').lower() == 'true'
+
+# Save games evicted from active storage (abandoned or over capacity) to history
+SPILL_EVICTED_GAMES = os.getenv('SPILL_EVICTED_GAMES', 'true').lower() == 'true'
+
+def evict_game(game_id: str, game: Game, reason: str):
+    """Stop an evicted game's background work and keep what was played"""
+    get_event_loop_thread().call_soon(game.cancel_prefetch)
+    if SPILL_EVICTED_GAMES and game.rounds:
+        game_history.save_game(game_id, game, evicted=True)
+    print(f"Evicted game {game_id} ({reason}) after {len(game.rounds)} rounds")
+
 # Initialize storage
-game_storage = GameStorage()
 game_history = GameHistory()
+game_storage = create_game_storage(on_evict=evict_game)
 
-# Helper function to run async code in sync routes
-def run_async(coro):
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
+# Unfinished background completion job per game. While one is queued or
+# running, requests that would play the game get a 409
+completion_jobs: Dict[str, str] = {}
+completion_jobs_lock = threading.Lock()
+
+def pending_completion_job(game_id: str) -> Optional[str]:
+    """Id of the game's unfinished background completion job, if it has one"""
+    job_id = completion_jobs.get(game_id)
+    if job_id is None:
+        return None
+    job = get_job_executor().get(job_id)
+    if job is None or job.finished:
+        completion_jobs.pop(game_id, None)
+        return None
+    return job_id
+
+def game_busy_response(job_id: Optional[str] = None):
+    response = {"error": "Game is already being played"}
+    if job_id:
+        response["job_id"] = job_id
+    return jsonify(response), 409
+
+# How often a round stream sends a comment while waiting on a round. Writing is
+# the only way to notice the client has gone, so this bounds how long abandoned
+# LLM calls keep running
+SSE_HEARTBEAT_SECONDS = 5.0
+
+# How long POST /games/batch waits for runs that need no LLM calls before
+# answering with just the batch id
+BULK_SYNC_WAIT_SECONDS = float(os.getenv('BULK_SYNC_WAIT_SECONDS', 30))
+
+# Views are sync; anything async runs on the process-wide event loop thread, so
+# every game shares one loop and one pooled client per model. A request's worker
+# thread only waits on the result.
+def run_on_loop(coro):
+    return get_event_loop_thread().run(coro)
 
 # Error handlers
 @bp.errorhandler(404)
@@ -55,6 +106,20 @@ def get_strategies():
         ]
     })
 
+@bp.route('/storage/stats', methods=['GET'])
+def get_storage_stats():
+    """Gauges for active games held in memory"""
+    return jsonify(game_storage.stats())
+
+@bp.route('/llm/stats', methods=['GET'])
+def get_llm_stats():
+    """Shared LLM capacity: rate limiter state and queue waits per priority class and experiment"""
+    rate_limiter = get_rate_limiter()
+    return jsonify({
+        "rate_limiter": rate_limiter.stats(),
+        "flows": rate_limiter.flow_stats()
+    })
+
 @bp.route('/game/new', methods=['POST'])
 def create_game():
     """Create a new game with two specified strategies"""
@@ -76,8 +141,14 @@ def create_game():
         
         # Create and store new game
         game_id, game = game_storage.create_game(strategy1, strategy2, max_rounds=rounds)
+        if PREFETCH_AI_MOVES and game.has_ai_player:
+            # Prefetched requests must outlive this request, so they run on the shared loop
+            game.prefetch = True
+            # The callback, and the tasks it starts, run in this context
+            with work_class(Priority.INTERACTIVE):
+                get_event_loop_thread().call_soon(game.prefetch_moves)
 
-        print(f"Created game {game_id}, stored in game_storage:", game_storage.active_games)
+        print(f"Created game {game_id}, {len(game_storage)} games in game_storage")
  
         return jsonify({
             "game_id": game_id,
@@ -113,44 +184,75 @@ def get_game_state(game_id: str):
         }
     })
 
+async def play_round(game: Game):
+    """Process one round and wait for its streamed reasoning, so the response includes it"""
+    # A user is waiting, so these requests go ahead of batch experiments
+    with work_class(Priority.INTERACTIVE):
+        result = await game.process_round()
+        if result:
+            await game.drain_reasoning()
+        return result
+
+async def play_remaining_rounds(game: Game):
+    """Run the rest of a game ahead of batch experiments"""
+    with work_class(Priority.INTERACTIVE):
+        return await game.run_all_rounds()
+
+def round_response(game: Game, result) -> Dict:
+    """A scored round, as returned by /move and streamed by /complete/stream"""
+    response = {
+        "round_number": result.round_number,
+        "player1_move": result.player1_move.value,
+        "player2_move": result.player2_move.value,
+        "player1_score": result.player1_score,
+        "player2_score": result.player2_score,
+        "game_over": game.is_game_over(),
+        "scores": {
+            "player1": result.cumulative_player1_score,
+            "player2": result.cumulative_player2_score
+        },
+        # Add reasoning
+        "reasoning": {
+            "player1": result.player1_reasoning,
+            "player2": result.player2_reasoning
+        }
+    }
+
+    # Add token usage if present
+    if result.token_usage:
+        response["token_usage"] = {
+            "prompt_tokens": result.token_usage.prompt_tokens,
+            "completion_tokens": result.token_usage.completion_tokens,
+            "total_tokens": result.token_usage.total_tokens
+        }
+    return response
+
+def sse_event(event: str, data: Dict, event_id=None) -> str:
+    """Format one Server-Sent Event"""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
 @bp.route('/game/<game_id>/move', methods=['POST'])
-async def make_move(game_id: str):
+def make_move(game_id: str):
     """Process a round in the specified game"""
-    game = game_storage.get_game(game_id)
-    if not game:
-        return jsonify({"error": "Game not found"}), 404
-    
+    job_id = pending_completion_job(game_id)
+    if job_id:
+        return game_busy_response(job_id)
+
     try:
-        # Process the round - moves come from strategies
-        result = await game.process_round()
+        # Process the round - moves come from strategies. It runs on the shared
+        # loop, where the moves may already have been prefetched
+        with game_storage.in_use(game_id) as game:
+            if not game:
+                return jsonify({"error": "Game not found"}), 404
+            result = run_on_loop(play_round(game))
         if not result:
             return jsonify({"error": "Failed to process round"}), 500
         
-        response = {
-            "round_number": result.round_number,
-            "player1_move": result.player1_move.value,
-            "player2_move": result.player2_move.value,
-            "player1_score": result.player1_score,
-            "player2_score": result.player2_score,
-            "game_over": game.is_game_over(),
-            "scores": {
-                "player1": game.player1_total_score,
-                "player2": game.player2_total_score
-            },
-            # Add reasoning
-            "reasoning": {
-                "player1": result.player1_reasoning,
-                "player2": result.player2_reasoning
-            }
-        }
-
-        # Add token usage if present
-        if result.token_usage:
-            response["token_usage"] = {
-                "prompt_tokens": result.token_usage.prompt_tokens,
-                "completion_tokens": result.token_usage.completion_tokens,
-                "total_tokens": result.token_usage.total_tokens
-            }
+        response = round_response(game, result)
 
         # Check if game is over
         if game.is_game_over():
@@ -160,13 +262,15 @@ async def make_move(game_id: str):
             
         return jsonify(response)
         
+    except GameBusyError:
+        return game_busy_response(pending_completion_job(game_id))
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
       
 @bp.route('/game/<game_id>/history', methods=['GET'])
-async def get_game_history(game_id: str):
+def get_game_history(game_id: str):
     """Get full history of specified game"""
     # First check active games
     game = game_storage.get_game(game_id)
@@ -222,59 +326,208 @@ async def get_game_history(game_id: str):
             "is_active": False,
             "rounds": completed_game["rounds"],
             "final_scores": completed_game["final_scores"],
-            "ai_info": completed_game.get("ai_info", {})
+            "ai_info": completed_game.get("ai_info", {}),
+            # Set for games dropped from active storage before they finished
+            "evicted": completed_game.get("evicted", False)
         })
         
     return jsonify({"error": "Game not found"}), 404
 
+def completed_game_response(game: Game, round_results) -> Dict:
+    """The rounds just played and the final scores, as returned by /complete"""
+    # Format rounds with AI information
+    formatted_rounds = [
+        {
+            "round_number": r.round_number,
+            "player1_move": r.player1_move.value,
+            "player2_move": r.player2_move.value,
+            "player1_reasoning": r.player1_reasoning,
+            "player2_reasoning": r.player2_reasoning,
+            "player1_score": r.player1_score,
+            "player2_score": r.player2_score,
+            "token_usage": {
+                "prompt_tokens": r.token_usage.prompt_tokens,
+                "completion_tokens": r.token_usage.completion_tokens,
+                "total_tokens": r.token_usage.total_tokens
+            } if r.token_usage else None
+        }
+        for r in round_results
+    ]
+
+    # Add AI information for final response
+    response = {
+        "rounds": formatted_rounds,
+        "final_scores": {
+            "player1": game.player1_total_score,
+            "player2": game.player2_total_score
+        }
+    }
+
+    # Add AI info if present
+    if game.has_ai_player:
+        response["ai_info"] = {
+            "player1_model": game.player1_model,
+            "player2_model": game.player2_model,
+            "has_ai_player": True
+        }
+    return response
+
+async def complete_game_job(job: Job) -> Dict:
+    """Job handler: play out an active game, reporting progress round by round"""
+    game_id = job.params["game_id"]
+    round_results = []
+    with game_storage.in_use(game_id) as game:
+        if not game:
+            # Active games live in memory, so they don't survive a restart
+            raise ValueError(f"Game {game_id} not found")
+        if game.is_game_over():
+            raise ValueError("Game is already complete")
+
+        game.prefetch = False
+        try:
+            while not game.is_game_over():
+                result = await game.process_round()
+                if not result:
+                    raise ValueError("Failed to process round")
+                round_results.append(result)
+                job.update_progress(rounds=1, tokens=result.token_usage.total_tokens if result.token_usage else 0)
+            await game.drain_reasoning()
+        finally:
+            game.cancel_prefetch()
+
+    response = completed_game_response(game, round_results)
+    await asyncio.to_thread(game_history.save_game, game_id, game)
+    game_storage.remove_game(game_id)
+    with completion_jobs_lock:
+        if completion_jobs.get(game_id) == job.job_id:
+            del completion_jobs[game_id]
+    return response
+
+# A user's game, even when they aren't waiting on the request
+get_job_executor().register("complete_game", complete_game_job, Priority.INTERACTIVE)
+
+async def game_batch_job(job: Job) -> Dict:
+    """Job handler: play every game of a bulk request"""
+    runner = BulkGameRunner(parse_game_specs(job.params), seed=job.params.get("seed"))
+    runner.set_progress_callback(lambda rounds, tokens: job.update_progress(rounds=rounds, tokens=tokens))
+    return await runner.run()
+
+get_job_executor().register("game_batch", game_batch_job, Priority.BATCH)
+
+@bp.route('/games/batch', methods=['POST'])
+def create_game_batch():
+    """
+    Run many games server-side from a list of specs
+
+    Body: {"games": [{player1Strategy, player2Strategy, rounds, matrix}, ...],
+    "repeat": n, "seed": optional, "wait": optional}. Runs without an AI
+    player finish in milliseconds on the vectorized engine, so by default
+    the response waits for them and includes the aggregate statistics;
+    otherwise it returns the batch id to poll at /games/batch/<id>.
+    """
+    data = request.get_json(silent=True) or {}
+    specs = parse_game_specs(data)
+    params = {"games": data["games"], "repeat": int(data.get("repeat", 1)), "seed": data.get("seed")}
+
+    executor = get_job_executor()
+    job = executor.submit("game_batch", params, rounds_total=sum(spec.repeat * spec.rounds for spec in specs))
+    if data.get('wait', all(spec.vectorized for spec in specs)):
+        job = executor.wait(job.job_id, timeout=BULK_SYNC_WAIT_SECONDS)
+
+    response = {"batch_id": job.job_id, "status": job.status.value, "details_url": f"/api/games/batch/{job.job_id}"}
+    if job.status == JobStatus.SUCCEEDED:
+        response["summary"] = job.result["summary"]
+        return jsonify(response)
+    if job.status == JobStatus.CANCELLED:
+        # Someone cancelled it while we waited; not a server error
+        return jsonify(response), 409
+    if job.status == JobStatus.FAILED:
+        response["error"] = job.error
+        return jsonify(response), 500
+    return jsonify(response), 202
+
+@bp.route('/games/batch/<batch_id>', methods=['GET'])
+def get_game_batch(batch_id: str):
+    """Progress of a bulk run and, once it has finished, its statistics and per-game results"""
+    job = get_job_executor().get(batch_id)
+    if not job or job.kind != "game_batch":
+        return jsonify({"error": "Batch not found"}), 404
+    response = {
+        "batch_id": batch_id,
+        "status": job.status.value,
+        "progress": {
+            "rounds_done": job.rounds_done,
+            "rounds_total": job.rounds_total,
+            "tokens_used": job.tokens_used
+        }
+    }
+    if job.result is not None:
+        response.update(job.result)
+    if job.error:
+        response["error"] = job.error
+    return jsonify(response)
+
+@bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id: str):
+    """Status, progress and (once finished) result of a background job"""
+    job = get_job_executor().get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+@bp.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id: str):
+    """Cancel a queued or running job"""
+    executor = get_job_executor()
+    job = executor.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    if not executor.cancel(job_id):
+        return jsonify({"error": f"Job already {job.status.value}"}), 400
+    return jsonify({"job_id": job_id, "status": "cancelling"})
+
 @bp.route('/game/<game_id>/complete', methods=['POST'])
-async def complete_game(game_id: str):
-    """Auto-complete all remaining rounds in the game"""
+def complete_game(game_id: str):
+    """
+    Auto-complete all remaining rounds in the game
+
+    With {"background": true} the game is played by the job executor instead
+    and the response is a job id to poll at /jobs/<id>.
+    """
     game = game_storage.get_game(game_id)
     if not game:
         return jsonify({"error": "Game not found"}), 404
-        
+
+    data = request.get_json(silent=True) or {}
+    if data.get('background') or request.args.get('background', '').lower() in ('1', 'true'):
+        if game.is_game_over():
+            return jsonify({"error": "Game is already complete"}), 400
+        with completion_jobs_lock:
+            job_id = pending_completion_job(game_id)
+            if job_id:
+                return game_busy_response(job_id)
+            job = get_job_executor().submit(
+                "complete_game", {"game_id": game_id}, rounds_total=game.max_rounds - game.current_round
+            )
+            completion_jobs[game_id] = job.job_id
+        return jsonify({"job_id": job.job_id, "status": job.status.value, "status_url": f"/api/jobs/{job.job_id}"}), 202
+
+    job_id = pending_completion_job(game_id)
+    if job_id:
+        return game_busy_response(job_id)
+
     try:
         # Run all remaining rounds
-        round_results = await game.run_all_rounds()
+        # Runs on the shared loop so it can pick up prefetched moves
+        with game_storage.in_use(game_id) as game:
+            if not game:
+                return jsonify({"error": "Game not found"}), 404
+            game.prefetch = False
+            round_results = run_on_loop(play_remaining_rounds(game))
         if not round_results:
             return jsonify({"error": "Failed to complete game"}), 500
             
-        # Format rounds with AI information
-        formatted_rounds = [
-            {
-                "round_number": r.round_number,
-                "player1_move": r.player1_move.value,
-                "player2_move": r.player2_move.value,
-                "player1_reasoning": r.player1_reasoning,
-                "player2_reasoning": r.player2_reasoning,
-                "player1_score": r.player1_score,
-                "player2_score": r.player2_score,
-                "token_usage": {
-                    "prompt_tokens": r.token_usage.prompt_tokens,
-                    "completion_tokens": r.token_usage.completion_tokens,
-                    "total_tokens": r.token_usage.total_tokens
-                } if r.token_usage else None
-            }
-            for r in round_results
-        ]
-
-        # Add AI information for final response
-        response = {
-            "rounds": formatted_rounds,
-            "final_scores": {
-                "player1": game.player1_total_score,
-                "player2": game.player2_total_score
-            }
-        }
-
-        # Add AI info if present
-        if game.has_ai_player:
-            response["ai_info"] = {
-                "player1_model": game.player1_model,
-                "player2_model": game.player2_model,
-                "has_ai_player": True
-            }
+        response = completed_game_response(game, round_results)
         
         # Important: Save completed game and clean up
         game_history.save_game(game_id, game)
@@ -282,7 +535,86 @@ async def complete_game(game_id: str):
         
         return jsonify(response)
         
+    except GameBusyError:
+        return game_busy_response(pending_completion_job(game_id))
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
-        return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
\ No newline at end of file
+        return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
+
+@bp.route('/game/<game_id>/complete/stream', methods=['POST'])
+def stream_complete_game(game_id: str):
+    """
+    Play the remaining rounds, sending each one as a Server-Sent Event as soon as it is scored
+
+    Emits a `round` event per round (same body as /move), then `complete` with
+    the final scores, or `error`. A round is only played once the previous
+    event has been handed to the server, so a slow reader holds the game back
+    rather than queueing rounds. If the client disconnects, the round in
+    progress and any prefetched moves are cancelled.
+    """
+    job_id = pending_completion_job(game_id)
+    if job_id:
+        return game_busy_response(job_id)
+
+    # The game is held until the response is closed, i.e. after the last
+    # event or when the client disconnects
+    hold = ExitStack()
+    try:
+        game = hold.enter_context(game_storage.in_use(game_id))
+    except GameBusyError:
+        return game_busy_response()
+    if not game:
+        hold.close()
+        return jsonify({"error": "Game not found"}), 404
+    if game.is_game_over():
+        hold.close()
+        return jsonify({"error": "Game is already complete"}), 400
+
+    loop_thread = get_event_loop_thread()
+
+    def round_events():
+        pending = None
+        try:
+            while not game.is_game_over():
+                pending = loop_thread.submit(play_round(game))
+                while True:
+                    try:
+                        result = pending.result(timeout=SSE_HEARTBEAT_SECONDS)
+                        break
+                    except concurrent.futures.TimeoutError:
+                        yield ": waiting for round\n\n"
+                pending = None
+                if not result:
+                    yield sse_event("error", {"error": "Failed to process round"})
+                    return
+                yield sse_event("round", round_response(game, result), result.round_number)
+
+            game_history.save_game(game_id, game)
+            game_storage.remove_game(game_id)
+            yield sse_event("complete", {
+                "final_scores": {
+                    "player1": game.player1_total_score,
+                    "player2": game.player2_total_score
+                },
+                "ai_info": {
+                    "player1_model": game.player1_model,
+                    "player2_model": game.player2_model,
+                    "has_ai_player": game.has_ai_player
+                }
+            })
+        except GeneratorExit:
+            # Client went away: stop spending tokens on rounds nobody will see
+            if pending is not None:
+                pending.cancel()
+            loop_thread.call_soon(game.cancel_prefetch)
+            raise
+        except Exception as e:
+            yield sse_event("error", {"error": f"Unexpected error: {str(e)}"})
+
+    response = Response(round_events(), mimetype='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+    response.call_on_close(hold.close)
+    return response
@@ -0,0 +1,120 @@
+from typing import Optional
+from dataclasses import dataclass
+import numpy as np
+from app.models.types import PayoffMatrix, MatrixType, MATRIX_PAYOFFS
+from app.strategies import StrategyType
+from app.strategies.batch import BatchStrategy, create_batch_strategy
+
+
+@dataclass
+class BatchGameResult:
+    player1_scores: np.ndarray  # Total score per game, shape (num_games,)
+    player2_scores: np.ndarray
+    player1_cooperation_rate: np.ndarray  # Fraction of rounds cooperated per game
+    player2_cooperation_rate: np.ndarray
+    num_rounds: int
+
+    @property
+    def num_games(self) -> int:
+        return len(self.player1_scores)
+
+    @property
+    def cooperation_rate(self) -> np.ndarray:
+        """Average cooperation rate of both players, per game"""
+        return (self.player1_cooperation_rate + self.player2_cooperation_rate) / 2
+
+
+class BatchGame:
+    """
+    Plays N independent games of R rounds between two classical strategies.
+
+    Equivalent to running Game.run_all_rounds() N times, but every round is a
+    handful of array operations over all games instead of a per-game await.
+    """
+
+    def __init__(self, player1_strategy: BatchStrategy, player2_strategy: BatchStrategy, max_rounds: int = 10, payoff_matrix: Optional[PayoffMatrix] = None):
+        if player1_strategy.num_games != player2_strategy.num_games:
+            raise ValueError("Both batch strategies must play the same number of games")
+
+        self.player1_strategy = player1_strategy
+        self.player2_strategy = player2_strategy
+        self.num_games = player1_strategy.num_games
+        self.max_rounds = max_rounds
+        self.payoff_matrix = payoff_matrix or MATRIX_PAYOFFS[MatrixType.BASELINE]
+
+        # Payoff tables indexed by outcome: 0=CC, 1=CD, 2=DC, 3=DD
+        outcomes = [
+            self.payoff_matrix.cooperate_cooperate,
+            self.payoff_matrix.cooperate_defect,
+            self.payoff_matrix.defect_cooperate,
+            self.payoff_matrix.defect_defect
+        ]
+        self.player1_payoffs = np.array([o[0] for o in outcomes])
+        self.player2_payoffs = np.array([o[1] for o in outcomes])
+
+    def run_all_rounds(self) -> BatchGameResult:
+        """Play every round of every game and return per-game totals"""
+        self.player1_strategy.reset()
+        self.player2_strategy.reset()
+
+        player1_scores = np.zeros(self.num_games, dtype=self.player1_payoffs.dtype)
+        player2_scores = np.zeros(self.num_games, dtype=self.player2_payoffs.dtype)
+        player1_coop = np.zeros(self.num_games, dtype=np.int64)
+        player2_coop = np.zeros(self.num_games, dtype=np.int64)
+
+        for current_round in range(self.max_rounds):
+            player1_moves = self.player1_strategy.get_moves(current_round)
+            player2_moves = self.player2_strategy.get_moves(current_round)
+
+            outcome = (~player1_moves).astype(np.intp) * 2 + (~player2_moves)
+            player1_round_scores = self.player1_payoffs[outcome]
+            player2_round_scores = self.player2_payoffs[outcome]
+
+            player1_scores += player1_round_scores
+            player2_scores += player2_round_scores
+            player1_coop += player1_moves
+            player2_coop += player2_moves
+
+            self.player1_strategy.add_round(player1_moves, player2_moves, player1_round_scores)
+            self.player2_strategy.add_round(player2_moves, player1_moves, player2_round_scores)
+
+        rounds = max(self.max_rounds, 1)
+        return BatchGameResult(
+            player1_scores=player1_scores,
+            player2_scores=player2_scores,
+            player1_cooperation_rate=player1_coop / rounds,
+            player2_cooperation_rate=player2_coop / rounds,
+            num_rounds=self.max_rounds
+        )
+
+
+def run_batch_games(
+    player1_type: StrategyType,
+    player2_type: StrategyType,
+    num_games: int,
+    num_rounds: int = 10,
+    matrix_type: MatrixType = MatrixType.BASELINE,
+    seed: Optional[int] = None
+) -> BatchGameResult:
+    """
+    Run num_games games between two classical strategies on the batch engine
+
+    Args:
+        player1_type: Strategy for player 1
+        player2_type: Strategy for player 2
+        num_games: Number of independent games
+        num_rounds: Rounds per game
+        matrix_type: Payoff matrix to play under
+        seed: Optional seed for the stochastic kernels
+
+    Returns:
+        BatchGameResult: Per-game scores and cooperation rates
+    """
+    rng = np.random.default_rng(seed)
+    game = BatchGame(
+        player1_strategy=create_batch_strategy(player1_type, num_games, matrix_type=matrix_type, rng=rng),
+        player2_strategy=create_batch_strategy(player2_type, num_games, matrix_type=matrix_type, rng=rng),
+        max_rounds=num_rounds,
+        payoff_matrix=MATRIX_PAYOFFS[matrix_type]
+    )
+    return game.run_all_rounds()
@@ -1,5 +1,6 @@
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
+import asyncio
 from app.models.types import Move, RoundResult, PayoffMatrix, TokenUsage, OptimalStrategy, MatrixType, MATRIX_PAYOFFS
 from app.strategies.base import BaseStrategy
 from app.strategies.ai_strategy import AIStrategy
@@ -16,6 +17,9 @@ class Game:
         self.player1_total_score = 0
         self.player2_total_score = 0
         self.timestamp = datetime.now()
+        # Interactive games request the AI players' next moves as soon as a round is scored
+        self.prefetch = False
+        self._prefetched: Dict[str, Tuple[int, asyncio.Task]] = {}
 
         self.has_ai_player = isinstance(player1_strategy, AIStrategy) or isinstance(player2_strategy, AIStrategy)
         self.ai_errors: Dict[str, str] = {}  # Track AI errors by player
@@ -58,10 +62,41 @@ class Game:
         except ValueError:
             return False
 
+    def prefetch_moves(self):
+        """
+        Start the AI players' requests for the current round's moves in the background
+
+        An AI's move only depends on rounds that are already scored, so the request
+        made now is the one the round would make. Must be called on the event loop
+        that will process the round.
+        """
+        if self.is_game_over():
+            return
+        for player, strategy in (("player1", self.player1_strategy), ("player2", self.player2_strategy)):
+            if isinstance(strategy, AIStrategy) and player not in self._prefetched:
+                task = asyncio.ensure_future(strategy.get_move(self.current_round))
+                self._prefetched[player] = (self.current_round, task)
+
+    def cancel_prefetch(self):
+        """Cancel prefetched moves that have not been used"""
+        for _, task in self._prefetched.values():
+            task.cancel()
+        self._prefetched = {}
+
+    async def _get_ai_move(self, player: str, strategy: AIStrategy) -> Move:
+        """An AI player's move, from its prefetched request if one was made for this round"""
+        prefetched = self._prefetched.pop(player, None)
+        if prefetched is not None:
+            prefetched_round, task = prefetched
+            if prefetched_round == self.current_round:
+                return await task
+            task.cancel()
+        return await strategy.get_move(self.current_round)
+
     async def get_player1_move(self) -> Move:
         """Get player 1's move based on their strategy"""
         if isinstance(self.player1_strategy, AIStrategy):
-            move = await self.player1_strategy.get_move(self.current_round)
+            move = await self._get_ai_move("player1", self.player1_strategy)
             if self.player1_strategy.last_error:
                 self.ai_errors["player1"] = self.player1_strategy.last_error
         else:
@@ -73,7 +108,7 @@ class Game:
     async def get_player2_move(self) -> Move:
         """Get player 2's move based on their strategy"""
         if isinstance(self.player2_strategy, AIStrategy):
-            move = await self.player2_strategy.get_move(self.current_round)
+            move = await self._get_ai_move("player2", self.player2_strategy)
             if self.player2_strategy.last_error:
                 self.ai_errors["player2"] = self.player2_strategy.last_error
         else:
@@ -94,9 +129,20 @@ class Game:
         if self.is_game_over():
             raise ValueError("Cannot process round: game is already over")
 
-        # Get moves from both players - error handling already done in strategies
-        player1_move = await self.get_player1_move()
-        player2_move = await self.get_player2_move()
+        # Moves are simultaneous, so collect them concurrently - error handling already done in strategies
+        player1_move, player2_move = await asyncio.gather(
+            self.get_player1_move(),
+            self.get_player2_move(),
+            return_exceptions=True
+        )
+
+        # Record errors from each side before surfacing the first one
+        for player, move in (("player1", player1_move), ("player2", player2_move)):
+            if isinstance(move, BaseException):
+                self.ai_errors[player] = str(move)
+        for move in (player1_move, player2_move):
+            if isinstance(move, BaseException):
+                raise move
 
         # Get reasoning - for AI strategies this will include their explanation
         player1_reasoning = (
@@ -120,22 +166,15 @@ class Game:
         cumulative_player1_score = self.player1_total_score
         cumulative_player2_score = self.player2_total_score
 
-        # Get token usage if applicable
+        # Each AI player's usage for this round's move, and the round's total
+        player1_usage = self._round_usage(self.player1_strategy)
+        player2_usage = self._round_usage(self.player2_strategy)
         token_usage = None
-        if isinstance(self.player1_strategy, AIStrategy) or isinstance(self.player2_strategy, AIStrategy):
-            total_prompt_tokens = 0
-            total_completion_tokens = 0
-            
-            if isinstance(self.player1_strategy, AIStrategy):
-                total_prompt_tokens += self.player1_strategy.total_tokens_used
-            if isinstance(self.player2_strategy, AIStrategy):
-                total_prompt_tokens += self.player2_strategy.total_tokens_used
-                
-            token_usage = TokenUsage(
-                prompt_tokens=total_prompt_tokens,
-                completion_tokens=0,  # Will be updated when we implement completion token tracking
-                total_tokens=total_prompt_tokens
-            )
+        if player1_usage is not None or player2_usage is not None:
+            token_usage = TokenUsage(0, 0, 0)
+            for usage in (player1_usage, player2_usage):
+                if usage is not None:
+                    token_usage = token_usage + usage
 
         # Create round result
         round_result = RoundResult(
@@ -149,7 +188,9 @@ class Game:
             cumulative_player1_score=cumulative_player1_score,  # Pass cumulative score
             cumulative_player2_score=cumulative_player2_score,  # Pass cumulative score
             token_usage=token_usage,
-            api_errors=None  # The strategies handle their own errors
+            api_errors=None,  # The strategies handle their own errors
+            player1_token_usage=player1_usage,
+            player2_token_usage=player2_usage
         )
 
         # Update histories
@@ -163,6 +204,8 @@ class Game:
         # Check for game over
         if self.current_round >= self.max_rounds:
             self.game_over = True
+        elif self.prefetch:
+            self.prefetch_moves()
 
         return round_result
     
@@ -176,9 +219,23 @@ class Game:
             result = await self.process_round()
             if result:
                 results.append(result)
-                
+
+        await self.drain_reasoning()
         return results
 
+    async def drain_reasoning(self):
+        """Wait for AI reasoning still streaming after the moves were made, and record it in the rounds"""
+        for strategy in (self.player1_strategy, self.player2_strategy):
+            if isinstance(strategy, AIStrategy):
+                await strategy.drain_reasoning()
+
+    @staticmethod
+    def _round_usage(strategy: BaseStrategy) -> Optional[TokenUsage]:
+        """An AI strategy's usage for the move it just made (None for other strategies)"""
+        if not isinstance(strategy, AIStrategy):
+            return None
+        return strategy.last_usage or TokenUsage(0, 0, 0)
+
     def calculate_scores(self, player1_move: Move, player2_move: Move) -> tuple[int, int]:
         """Calculate scores for both players based on their moves"""
         try:
@@ -192,6 +249,7 @@ class Game:
     
     def reset(self):
         """Reset the game and strategies to initial state"""
+        self.cancel_prefetch()
         self.current_round = 0
         self.game_over = False
         self.rounds = []
@@ -11,9 +11,28 @@ class Move(str, Enum):
 
 @dataclass
 class TokenUsage:
-    prompt_tokens: int
+    prompt_tokens: int  # All input tokens, including those served from the prompt cache
     completion_tokens: int
     total_tokens: int
+    cache_read_tokens: int = 0  # Input tokens read from the provider's prompt cache
+    cache_creation_tokens: int = 0  # Input tokens written to the provider's prompt cache
+    hedged_tokens: int = 0  # Tokens spent on a duplicate request that lost a hedge race, included in total_tokens
+    cancelled_hedges: int = 0  # Duplicate requests cancelled in flight; what they cost is unknown, so it isn't in total_tokens
+    latency_seconds: float = 0.0  # Time spent getting the move, including retries and backoff
+    retries: int = 0  # Requests sent beyond the first
+
+    def __add__(self, other: "TokenUsage") -> "TokenUsage":
+        return TokenUsage(
+            prompt_tokens=self.prompt_tokens + other.prompt_tokens,
+            completion_tokens=self.completion_tokens + other.completion_tokens,
+            total_tokens=self.total_tokens + other.total_tokens,
+            cache_read_tokens=self.cache_read_tokens + other.cache_read_tokens,
+            cache_creation_tokens=self.cache_creation_tokens + other.cache_creation_tokens,
+            hedged_tokens=self.hedged_tokens + other.hedged_tokens,
+            cancelled_hedges=self.cancelled_hedges + other.cancelled_hedges,
+            latency_seconds=self.latency_seconds + other.latency_seconds,
+            retries=self.retries + other.retries
+        )
     
 @dataclass
 class RoundResult:
@@ -26,8 +45,10 @@ class RoundResult:
     player2_score: int
     cumulative_player1_score: int  # New field
     cumulative_player2_score: int  # New field
-    token_usage: Optional[TokenUsage] = None
+    token_usage: Optional[TokenUsage] = None  # Both players' usage for this round
     api_errors: Optional[str] = None
+    player1_token_usage: Optional[TokenUsage] = None  # Only set for AI players
+    player2_token_usage: Optional[TokenUsage] = None
 
 
 @dataclass
@@ -2,7 +2,7 @@ import os
 from dotenv import load_dotenv
 from enum import Enum
 from typing import Dict, Type, Optional
-from app.models.types import MatrixType
+from app.models.types import MatrixType, MATRIX_PAYOFFS
 
 from .base import BaseStrategy
 from .optimal_strategy import OptimalStrategy
@@ -13,6 +13,9 @@ from .pavlov import Pavlov
 from .random_strategy import RandomStrategy
 from .grim import GrimTrigger
 from .haiku_strategy import HaikuStrategy
+from .context import create_context_policy
+from .history_encoding import HistoryEncoding
+from app.utils.llm_cache import CacheMode, get_cache_mode
 
 # Load environment variables
 load_dotenv()
@@ -58,14 +61,31 @@ def register_strategy(strategy_type: StrategyType, strategy_class: Type[BaseStra
     _strategy_registry[strategy_type] = strategy_class
 
 
-def create_strategy(strategy_type: StrategyType, is_player1: bool, matrix_type: Optional[MatrixType] = None) -> BaseStrategy:
+def _optional_int_env(name: str, default: Optional[int] = None) -> Optional[int]:
+    """Integer environment variable; unset uses the default, "none" means no limit"""
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    if value.lower() == "none":
+        return None
+    return int(value)
+
+
+def create_strategy(
+    strategy_type: StrategyType,
+    is_player1: bool,
+    matrix_type: Optional[MatrixType] = None,
+    history_encoding: Optional[HistoryEncoding] = None
+) -> BaseStrategy:
     """
     Create a new instance of the specified strategy
     
     Args:
         strategy_type: The type of strategy to create
         is_player1: Whether this strategy is for player 1 (True) or player 2 (False)
-        matrix_type: Optional matrix type for strategies that need it (like OptimalStrategy)
+        matrix_type: Optional matrix type for strategies that need it (like OptimalStrategy);
+            AI strategies are prompted with its payoffs
+        history_encoding: How AI strategies write the game history (defaults to CLAUDE_HISTORY_ENCODING, or verbose)
     
     Returns:
         BaseStrategy: A new instance of the requested strategy
@@ -76,12 +96,27 @@ def create_strategy(strategy_type: StrategyType, is_player1: bool, matrix_type:
     # Special handling for Haiku strategy since it needs API key
     if strategy_type == StrategyType.CLAUDE_HAIKU:
         api_key = os.getenv('CLAUDE_API_KEY')
+        if not api_key and get_cache_mode() == CacheMode.REPLAY:
+            # Replayed experiments never reach the provider
+            api_key = "replay-only"
         if not api_key:
             raise ValueError("CLAUDE_API_KEY not found in environment variables")
+        context_policy = create_context_policy(_optional_int_env('CLAUDE_CONTEXT_WINDOW'))
+        # A bounded context keeps per-round cost flat, so long games are expected
+        # and a game-wide budget only applies when asked for
+        default_budget = None if context_policy.bounded else 10000
         return HaikuStrategy(
             name="Claude Haiku",
             is_player1=is_player1,
-            api_key=api_key
+            api_key=api_key,
+            stream=os.getenv('CLAUDE_STREAM_MOVES', 'false').lower() == 'true',
+            capture_reasoning=os.getenv('CLAUDE_CAPTURE_REASONING', 'true').lower() == 'true',
+            hedge=os.getenv('CLAUDE_HEDGE_REQUESTS', 'false').lower() == 'true',
+            structured_output=os.getenv('CLAUDE_STRUCTURED_OUTPUT', 'false').lower() == 'true',
+            context_policy=context_policy,
+            token_budget=_optional_int_env('CLAUDE_TOKEN_BUDGET', default=default_budget),
+            payoff_matrix=MATRIX_PAYOFFS[matrix_type] if matrix_type is not None else None,
+            history_encoding=history_encoding or HistoryEncoding(os.getenv('CLAUDE_HISTORY_ENCODING', 'verbose'))
         )
     
     if strategy_type == StrategyType.OPTIMAL:
@@ -1,14 +1,12 @@
 from typing import Optional, List, Dict
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, replace
 import asyncio
-from app.models.types import Move, RoundResult
+import time
+from app.models.types import Move, RoundResult, TokenUsage
 from app.strategies.base import BaseStrategy
-
-@dataclass
-class TokenUsage:
-    prompt_tokens: int
-    completion_tokens: int
-    total_tokens: int
+from app.strategies.context import ContextPolicy, FullHistoryPolicy
+from app.utils.rate_limiter import RateLimiter
+from app.utils.llm_transport import CallInfo, LLMTransport, LLMTransportError, get_llm_transport
 
 @dataclass
 class AIResponse:
@@ -21,15 +19,27 @@ class AIStrategy(BaseStrategy):
         self,
         name: str,
         is_player1: bool,
-        token_budget: int = 4000,
+        token_budget: Optional[int] = 4000,  # None for no budget
         max_retries: int = 3,
-        retry_delay: float = 1.0
+        retry_delay: float = 1.0,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_rate_limit_retries: int = 10,
+        transport: Optional[LLMTransport] = None,
+        context_policy: Optional[ContextPolicy] = None
     ):
         super().__init__(name, is_player1)
         self.token_budget = token_budget
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.rate_limiter = rate_limiter
+        self.max_rate_limit_retries = max_rate_limit_retries
+        # Retries, backoff and the circuit breaker are shared by all strategies by default
+        self.transport = transport or get_llm_transport()
+        # How much history goes into each prompt; kept up to date as rounds are added
+        self.context_policy = context_policy or FullHistoryPolicy()
         self.total_tokens_used = 0
+        # Usage of the most recent get_move(), for per-round telemetry
+        self.last_usage: Optional[TokenUsage] = None
         self.conversation_history: List[Dict] = []
         self._last_error: Optional[str] = None
         self.current_round = 0
@@ -37,36 +47,48 @@ class AIStrategy(BaseStrategy):
     async def get_move(self, current_round: int) -> Move:
         """Get the AI's next move"""
         self.current_round = current_round
+        self.last_usage = TokenUsage(0, 0, 0)
 
         # Token budget check 
         estimated_next_tokens = 200  
-        if self.total_tokens_used + estimated_next_tokens > self.token_budget:
+        if self.token_budget is not None and self.total_tokens_used + estimated_next_tokens > self.token_budget:
             self._last_error = "Token budget exceeded"
             return self._get_fallback_move(self._last_error)
 
-        last_error = None
-        for attempt in range(self.max_retries):
-            try:
-                response = await self._get_ai_response(current_round)
-                
-                # Check if this response would exceed budget
-                if self.total_tokens_used + response.token_usage.total_tokens > self.token_budget:
-                    self._last_error = "Token budget would be exceeded"
-                    return self._get_fallback_move(self._last_error)
-                    
-                self._update_token_usage(response.token_usage)
-                self._record_interaction(current_round, response)
-                return response.move
-
-            except Exception as e:
-                last_error = str(e)
-                if attempt < self.max_retries - 1:
-                    await asyncio.sleep(self.retry_delay)
-                    continue
-        
-        # If we get here, we've failed all retries
-        self._last_error = f"Failed after {self.max_retries} attempts. Last error: {last_error}"
-        return self._get_fallback_move(self._last_error)
+        call_info = CallInfo()
+        started = time.perf_counter()
+        try:
+            response = await self.transport.call(
+                lambda: self._get_ai_response(current_round),
+                max_retries=self.max_retries,
+                base_delay=self.retry_delay,
+                rate_limiter=self.rate_limiter,
+                max_rate_limit_retries=self.max_rate_limit_retries,
+                estimated_tokens=estimated_next_tokens,
+                tokens_used=lambda response: response.token_usage.total_tokens,
+                call_info=call_info
+            )
+        except LLMTransportError as e:
+            self.last_usage = TokenUsage(0, 0, 0, latency_seconds=time.perf_counter() - started, retries=call_info.retries)
+            self._last_error = str(e)
+            return self._get_fallback_move(self._last_error)
+
+        response.token_usage = replace(
+            response.token_usage,
+            latency_seconds=time.perf_counter() - started,
+            retries=call_info.retries
+        )
+        # Spent even if the response is thrown away below
+        self.last_usage = response.token_usage
+
+        # Check if this response would exceed budget
+        if self.token_budget is not None and self.total_tokens_used + response.token_usage.total_tokens > self.token_budget:
+            self._last_error = "Token budget would be exceeded"
+            return self._get_fallback_move(self._last_error)
+
+        self._update_token_usage(response.token_usage)
+        self._record_interaction(current_round, response)
+        return response.move
 
     def _get_fallback_move(self, reason: str) -> Move:
         """Return cooperative move as fallback with explanation"""
@@ -104,10 +126,25 @@ class AIStrategy(BaseStrategy):
         """
         raise NotImplementedError("AI strategy must implement _get_ai_response")
 
+    async def drain_reasoning(self):
+        """
+        Wait for any reasoning still arriving after a move was returned.
+
+        Strategies that stream responses override this; by default every
+        response is complete when its move is returned.
+        """
+        pass
+
+    def add_round(self, round_result: RoundResult):
+        super().add_round(round_result)
+        self.context_policy.observe(round_result, self.is_player1)
+
     def reset(self):
         """Reset the strategy's state"""
         super().reset()
+        self.context_policy.reset()
         self.total_tokens_used = 0
+        self.last_usage = None
         self.conversation_history = []
         self._last_error = None
 
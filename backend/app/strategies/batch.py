@@ -0,0 +1,178 @@
+from typing import Dict, Type, Optional
+import numpy as np
+from app.models.types import MatrixType, MATRIX_PAYOFFS
+from app.strategies import StrategyType
+
+
+class BatchStrategy:
+    """
+    Vectorized counterpart of BaseStrategy that plays many independent games at once.
+
+    Moves are boolean arrays of shape (num_games,) where True means COOPERATE.
+    Instead of a list of RoundResults, only the state the kernel needs from the
+    previous round is kept.
+    """
+
+    def __init__(self, name: str, num_games: int, rng: Optional[np.random.Generator] = None):
+        self.name = name
+        self.num_games = num_games
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.reset()
+
+    def get_moves(self, current_round: int) -> np.ndarray:
+        """
+        Get the next move for every game in the batch
+
+        Args:
+            current_round: The current round number (0-based)
+
+        Returns:
+            np.ndarray: Boolean array of shape (num_games,), True for COOPERATE
+        """
+        raise NotImplementedError("Batch strategies must implement get_moves()")
+
+    def add_round(self, my_moves: np.ndarray, opponent_moves: np.ndarray, my_scores: np.ndarray):
+        """
+        Record the result of a completed round for every game
+
+        Args:
+            my_moves: This strategy's moves (True for COOPERATE)
+            opponent_moves: The opponent's moves (True for COOPERATE)
+            my_scores: This strategy's score in the round
+        """
+        self.last_moves = my_moves
+        self.opponent_last_moves = opponent_moves
+        self.last_scores = my_scores
+
+    def reset(self):
+        """Reset the strategy's state for a new batch of games"""
+        self.last_moves: Optional[np.ndarray] = None
+        self.opponent_last_moves: Optional[np.ndarray] = None
+        self.last_scores: Optional[np.ndarray] = None
+
+
+class BatchAlwaysCooperate(BatchStrategy):
+    def __init__(self, num_games: int, rng: Optional[np.random.Generator] = None):
+        super().__init__("Always Cooperate", num_games, rng)
+
+    def get_moves(self, current_round: int) -> np.ndarray:
+        return np.ones(self.num_games, dtype=bool)
+
+
+class BatchAlwaysDefect(BatchStrategy):
+    def __init__(self, num_games: int, rng: Optional[np.random.Generator] = None):
+        super().__init__("Always Defect", num_games, rng)
+
+    def get_moves(self, current_round: int) -> np.ndarray:
+        return np.zeros(self.num_games, dtype=bool)
+
+
+class BatchTitForTat(BatchStrategy):
+    def __init__(self, num_games: int, rng: Optional[np.random.Generator] = None):
+        super().__init__("Tit for Tat", num_games, rng)
+
+    def get_moves(self, current_round: int) -> np.ndarray:
+        if self.opponent_last_moves is None:
+            return np.ones(self.num_games, dtype=bool)
+        return self.opponent_last_moves.copy()
+
+
+class BatchPavlov(BatchStrategy):
+    def __init__(self, num_games: int, rng: Optional[np.random.Generator] = None):
+        super().__init__("Pavlov", num_games, rng)
+
+    def get_moves(self, current_round: int) -> np.ndarray:
+        if self.last_moves is None:
+            return np.ones(self.num_games, dtype=bool)
+
+        # Win = score >= 3, same threshold as the scalar Pavlov strategy
+        won = self.last_scores >= 3
+        return np.where(won, self.last_moves, ~self.last_moves)
+
+
+class BatchGrimTrigger(BatchStrategy):
+    def __init__(self, num_games: int, rng: Optional[np.random.Generator] = None):
+        super().__init__("Grim Trigger", num_games, rng)
+
+    def get_moves(self, current_round: int) -> np.ndarray:
+        if self.opponent_last_moves is not None:
+            self.triggered |= ~self.opponent_last_moves
+        return ~self.triggered
+
+    def reset(self):
+        super().reset()
+        self.triggered = np.zeros(self.num_games, dtype=bool)
+
+
+class BatchRandomStrategy(BatchStrategy):
+    def __init__(self, num_games: int, rng: Optional[np.random.Generator] = None):
+        super().__init__("Random", num_games, rng)
+
+    def get_moves(self, current_round: int) -> np.ndarray:
+        return self.rng.random(self.num_games) < 0.5
+
+
+class BatchOptimalStrategy(BatchStrategy):
+    def __init__(self, matrix_type: MatrixType, num_games: int, rng: Optional[np.random.Generator] = None):
+        super().__init__(f"Optimal ({matrix_type.value})", num_games, rng)
+        self.matrix_type = matrix_type
+        self.optimal_coop_rate = MATRIX_PAYOFFS[matrix_type].optimal_strategy.cooperation_rate
+
+    def get_moves(self, current_round: int) -> np.ndarray:
+        # Pure strategy cases
+        if self.optimal_coop_rate == 0:
+            return np.zeros(self.num_games, dtype=bool)
+        if self.optimal_coop_rate == 1:
+            return np.ones(self.num_games, dtype=bool)
+
+        # Mixed strategy case - use randomization
+        return self.rng.random(self.num_games) < self.optimal_coop_rate
+
+
+# Registry mapping strategy types to their vectorized kernels
+_batch_registry: Dict[StrategyType, Type[BatchStrategy]] = {
+    StrategyType.OPTIMAL: BatchOptimalStrategy,
+    StrategyType.ALWAYS_COOPERATE: BatchAlwaysCooperate,
+    StrategyType.ALWAYS_DEFECT: BatchAlwaysDefect,
+    StrategyType.TIT_FOR_TAT: BatchTitForTat,
+    StrategyType.PAVLOV: BatchPavlov,
+    StrategyType.RANDOM: BatchRandomStrategy,
+    StrategyType.GRIM: BatchGrimTrigger,
+}
+
+
+def has_batch_kernel(strategy_type: StrategyType) -> bool:
+    """Check whether a strategy can be played on the vectorized batch engine"""
+    return strategy_type in _batch_registry
+
+
+def create_batch_strategy(
+    strategy_type: StrategyType,
+    num_games: int,
+    matrix_type: Optional[MatrixType] = None,
+    rng: Optional[np.random.Generator] = None
+) -> BatchStrategy:
+    """
+    Create a vectorized kernel for the specified strategy
+
+    Args:
+        strategy_type: The type of strategy to create
+        num_games: Number of games played in parallel
+        matrix_type: Optional matrix type for strategies that need it (like OptimalStrategy)
+        rng: Optional random generator shared by stochastic kernels
+
+    Returns:
+        BatchStrategy: A new kernel instance
+
+    Raises:
+        ValueError: If the strategy has no batch kernel (e.g. AI strategies)
+    """
+    if strategy_type not in _batch_registry:
+        raise ValueError(f"Strategy {strategy_type.value} has no batch kernel")
+
+    if strategy_type == StrategyType.OPTIMAL:
+        if matrix_type is None:
+            raise ValueError("matrix_type must be provided for OptimalStrategy")
+        return BatchOptimalStrategy(matrix_type=matrix_type, num_games=num_games, rng=rng)
+
+    return _batch_registry[strategy_type](num_games=num_games, rng=rng)
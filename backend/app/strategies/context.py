@@ -0,0 +1,121 @@
+from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+from app.models.types import Move, RoundResult
+
+
+def _outcome_counts() -> Dict[str, int]:
+    return {"CC": 0, "CD": 0, "DC": 0, "DD": 0}
+
+
+@dataclass
+class HistoryAggregates:
+    """Running totals over every round played, from one player's point of view"""
+    rounds: int = 0
+    # Keyed by own move then opponent's move, e.g. "CD" = you cooperated, they defected
+    outcome_counts: Dict[str, int] = field(default_factory=_outcome_counts)
+    my_score: int = 0
+    opponent_score: int = 0
+    opponent_defection_streak: int = 0  # Consecutive opponent defections up to the last round
+    longest_opponent_defection_streak: int = 0
+
+    def observe(self, my_move: Move, opponent_move: Move, my_score: int, opponent_score: int):
+        """Add one round to the totals"""
+        self.rounds += 1
+        outcome = ("C" if my_move == Move.COOPERATE else "D") + ("C" if opponent_move == Move.COOPERATE else "D")
+        self.outcome_counts[outcome] += 1
+        self.my_score += my_score
+        self.opponent_score += opponent_score
+        if opponent_move == Move.DEFECT:
+            self.opponent_defection_streak += 1
+            self.longest_opponent_defection_streak = max(
+                self.longest_opponent_defection_streak, self.opponent_defection_streak
+            )
+        else:
+            self.opponent_defection_streak = 0
+
+    @property
+    def opponent_cooperation_rate(self) -> float:
+        if not self.rounds:
+            return 0.0
+        return (self.outcome_counts["CC"] + self.outcome_counts["DC"]) / self.rounds
+
+
+class ContextPolicy:
+    """
+    Decides how much of the game history an AI strategy puts in its prompt
+
+    The base policy shows every round. Aggregates are kept up to date as rounds
+    are added, so policies that summarize never rescan the history.
+    """
+
+    # Whether prompt size stays flat as the game goes on
+    bounded = False
+
+    def __init__(self):
+        self.aggregates = HistoryAggregates()
+
+    def observe(self, round_result: RoundResult, is_player1: bool):
+        """Record a finished round"""
+        if is_player1:
+            self.aggregates.observe(
+                round_result.player1_move, round_result.player2_move,
+                round_result.player1_score, round_result.player2_score
+            )
+        else:
+            self.aggregates.observe(
+                round_result.player2_move, round_result.player1_move,
+                round_result.player2_score, round_result.player1_score
+            )
+
+    def visible_rounds(self, history: List[RoundResult]) -> List[RoundResult]:
+        """Rounds to show verbatim"""
+        return history
+
+    def summary(self) -> Optional[str]:
+        """Summary of the rounds that are not shown verbatim, if any"""
+        return None
+
+    def reset(self):
+        self.aggregates = HistoryAggregates()
+
+
+class FullHistoryPolicy(ContextPolicy):
+    """Every round verbatim; prompts grow with the game"""
+    pass
+
+
+class SlidingWindowPolicy(ContextPolicy):
+    """The last `window` rounds verbatim, plus totals over the whole game"""
+
+    bounded = True
+
+    def __init__(self, window: int = 10):
+        if window < 1:
+            raise ValueError("Context window must be at least 1 round")
+        super().__init__()
+        self.window = window
+
+    def visible_rounds(self, history: List[RoundResult]) -> List[RoundResult]:
+        return history[-self.window:]
+
+    def summary(self) -> Optional[str]:
+        totals = self.aggregates
+        if totals.rounds <= self.window:
+            return None
+        counts = totals.outcome_counts
+        return (
+            f"Summary of all {totals.rounds} rounds so far (only the last {self.window} are listed below):\n"
+            f"- Both cooperated: {counts['CC']}, you cooperated and they defected: {counts['CD']}, "
+            f"you defected and they cooperated: {counts['DC']}, both defected: {counts['DD']}\n"
+            f"- Opponent cooperation rate: {totals.opponent_cooperation_rate:.0%}\n"
+            f"- Total scores: You: {totals.my_score}, Opponent: {totals.opponent_score}\n"
+            f"- Opponent's current defection streak: {totals.opponent_defection_streak} "
+            f"(longest: {totals.longest_opponent_defection_streak})"
+        )
+
+
+def create_context_policy(window: Optional[int] = None) -> ContextPolicy:
+    """A sliding window of `window` rounds, or the full history if no window is given"""
+    if window is None:
+        return FullHistoryPolicy()
+    return SlidingWindowPolicy(window)
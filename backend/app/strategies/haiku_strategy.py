@@ -1,23 +1,171 @@
-from typing import Dict, List, Optional
+from typing import Awaitable, Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass, replace
+from enum import Enum
 import json
+import re
 import anthropic
 from app.strategies.ai_strategy import AIStrategy, AIResponse, TokenUsage
-from app.models.types import Move, PayoffMatrix, MATRIX_PAYOFFS, MatrixType
+from app.strategies.context import ContextPolicy
+from app.strategies.history_encoding import HistoryEncoding, encode_rounds, encoding_legend
+from app.models.types import Move, PayoffMatrix, MATRIX_PAYOFFS, MatrixType, RoundResult
+from app.utils.rate_limiter import RateLimitedError, get_rate_limiter, parse_retry_after
+from app.utils.client_pool import get_client
+from app.utils.llm_cache import CacheMode, get_cache_mode
+from app.utils.hedging import HedgePolicy, get_hedge_policy
+from app.utils.llm_transport import (
+    LLMClientError, LLMResponseError, LLMServerError, LLMTimeoutError, is_retryable_status
+)
 import asyncio
 
+# USING SONNET
+DEFAULT_MODEL = "claude-3-5-sonnet-latest"
+
+# Marks the end of a prompt prefix the provider should cache
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+class PromptStyle(Enum):
+    CONVERSATION = "conversation"  # Append-only multi-turn conversation, prefix cached by the provider
+    TRANSCRIPT = "transcript"  # Single user message re-rendering the whole history every round
+
+
+# The move can be read from a partial response as soon as this appears
+_STREAMED_MOVE = re.compile(r'"move"\s*:\s*"(cooperate|defect)"', re.IGNORECASE)
+_STREAMED_REASONING = re.compile(r'"reasoning"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+# Any JSON object embedded in prose, for responses that don't come back as bare JSON
+_EMBEDDED_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
+# Structured output: the model is made to call this tool, so its input always matches the schema
+MOVE_TOOL_NAME = "make_move"
+
+# Token estimate a hedged duplicate reserves from the rate limiter, as get_move() does for the first copy
+HEDGE_ESTIMATED_TOKENS = 200
+
+REASONING_PENDING = "(reasoning still streaming)"
+REASONING_NOT_CAPTURED = "(reasoning not captured)"
+
+
+@dataclass
+class _ReasoningCapture:
+    """Reasoning for one round, still streaming after the move was returned"""
+    task: asyncio.Task
+    assistant_turn: Optional[Dict[str, str]] = None  # Transcript turn to complete
+    entry: Optional[Dict] = None  # conversation_history entry to patch
+    round_result: Optional[RoundResult] = None  # RoundResult to patch
+    reasoning: Optional[str] = None
+    text: Optional[str] = None  # The complete response
+    extra_output_tokens: int = 0
+    entry_patched: bool = False
+    round_patched: bool = False
+
+
+@dataclass
+class _Reply:
+    """One provider response, before it is recorded in the conversation"""
+    move: Move
+    reasoning: str
+    content: str  # The response text, as it goes into the transcript
+    token_usage: TokenUsage
+    capture: Optional[_ReasoningCapture] = None  # Set while reasoning is still streaming
+
+
+def _decode_reasoning(text: str) -> Optional[str]:
+    """The reasoning string from a possibly incomplete JSON response, if it has been closed"""
+    match = _STREAMED_REASONING.search(text)
+    if match is None:
+        return None
+    try:
+        return json.loads(f'"{match.group(1)}"')
+    except json.JSONDecodeError:
+        return None
+
+
+def _delta_text(delta: Any) -> Optional[str]:
+    """Text carried by a streamed content delta: response text, or tool input JSON"""
+    if delta.type == "text_delta":
+        return delta.text
+    if delta.type == "input_json_delta":
+        return delta.partial_json
+    return None
+
+
+def _usage_count(usage: Any, field: str) -> int:
+    """Token count from a usage object, treating missing or unset fields as 0"""
+    value = getattr(usage, field, None)
+    return value if isinstance(value, int) else 0
+
+
 class HaikuStrategy(AIStrategy):
-    def __init__(self, name: str, is_player1: bool, api_key: str, payoff_matrix: Optional[PayoffMatrix] = None):
+    def __init__(
+        self,
+        name: str,
+        is_player1: bool,
+        api_key: str,
+        payoff_matrix: Optional[PayoffMatrix] = None,
+        prompt_style: Optional[PromptStyle] = None,
+        stream: bool = False,
+        capture_reasoning: bool = True,
+        hedge: bool = False,
+        structured_output: bool = False,
+        context_policy: Optional[ContextPolicy] = None,
+        token_budget: Optional[int] = 10000,
+        history_encoding: HistoryEncoding = HistoryEncoding.VERBOSE
+    ):
         if not api_key:
             raise ValueError("API key cannot be empty")
-        super().__init__(name, is_player1, token_budget=10000)
-        self.client = anthropic.AsyncAnthropic(api_key=api_key)
+        # Replayed responses come from the local cache, so they are not rate limited
+        rate_limiter = None if get_cache_mode() == CacheMode.REPLAY else get_rate_limiter()
+        super().__init__(
+            name, is_player1, token_budget=token_budget, rate_limiter=rate_limiter, context_policy=context_policy
+        )
+        self.api_key = api_key
+        self._client: Optional[anthropic.AsyncAnthropic] = None
+        self.request_timeout: Optional[float] = 30.0  # None waits indefinitely, e.g. for batch APIs
         self.payoff_matrix = payoff_matrix or MATRIX_PAYOFFS[MatrixType.BASELINE]
 
-        # USING SONNET
-        self.model_name = "claude-3-5-sonnet-latest"
+        self.model_name = DEFAULT_MODEL
+        # A conversation can only grow, so a bounded context re-renders the history every round
+        if prompt_style is None:
+            prompt_style = PromptStyle.TRANSCRIPT if self.context_policy.bounded else PromptStyle.CONVERSATION
+        if prompt_style == PromptStyle.CONVERSATION and self.context_policy.bounded:
+            raise ValueError("Conversation prompts keep every round; use the transcript style with a bounded context")
+        self.prompt_style = prompt_style
+        # Streaming returns the move as soon as it is generated. The rest of the
+        # response is drained in the background, or dropped if reasoning isn't captured
+        self.stream = stream
+        self.capture_reasoning = capture_reasoning
+        self._captures: Dict[int, _ReasoningCapture] = {}
+        # Structured output forces the move through a tool call instead of free text
+        self.structured_output = structured_output
+        self.history_encoding = history_encoding
+        # Responses that weren't valid JSON, and how many of those the tolerant parser still read
+        self.parse_failures = 0
+        self.parse_recoveries = 0
+        # Hedging sends a duplicate of a slow request and keeps whichever answers first.
+        # Replayed responses are instant, so they are never hedged
+        self.hedge_policy: Optional[HedgePolicy] = None
+        if hedge and get_cache_mode() != CacheMode.REPLAY:
+            self.hedge_policy = get_hedge_policy(self.model_name)
         
         self.system_prompt = self._get_system_prompt()
 
+        # Conversation style: completed user/assistant turns, only ever appended to,
+        # and how many history rounds have been reported in them
+        self._transcript: List[Dict[str, str]] = []
+        self._reported_rounds = 0
+
+    @property
+    def client(self) -> anthropic.AsyncAnthropic:
+        """The client set explicitly, or the pooled client for this key and model"""
+        if self._client is not None:
+            return self._client
+        return get_client(self.api_key, self.model_name)
+
+    @client.setter
+    def client(self, client: Optional[anthropic.AsyncAnthropic]):
+        self._client = client
+
     def _get_system_prompt(self) -> str:
         matrix = self.payoff_matrix
         return f"""You are playing a repeated two-player game where in each round both players choose to either COOPERATE or DEFECT.
@@ -29,17 +177,71 @@ class HaikuStrategy(AIStrategy):
     - If you both DEFECT: You get {matrix.defect_defect[0]} points, they get {matrix.defect_defect[1]} points
 
     Your goal is to maximize your total points across all rounds.
+{self._history_legend()}
+    {self._response_instruction()}
+    {self._response_format()}"""
+
+    def _history_legend(self) -> str:
+        legend = encoding_legend(self.history_encoding)
+        return f"\n    {legend}\n" if legend else ""
 
-    Always respond with a JSON object containing:
-    {{
+    def _response_instruction(self) -> str:
+        if self.structured_output:
+            return f"Always respond by calling the {MOVE_TOOL_NAME} tool with:"
+        return "Always respond with a JSON object containing:"
+
+    def _move_reminder(self) -> str:
+        if self.structured_output:
+            return f"Remember to call the {MOVE_TOOL_NAME} tool with your move and reasoning."
+        return "Remember to respond with a JSON object containing your move and reasoning."
+
+    def _response_format(self) -> str:
+        # Streamed responses put the move first so it can be acted on before the reasoning arrives
+        if self.stream:
+            return """{
+        "move": "COOPERATE" or "DEFECT",
+        "reasoning": "Your explanation for the move"
+    }"""
+        return """{
         "reasoning": "Your explanation for the move",
         "move": "COOPERATE" or "DEFECT"
-    }}"""
-        
+    }"""
+
+
+    def _move_tool(self) -> Dict[str, Any]:
+        """Tool definition whose input schema is the response format"""
+        properties = {
+            "reasoning": {"type": "string", "description": "Your explanation for the move"},
+            "move": {"type": "string", "enum": ["COOPERATE", "DEFECT"]}
+        }
+        # Same field order as the text format, so streamed tool input also leads with the move
+        order = ["move", "reasoning"] if self.stream else ["reasoning", "move"]
+        return {
+            "name": MOVE_TOOL_NAME,
+            "description": "Submit your move for this round",
+            "input_schema": {
+                "type": "object",
+                "properties": {field: properties[field] for field in order},
+                "required": order
+            }
+        }
+
+    def _request_params(self, user_message: Dict[str, str]) -> Dict[str, Any]:
+        """Parameters for a messages.create() call"""
+        params = {
+            "model": self.model_name,
+            "max_tokens": 150,
+            "system": self._system_blocks(),
+            "messages": self._request_messages(user_message)
+        }
+        if self.structured_output:
+            params["tools"] = [self._move_tool()]
+            params["tool_choice"] = {"type": "tool", "name": MOVE_TOOL_NAME}
+        return params
 
     async def get_move(self, current_round: int) -> Move:
         # Check if next response would exceed budget (estimate 100 tokens for safety margin)
-        if self.total_tokens_used + 100 > self.token_budget:
+        if self.token_budget is not None and self.total_tokens_used + 100 > self.token_budget:
             raise ValueError("Token budget exceeded")
         
         # Call the parent class's get_move method
@@ -47,49 +249,31 @@ class HaikuStrategy(AIStrategy):
 
     async def _get_ai_response(self, current_round: int) -> AIResponse:
         """Get next move from Claude Haiku"""
-
-        # Build the game history context
-        history_text = self._format_history()
-        
-        # Construct the full prompt
-        user_prompt = f"""Current round: {current_round + 1}
-Game history:
-{history_text}
-
-What is your next move? Remember to respond with a JSON object containing your move and reasoning."""
+        if self.prompt_style == PromptStyle.CONVERSATION:
+            # The previous assistant turn must be complete to keep the cached prefix stable
+            await self.drain_reasoning()
+        user_message = self._next_user_message(current_round)
 
         try:
             print(f"\nRequesting AI response for round {current_round + 1}...")  # Add logging
-            response = await asyncio.wait_for(
-                self.client.messages.create(
-                    model=self.model_name,
-                    max_tokens=150,
-                    system=self.system_prompt,
-                    messages=[{
-                        "role": "user",
-                        "content": user_prompt
-                    }]
-                ),
-                timeout=30.0  # Add 30 second timeout
+            reply = await asyncio.wait_for(
+                self._request_reply(user_message),
+                timeout=self.request_timeout
             )
             print(f"Received AI response for round {current_round + 1}")  # Add logging
-            
-            # Parse the response
-            content = response.content[0].text
-            try:
-                move_data = json.loads(content)
-                move = Move(move_data["move"].lower())
-                reasoning = move_data["reasoning"]
-            except (json.JSONDecodeError, KeyError, ValueError) as e:
-                print(f"Error parsing AI response: {str(e)}")  # Add logging
-                raise ValueError(f"Failed to parse AI response: {str(e)}")
-                
-            # Calculate token usage
-            token_usage = TokenUsage(
-                prompt_tokens=response.usage.input_tokens,
-                completion_tokens=response.usage.output_tokens,
-                total_tokens=response.usage.input_tokens + response.usage.output_tokens
-            )           
+            move, reasoning, content, token_usage = reply.move, reply.reasoning, reply.content, reply.token_usage
+            if reply.capture is not None:
+                self._captures[current_round] = reply.capture
+
+            if self.prompt_style == PromptStyle.CONVERSATION:
+                assistant_turn = {"role": "assistant", "content": content}
+                self._transcript.append(user_message)
+                self._transcript.append(assistant_turn)
+                self._reported_rounds = len(self.history)
+                capture = self._captures.get(current_round)
+                if capture is not None:
+                    capture.assistant_turn = assistant_turn
+                    self._apply_reasoning(capture)
             
             return AIResponse(
                 move=move,
@@ -97,30 +281,336 @@ What is your next move? Remember to respond with a JSON object containing your m
                 token_usage=token_usage
             )
             
+        except anthropic.RateLimitError as e:
+            raise RateLimitedError(
+                f"Anthropic rate limit: {str(e)}",
+                retry_after=parse_retry_after(e.response.headers.get("retry-after"))
+            )
         except asyncio.TimeoutError:
-            print("AI request timed out after 30 seconds")  # Add logging
-            raise ValueError("AI request timed out")
+            print(f"AI request timed out after {self.request_timeout} seconds")  # Add logging
+            raise LLMTimeoutError("AI request timed out")
+        except anthropic.APIStatusError as e:
+            print(f"Anthropic API error: {str(e)}")  # Add logging
+            error_class = LLMServerError if is_retryable_status(e.status_code) else LLMClientError
+            raise error_class(f"Anthropic API error: {str(e)}")
         except anthropic.APIError as e:
             print(f"Anthropic API error: {str(e)}")  # Add logging
-            raise ValueError(f"Anthropic API error: {str(e)}")
+            raise LLMServerError(f"Anthropic API error: {str(e)}")
+
+    async def _request_reply(self, user_message: Dict[str, str]) -> _Reply:
+        """Request a reply, hedging the request if this strategy hedges"""
+        if self.hedge_policy is None:
+            return await self._request_once(user_message)
+
+        losers: List[Optional[_Reply]] = []
+        reply = await self.hedge_policy.run(
+            lambda: self._request_once(user_message),
+            discard=losers.append,
+            hedge=lambda: self._hedge_request(user_message)
+        )
+        if not losers:
+            return reply
+
+        hedged_tokens = 0
+        cancelled_hedges = 0
+        for loser in losers:
+            if loser is None:
+                # Cancelled in flight: the provider may have billed some of it, but how much is unknown
+                cancelled_hedges += 1
+                continue
+            if loser.capture is not None:
+                loser.capture.task.cancel()
+            hedged_tokens += loser.token_usage.total_tokens
+        reply.token_usage = replace(
+            reply.token_usage,
+            total_tokens=reply.token_usage.total_tokens + hedged_tokens,
+            hedged_tokens=hedged_tokens,
+            cancelled_hedges=cancelled_hedges
+        )
+        return reply
+
+    def _hedge_request(self, user_message: Dict[str, str]) -> Optional[Awaitable[_Reply]]:
+        """
+        A duplicate request holding its own rate-limiter slot, or None if no slot is free now
+
+        The caller's slot covers only the first copy, so the duplicate has to
+        fit the RPM/TPM budget on its own; hedging never waits for capacity.
+        """
+        if self.rate_limiter is None:
+            return self._request_once(user_message)
+        if not self.rate_limiter.try_acquire(HEDGE_ESTIMATED_TOKENS):
+            return None
+
+        async def duplicate() -> _Reply:
+            async with self.rate_limiter.held(HEDGE_ESTIMATED_TOKENS) as usage:
+                reply = await self._request_once(user_message)
+                usage.tokens = reply.token_usage.total_tokens
+                return reply
+
+        return duplicate()
+
+    async def _request_once(self, user_message: Dict[str, str]) -> _Reply:
+        """Make a single provider request for the given user turn"""
+        if self.stream:
+            return await self._stream_move(user_message)
+
+        response = await self.client.messages.create(**self._request_params(user_message))
+        content = self._response_content(response)
+        move, reasoning = self._parse_response(content)
+        return _Reply(move, reasoning, content, self._token_usage(response.usage, response.usage.output_tokens))
+
+    def _response_content(self, response: Any) -> str:
+        """The response as JSON text: the move tool's input if it was called, otherwise the text"""
+        for block in response.content:
+            if getattr(block, "type", None) == "tool_use" and block.name == MOVE_TOOL_NAME:
+                return json.dumps(block.input)
+        return "".join(
+            block.text for block in response.content
+            if isinstance(getattr(block, "text", None), str)
+        )
+
+    def _parse_response(self, content: str) -> Tuple[Move, str]:
+        """
+        Parse a complete response into a move and reasoning
+
+        Bare JSON is expected. Anything else counts as a parse failure and is
+        read tolerantly, so prose around the JSON does not cost a retry.
+        """
+        try:
+            move_data = json.loads(content)
+            return Move(move_data["move"].lower()), move_data["reasoning"]
+        except (json.JSONDecodeError, KeyError, ValueError, TypeError, AttributeError) as e:
+            self.parse_failures += 1
+            recovered = self._extract_move(content)
+            if recovered is not None:
+                self.parse_recoveries += 1
+                return recovered
+            print(f"Error parsing AI response: {str(e)}")  # Add logging
+            raise LLMResponseError(f"Failed to parse AI response: {str(e)}")
+
+    def _extract_move(self, content: str) -> Optional[Tuple[Move, str]]:
+        """Find a move in a response that isn't bare JSON, or None if there is none"""
+        match = _EMBEDDED_OBJECT.search(content)
+        if match is not None:
+            try:
+                move_data = json.loads(match.group(0))
+                return Move(move_data["move"].lower()), str(move_data.get("reasoning", ""))
+            except (json.JSONDecodeError, KeyError, ValueError, TypeError, AttributeError):
+                pass
+
+        match = _STREAMED_MOVE.search(content)
+        if match is None:
+            return None
+        return Move(match.group(1).lower()), _decode_reasoning(content) or content.strip()
+
+    def _token_usage(self, usage: Any, output_tokens: int) -> TokenUsage:
+        """Token usage for a response. input_tokens excludes cached tokens, which are reported separately"""
+        cache_read_tokens = _usage_count(usage, "cache_read_input_tokens")
+        cache_creation_tokens = _usage_count(usage, "cache_creation_input_tokens")
+        prompt_tokens = usage.input_tokens + cache_read_tokens + cache_creation_tokens
+        return TokenUsage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=output_tokens,
+            total_tokens=prompt_tokens + output_tokens,
+            cache_read_tokens=cache_read_tokens,
+            cache_creation_tokens=cache_creation_tokens
+        )
+
+    async def _stream_move(self, user_message: Dict[str, str]) -> _Reply:
+        """
+        Stream a response and return as soon as the move has been generated
+
+        Returns:
+            The move, the reasoning (or a placeholder while it streams), the
+            response text so far, the token usage so far, and the capture that
+            drains the rest of the response if reasoning is captured
+        """
+        stream = await self.client.messages.create(**self._request_params(user_message), stream=True)
+        # One iterator, so the drain picks up exactly where the move was found
+        events = stream.__aiter__()
+        text = ""
+        usage = None
+        output_tokens = 0
+        match = None
+        try:
+            async for event in events:
+                if event.type == "message_start":
+                    usage = event.message.usage
+                elif event.type == "content_block_delta" and _delta_text(event.delta) is not None:
+                    text += _delta_text(event.delta)
+                    match = _STREAMED_MOVE.search(text)
+                    if match:
+                        break
+                elif event.type == "message_delta":
+                    output_tokens = event.usage.output_tokens
+        except BaseException:
+            # Timed out or failed mid-stream; release the connection
+            await stream.close()
+            raise
+
+        if usage is None:
+            raise LLMResponseError("Failed to parse AI response: stream ended before the message started")
+        if match is None:
+            # Stream finished without a move-first response; fall back to parsing it whole
+            move, reasoning = self._parse_response(text)
+            return _Reply(move, reasoning, text, self._token_usage(usage, output_tokens))
+
+        move = Move(match.group(1).lower())
+        # Output billed so far, roughly; the drain corrects it if the rest is read
+        streamed_tokens = max(output_tokens, len(text) // 4)
+        token_usage = self._token_usage(usage, streamed_tokens)
+
+        # Reasoning that came before the move is already complete
+        early_reasoning = _decode_reasoning(text)
+
+        if not self.capture_reasoning:
+            await stream.close()
+            reply = {"move": move.value.upper()}
+            if early_reasoning is not None:
+                reply["reasoning"] = early_reasoning
+            return _Reply(move, early_reasoning or REASONING_NOT_CAPTURED, json.dumps(reply), token_usage)
+
+        capture = _ReasoningCapture(task=None)
+        capture.task = asyncio.ensure_future(self._drain_stream(events, text, streamed_tokens, capture))
+        return _Reply(move, early_reasoning or REASONING_PENDING, text, token_usage, capture)
+
+    async def _drain_stream(self, events, text: str, streamed_tokens: int, capture: _ReasoningCapture):
+        """Read the rest of a streamed response and fill in its reasoning"""
+        output_tokens = streamed_tokens
+        try:
+            async for event in events:
+                if event.type == "content_block_delta" and _delta_text(event.delta) is not None:
+                    text += _delta_text(event.delta)
+                elif event.type == "message_delta":
+                    output_tokens = event.usage.output_tokens
+        except Exception as e:
+            print(f"Error streaming AI reasoning: {str(e)}")  # Add logging
+
+        try:
+            capture.reasoning = json.loads(text)["reasoning"]
+        except (json.JSONDecodeError, KeyError, TypeError):
+            capture.reasoning = _decode_reasoning(text) or REASONING_NOT_CAPTURED
+        capture.extra_output_tokens = max(0, output_tokens - streamed_tokens)
+        capture.text = text
+        self.total_tokens_used += capture.extra_output_tokens
+        self._apply_reasoning(capture)
+
+    def _apply_reasoning(self, capture: _ReasoningCapture):
+        """Copy drained reasoning into whatever has been recorded for its round"""
+        if capture.reasoning is None:
+            return
+        if capture.assistant_turn is not None:
+            capture.assistant_turn["content"] = capture.text
+        if capture.entry is not None and not capture.entry_patched:
+            capture.entry_patched = True
+            capture.entry["reasoning"] = capture.reasoning
+            usage = capture.entry["token_usage"]
+            usage["completion_tokens"] += capture.extra_output_tokens
+            usage["total_tokens"] += capture.extra_output_tokens
+        if capture.round_result is not None:
+            round_result = capture.round_result
+            if self.is_player1:
+                round_result.player1_reasoning = capture.reasoning
+                player_usage = round_result.player1_token_usage
+            else:
+                round_result.player2_reasoning = capture.reasoning
+                player_usage = round_result.player2_token_usage
+            if not capture.round_patched:
+                capture.round_patched = True
+                for usage in (player_usage, round_result.token_usage):
+                    if usage is not None:
+                        usage.completion_tokens += capture.extra_output_tokens
+                        usage.total_tokens += capture.extra_output_tokens
+
+    def _record_interaction(self, round_number: int, response: AIResponse):
+        super()._record_interaction(round_number, response)
+        capture = self._captures.get(round_number)
+        if capture is not None:
+            capture.entry = self.conversation_history[-1]
+            self._apply_reasoning(capture)
+
+    def add_round(self, round_result: RoundResult):
+        super().add_round(round_result)
+        capture = self._captures.get(round_result.round_number - 1)
+        if capture is not None:
+            capture.round_result = round_result
+            self._apply_reasoning(capture)
+
+    async def drain_reasoning(self):
+        """Wait for reasoning that is still streaming in the background"""
+        tasks = [capture.task for capture in self._captures.values() if not capture.task.done()]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _system_blocks(self) -> List[Dict[str, Any]]:
+        """System prompt as a cacheable block; it never changes during a game"""
+        return [{"type": "text", "text": self.system_prompt, "cache_control": CACHE_CONTROL}]
+
+    def _next_user_message(self, current_round: int) -> Dict[str, str]:
+        """Build the user turn asking for this round's move"""
+        if self.prompt_style == PromptStyle.TRANSCRIPT:
+            return {
+                "role": "user",
+                "content": f"""Current round: {current_round + 1}
+Game history:
+{self._format_history()}
+
+What is your next move? {self._move_reminder()}"""
+            }
+
+        # Only rounds finished since the last turn are reported, so earlier turns stay byte-identical
+        new_rounds = self.history[self._reported_rounds:]
+        if new_rounds:
+            update = self._format_rounds(new_rounds)
+        elif not self._transcript:
+            update = "No previous rounds played."
+        else:
+            update = "No new rounds since your last move."
+        return {
+            "role": "user",
+            "content": f"""{update}
+
+Current round: {current_round + 1}
+What is your next move? {self._move_reminder()}"""
+        }
+
+    def _request_messages(self, user_message: Dict[str, str]) -> List[Dict[str, Any]]:
+        """
+        Messages for a request, with a cache breakpoint on the newest turn
+
+        The next round's request starts with exactly these messages, so it reads
+        them from the provider's prompt cache and only the new turn is uncached.
+        """
+        messages: List[Dict[str, Any]] = list(self._transcript)
+        messages.append({
+            "role": user_message["role"],
+            "content": [{"type": "text", "text": user_message["content"], "cache_control": CACHE_CONTROL}]
+        })
+        return messages
+
+    def _format_rounds(self, rounds: List[RoundResult]) -> str:
+        """Format rounds from this player's point of view in the history encoding"""
+        return encode_rounds(rounds, self.is_player1, self.history_encoding)
 
     def _format_history(self) -> str:
-        """Format game history for the prompt"""
+        """Format game history for the prompt, as much of it as the context policy shows"""
         if not self.history:
             return "No previous rounds played."
-            
-        history_lines = []
-        for round_result in self.history:
-            my_move = round_result.player1_move if self.is_player1 else round_result.player2_move
-            opponent_move = round_result.player2_move if self.is_player1 else round_result.player1_move
-            my_score = round_result.player1_score if self.is_player1 else round_result.player2_score
-            opponent_score = round_result.player2_score if self.is_player1 else round_result.player1_score
-            
-            history_lines.append(
-                f"Round {round_result.round_number}:\n"
-                f"- You played: {my_move.value}\n"
-                f"- Opponent played: {opponent_move.value}\n"
-                f"- Scores: You: {my_score}, Opponent: {opponent_score}"
-            )
-            
-        return "\n".join(history_lines)
\ No newline at end of file
+
+        sections = []
+        summary = self.context_policy.summary()
+        if summary:
+            sections.append(summary)
+        sections.append(self._format_rounds(self.context_policy.visible_rounds(self.history)))
+        return "\n".join(sections)
+
+    def reset(self):
+        """Reset the strategy's state, including the cached conversation"""
+        super().reset()
+        for capture in self._captures.values():
+            capture.task.cancel()
+        self._captures = {}
+        self._transcript = []
+        self._reported_rounds = 0
+        self.parse_failures = 0
+        self.parse_recoveries = 0
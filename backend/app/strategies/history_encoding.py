@@ -0,0 +1,113 @@
+from typing import List, Optional
+from enum import Enum
+import re
+from app.models.types import Move, RoundResult
+
+
+class HistoryEncoding(Enum):
+    """How past rounds are written into an AI's prompt"""
+    VERBOSE = "verbose"  # Four lines of English per round
+    TABLE = "table"  # One table row per round
+    MOVES = "moves"  # Comma-separated move pairs, e.g. "CD,CC,DD"
+
+
+_LETTERS = {Move.COOPERATE: "C", Move.DEFECT: "D"}
+_MOVES_FROM_LETTER = {"C": "cooperate", "D": "defect"}
+
+_TABLE_HEADER = "Round | You | Opponent | Your points | Opponent points"
+
+_VERBOSE_OPPONENT_MOVE = re.compile(r"Opponent played: (cooperate|defect)", re.IGNORECASE)
+_TABLE_ROW = re.compile(r"^\s*\d+ \| ([CD]) \| ([CD]) \|", re.MULTILINE)
+_MOVES_LINE = re.compile(r"Rounds? \d+(?:-\d+)?: ([CD]{2}(?:,[CD]{2})*)")
+
+
+def encoding_legend(encoding: HistoryEncoding) -> Optional[str]:
+    """Explanation of an encoding for the system prompt, or None if it needs none"""
+    if encoding == HistoryEncoding.TABLE:
+        return "Game history is given as a table with one row per round. C means COOPERATE and D means DEFECT."
+    if encoding == HistoryEncoding.MOVES:
+        return (
+            "Game history is given as comma-separated move pairs, oldest first. "
+            "In each pair the first letter is your move and the second is your opponent's; "
+            "C means COOPERATE and D means DEFECT. For example CD means you cooperated and they defected."
+        )
+    return None
+
+
+def _perspective(round_result: RoundResult, is_player1: bool):
+    """(my move, opponent move, my score, opponent score, my total, opponent total) for one player"""
+    if is_player1:
+        return (
+            round_result.player1_move, round_result.player2_move,
+            round_result.player1_score, round_result.player2_score,
+            round_result.cumulative_player1_score, round_result.cumulative_player2_score
+        )
+    return (
+        round_result.player2_move, round_result.player1_move,
+        round_result.player2_score, round_result.player1_score,
+        round_result.cumulative_player2_score, round_result.cumulative_player1_score
+    )
+
+
+def encode_rounds(rounds: List[RoundResult], is_player1: bool, encoding: HistoryEncoding) -> str:
+    """
+    Write rounds from one player's point of view
+
+    Args:
+        rounds: Consecutive rounds, oldest first (must not be empty)
+        is_player1: Whose point of view to write from
+        encoding: The encoding to use
+
+    Returns:
+        str: The rounds as prompt text
+    """
+    if encoding == HistoryEncoding.TABLE:
+        rows = [_TABLE_HEADER]
+        for round_result in rounds:
+            my_move, opponent_move, my_score, opponent_score, _, _ = _perspective(round_result, is_player1)
+            rows.append(
+                f"{round_result.round_number} | {_LETTERS[my_move]} | {_LETTERS[opponent_move]} | {my_score} | {opponent_score}"
+            )
+        return "\n".join(rows)
+
+    if encoding == HistoryEncoding.MOVES:
+        pairs = []
+        for round_result in rounds:
+            my_move, opponent_move, _, _, _, _ = _perspective(round_result, is_player1)
+            pairs.append(_LETTERS[my_move] + _LETTERS[opponent_move])
+        first, last = rounds[0].round_number, rounds[-1].round_number
+        label = f"Round {first}" if first == last else f"Rounds {first}-{last}"
+        _, _, _, _, my_total, opponent_total = _perspective(rounds[-1], is_player1)
+        return f"{label}: {','.join(pairs)}\nTotal scores: You: {my_total}, Opponent: {opponent_total}"
+
+    lines = []
+    for round_result in rounds:
+        my_move, opponent_move, my_score, opponent_score, _, _ = _perspective(round_result, is_player1)
+        lines.append(
+            f"Round {round_result.round_number}:\n"
+            f"- You played: {my_move.value}\n"
+            f"- Opponent played: {opponent_move.value}\n"
+            f"- Scores: You: {my_score}, Opponent: {opponent_score}"
+        )
+    return "\n".join(lines)
+
+
+def decode_opponent_moves(text: str) -> List[str]:
+    """
+    Recover the opponent's moves, oldest first, from history written in any encoding
+
+    Returns:
+        List[str]: "cooperate" or "defect" for each round found
+    """
+    verbose = _VERBOSE_OPPONENT_MOVE.findall(text)
+    if verbose:
+        return [move.lower() for move in verbose]
+
+    rows = _TABLE_ROW.findall(text)
+    if rows:
+        return [_MOVES_FROM_LETTER[opponent] for _, opponent in rows]
+
+    moves = []
+    for pairs in _MOVES_LINE.findall(text):
+        moves.extend(_MOVES_FROM_LETTER[pair[1]] for pair in pairs.split(","))
+    return moves
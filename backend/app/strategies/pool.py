@@ -0,0 +1,54 @@
+from typing import Dict, List, Optional, Tuple
+from collections import defaultdict
+from app.models.types import MatrixType
+from app.strategies import StrategyType, HistoryEncoding, create_strategy
+from app.strategies.base import BaseStrategy
+
+PoolKey = Tuple[StrategyType, bool, Optional[MatrixType]]
+
+
+class StrategyPool:
+    """
+    Reuses strategy instances across games instead of reconstructing them.
+
+    Released strategies are reset() and handed out again by acquire() for the
+    same strategy type, player side and matrix. AI strategies created by the
+    pool write their history in `history_encoding` if one is given.
+    """
+
+    def __init__(self, history_encoding: Optional[HistoryEncoding] = None):
+        self.history_encoding = history_encoding
+        self._free: Dict[PoolKey, List[BaseStrategy]] = defaultdict(list)
+        self._keys: Dict[int, PoolKey] = {}
+
+    def acquire(self, strategy_type: StrategyType, is_player1: bool, matrix_type: Optional[MatrixType] = None) -> BaseStrategy:
+        """
+        Get a fresh strategy, reusing a released one when available
+
+        Args:
+            strategy_type: The type of strategy
+            is_player1: Whether this strategy is for player 1
+            matrix_type: Optional matrix type for strategies that need it
+
+        Returns:
+            BaseStrategy: A strategy with empty history
+        """
+        key = (strategy_type, is_player1, matrix_type)
+        free = self._free[key]
+        strategy = free.pop() if free else create_strategy(
+            strategy_type, is_player1=is_player1, matrix_type=matrix_type, history_encoding=self.history_encoding
+        )
+        self._keys[id(strategy)] = key
+        return strategy
+
+    def release(self, strategy: BaseStrategy):
+        """Reset a strategy and return it to the pool (unknown strategies are ignored)"""
+        key = self._keys.pop(id(strategy), None)
+        if key is None:
+            return
+        strategy.reset()
+        self._free[key].append(strategy)
+
+    def size(self) -> int:
+        """Number of idle strategies held by the pool"""
+        return sum(len(free) for free in self._free.values())
@@ -2,8 +2,9 @@ from typing import Dict, Tuple, Optional, List
 import os
 from dotenv import load_dotenv
 import anthropic
-from time import sleep
 import logging
+from app.strategies.haiku_strategy import DEFAULT_MODEL
+from app.utils.llm_transport import LLMTransportError, get_llm_transport
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -12,6 +13,8 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 CLAUDE_API_KEY = os.getenv("CLAUDE_API_KEY")
+CLAUDE_BASE_URL = os.getenv("CLAUDE_BASE_URL")  # e.g. the local mock LLM server
+MAX_RESPONSE_TOKENS = 150
 
 class AIClientError(Exception):
     """Custom exception for AI client errors"""
@@ -28,8 +31,9 @@ class GameAIClient:
         if not CLAUDE_API_KEY:
             raise AIClientError("CLAUDE_API_KEY not found in environment variables")
         
-        self.client = anthropic.Anthropic(
-            api_key=CLAUDE_API_KEY
+        self.client = anthropic.AsyncAnthropic(
+            api_key=CLAUDE_API_KEY,
+            base_url=CLAUDE_BASE_URL
         )
         # TODO: Figure out Anthropic API
 
@@ -107,19 +111,26 @@ class GameAIClient:
             AIClientError: If unable to get valid move after retries
         """
         prompt = self._create_game_prompt(game_state, history)
-        
-        for attempt in range(self.max_retries):
-            try:
-                response = await self.client.complete(prompt)
-                move, reasoning = self._parse_response(response.content)
-                return move, reasoning
-                
-            except Exception as e:
-                logger.warning(f"Attempt {attempt + 1} failed: {str(e)}")
-                if attempt < self.max_retries - 1:
-                    sleep(self.retry_delay)
-                    continue
-                raise AIClientError(f"Failed to get AI move after {self.max_retries} attempts")
+
+        async def attempt() -> Tuple[str, str]:
+            response = await self.client.messages.create(
+                model=DEFAULT_MODEL,
+                max_tokens=MAX_RESPONSE_TOKENS,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            text = "".join(block.text for block in response.content if getattr(block, "type", None) == "text")
+            return self._parse_response(text)
+
+        # Backoff sleeps are awaited, so retries never stall other games on the loop
+        try:
+            return await get_llm_transport().call(
+                attempt,
+                max_retries=self.max_retries,
+                base_delay=self.retry_delay
+            )
+        except LLMTransportError as e:
+            logger.warning(str(e))
+            raise AIClientError(f"Failed to get AI move after {self.max_retries} attempts") from e
 
     async def reset_context(self):
         """Reset the conversation context with Claude"""
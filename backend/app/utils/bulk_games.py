@@ -0,0 +1,225 @@
+from typing import Any, Callable, Dict, List, Optional
+from dataclasses import dataclass
+import asyncio
+import logging
+import os
+import time
+import numpy as np
+from app.models.game import Game
+from app.models.batch_game import run_batch_games
+from app.models.types import MatrixType, MATRIX_PAYOFFS
+from app.strategies import StrategyType
+from app.strategies.batch import has_batch_kernel
+from app.strategies.pool import StrategyPool
+from app.utils.telemetry import round_usages, summarize_usage
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on games in one bulk request
+MAX_BULK_GAMES = 100000
+
+# Upper bound on rounds in each game of a bulk request
+MAX_BULK_ROUNDS = 1000
+
+
+@dataclass
+class GameSpec:
+    """One kind of game in a bulk run, played `repeat` times"""
+    player1_strategy: StrategyType
+    player2_strategy: StrategyType
+    rounds: int = 10
+    matrix: MatrixType = MatrixType.BASELINE
+    repeat: int = 1
+
+    @property
+    def vectorized(self) -> bool:
+        """Whether every game can be played on the numpy batch engine"""
+        return has_batch_kernel(self.player1_strategy) and has_batch_kernel(self.player2_strategy)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "player1Strategy": self.player1_strategy.value,
+            "player2Strategy": self.player2_strategy.value,
+            "rounds": self.rounds,
+            "matrix": self.matrix.value,
+            "repeat": self.repeat
+        }
+
+
+def parse_game_specs(data: Dict[str, Any]) -> List[GameSpec]:
+    """
+    Validate a bulk request body
+
+    Args:
+        data: {"games": [{player1Strategy, player2Strategy, rounds, matrix}, ...], "repeat": n}
+
+    Returns:
+        List[GameSpec]: One spec per entry, each repeated `repeat` times
+
+    Raises:
+        ValueError: If the body is malformed or asks for too many games
+    """
+    games = data.get("games") if isinstance(data, dict) else None
+    if not isinstance(games, list) or not games:
+        raise ValueError("games must be a non-empty list of game specs")
+    try:
+        repeat = int(data.get("repeat", 1))
+    except (TypeError, ValueError):
+        raise ValueError("repeat must be an integer")
+    if repeat < 1:
+        raise ValueError("repeat must be at least 1")
+
+    specs = []
+    for index, game in enumerate(games):
+        if not isinstance(game, dict):
+            raise ValueError(f"Game spec {index}: must be an object")
+        if "player1Strategy" not in game or "player2Strategy" not in game:
+            raise ValueError(f"Game spec {index}: both player strategies must be specified")
+        try:
+            spec = GameSpec(
+                player1_strategy=StrategyType(game["player1Strategy"]),
+                player2_strategy=StrategyType(game["player2Strategy"]),
+                rounds=int(game.get("rounds", 10)),
+                matrix=MatrixType(game.get("matrix", MatrixType.BASELINE.value)),
+                repeat=repeat
+            )
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Game spec {index}: {str(e)}")
+        if not 1 <= spec.rounds <= MAX_BULK_ROUNDS:
+            raise ValueError(f"Game spec {index}: rounds must be between 1 and {MAX_BULK_ROUNDS}")
+        specs.append(spec)
+
+    total = sum(spec.repeat for spec in specs)
+    if total > MAX_BULK_GAMES:
+        raise ValueError(f"A bulk run is limited to {MAX_BULK_GAMES} games, got {total}")
+    return specs
+
+
+def _spec_summary(spec: GameSpec, scores1: np.ndarray, scores2: np.ndarray, coop1: np.ndarray, coop2: np.ndarray) -> Dict[str, Any]:
+    """Aggregate statistics over one spec's games"""
+    return {
+        **spec.to_dict(),
+        "games": len(scores1),
+        "player1_mean_score": float(scores1.mean()),
+        "player2_mean_score": float(scores2.mean()),
+        "player1_score_std": float(scores1.std()),
+        "player2_score_std": float(scores2.std()),
+        "player1_cooperation_rate": float(coop1.mean()),
+        "player2_cooperation_rate": float(coop2.mean()),
+        "player1_win_rate": float((scores1 > scores2).mean()),
+        "player2_win_rate": float((scores2 > scores1).mean()),
+        "tie_rate": float((scores1 == scores2).mean())
+    }
+
+
+def _spec_details(scores1, scores2, coop1, coop2) -> Dict[str, List]:
+    """Per-game results, one list per column"""
+    return {
+        "player1_scores": np.asarray(scores1).tolist(),
+        "player2_scores": np.asarray(scores2).tolist(),
+        "player1_cooperation_rates": np.asarray(coop1).tolist(),
+        "player2_cooperation_rates": np.asarray(coop2).tolist()
+    }
+
+
+class BulkGameRunner:
+    """
+    Plays every game of a bulk request server-side
+
+    Specs between classical strategies run on the vectorized batch engine
+    (off the event loop, since it is CPU-bound). Specs with an AI player
+    run as ordinary games, up to `concurrency` at once, reusing strategies
+    through a StrategyPool.
+    """
+
+    def __init__(self, specs: List[GameSpec], seed: Optional[int] = None, concurrency: Optional[int] = None):
+        self.specs = specs
+        self.seed = seed
+        self.concurrency = concurrency or int(os.getenv("BULK_GAME_CONCURRENCY", 8))
+        self.progress_callback: Optional[Callable[[int, int], None]] = None
+        self._usages = []
+
+    def set_progress_callback(self, callback: Callable[[int, int], None]):
+        """callback(rounds_played, tokens_used) is called as games finish"""
+        self.progress_callback = callback
+
+    @property
+    def total_rounds(self) -> int:
+        return sum(spec.repeat * spec.rounds for spec in self.specs)
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Play all specs
+
+        Returns:
+            Dict: {"summary": aggregate statistics, "specs": per-spec details}
+        """
+        started = time.perf_counter()
+        rng = np.random.default_rng(self.seed)
+        summaries = []
+        details = []
+        for spec in self.specs:
+            if spec.vectorized:
+                seed = int(rng.integers(2 ** 32))
+                columns = await asyncio.to_thread(self._run_vectorized, spec, seed)
+            else:
+                columns = await self._run_games(spec)
+            summaries.append(_spec_summary(spec, *columns))
+            details.append(_spec_details(*columns))
+
+        wall_seconds = time.perf_counter() - started
+        games = sum(summary["games"] for summary in summaries)
+        summary = {
+            "games": games,
+            "rounds": self.total_rounds,
+            "wall_seconds": wall_seconds,
+            "games_per_second": games / wall_seconds if wall_seconds > 0 else 0.0,
+            "specs": summaries
+        }
+        if self._usages:
+            summary["usage"] = summarize_usage(self._usages, self.total_rounds, wall_seconds).to_dict()
+        return {"summary": summary, "specs": details}
+
+    def _run_vectorized(self, spec: GameSpec, seed: int):
+        result = run_batch_games(
+            spec.player1_strategy, spec.player2_strategy,
+            num_games=spec.repeat, num_rounds=spec.rounds, matrix_type=spec.matrix, seed=seed
+        )
+        self._report(spec.repeat * spec.rounds, 0)
+        return (
+            result.player1_scores, result.player2_scores,
+            result.player1_cooperation_rate, result.player2_cooperation_rate
+        )
+
+    async def _run_games(self, spec: GameSpec):
+        pool = StrategyPool()
+        results = [None] * spec.repeat
+        indices = iter(range(spec.repeat))
+
+        async def play():
+            player1 = pool.acquire(spec.player1_strategy, True, spec.matrix)
+            player2 = pool.acquire(spec.player2_strategy, False, spec.matrix)
+            try:
+                game = Game(player1, player2, max_rounds=spec.rounds, payoff_matrix=MATRIX_PAYOFFS[spec.matrix])
+                rounds = await game.run_all_rounds()
+                usages = round_usages(rounds, game.player1_model, game.player2_model)
+                self._usages.extend(usages)
+                self._report(len(rounds), sum(usage.total_tokens for usage, _ in usages))
+                coop1 = sum(r.player1_move.value == "cooperate" for r in rounds) / len(rounds)
+                coop2 = sum(r.player2_move.value == "cooperate" for r in rounds) / len(rounds)
+                return game.player1_total_score, game.player2_total_score, coop1, coop2
+            finally:
+                pool.release(player1)
+                pool.release(player2)
+
+        async def worker():
+            # Workers share one iterator, so only `concurrency` games exist at any time
+            for index in indices:
+                results[index] = await play()
+
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, spec.repeat))))
+        return tuple(np.array(column) for column in zip(*results))
+
+    def _report(self, rounds: int, tokens: int):
+        if self.progress_callback:
+            self.progress_callback(rounds, tokens)
@@ -0,0 +1,91 @@
+from typing import Dict, Tuple, Optional, List
+import asyncio
+import logging
+import os
+import threading
+import weakref
+import anthropic
+from app.utils.llm_cache import CacheMode, get_cache_mode, wrap_client
+
+logger = logging.getLogger(__name__)
+
+ClientKey = Tuple[str, str]  # (api_key, model)
+
+# httpx connection pools are bound to the event loop they were first used on,
+# so clients are shared per loop. Entries go away with their loop.
+_loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[ClientKey, anthropic.AsyncAnthropic]]" = weakref.WeakKeyDictionary()
+_no_loop_clients: Dict[ClientKey, anthropic.AsyncAnthropic] = {}
+_lock = threading.Lock()
+
+
+def _current_clients() -> Dict[ClientKey, anthropic.AsyncAnthropic]:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return _no_loop_clients
+    clients = _loop_clients.get(loop)
+    if clients is None:
+        clients = {}
+        _loop_clients[loop] = clients
+    return clients
+
+
+def get_client(api_key: str, model: str) -> anthropic.AsyncAnthropic:
+    """
+    Get the shared AsyncAnthropic client for an API key and model
+
+    Clients are reused across strategies and games running on the same event loop,
+    so each loop keeps one connection pool per key instead of one per strategy.
+    When an LLM cache mode is configured the client is wrapped by the cache.
+    CLAUDE_BASE_URL points clients at another endpoint, e.g. the mock LLM server.
+
+    Args:
+        api_key: The Anthropic API key
+        model: The model the client is used for
+
+    Returns:
+        anthropic.AsyncAnthropic: A shared client
+    """
+    key = (api_key, model)
+    with _lock:
+        clients = _current_clients()
+        client = clients.get(key)
+        if client is None:
+            # Retries and 429 back-off are handled by AIStrategy and the shared rate limiter
+            client = wrap_client(anthropic.AsyncAnthropic(
+                api_key=api_key,
+                base_url=os.getenv("CLAUDE_BASE_URL"),
+                max_retries=0
+            ))
+            clients[key] = client
+        return client
+
+
+async def warm_client_pool(api_key: str, models: List[str]):
+    """
+    Create clients for the current event loop and open their connections
+
+    A models.list() call costs no tokens but completes DNS, TCP and TLS setup,
+    so the first game does not pay for it.
+
+    Args:
+        api_key: The Anthropic API key
+        models: Models that will be used on this loop
+    """
+    if get_cache_mode() == CacheMode.REPLAY:
+        return  # Replays never touch the network
+    for model in models:
+        client = get_client(api_key, model)
+        try:
+            await client.models.list(limit=1)
+        except Exception as e:
+            logger.warning(f"Could not warm client for {model}: {str(e)}")
+
+
+def clear_client_pool(loop: Optional[asyncio.AbstractEventLoop] = None):
+    """Drop pooled clients for a loop (or those created outside any loop)"""
+    with _lock:
+        if loop is None:
+            _no_loop_clients.clear()
+        else:
+            _loop_clients.pop(loop, None)
@@ -1,15 +1,24 @@
 from typing import List, Optional, Dict, Tuple
 from datetime import datetime
 import asyncio
+import time
 import uuid
 import logging
 from dataclasses import dataclass
 
 # Local imports
-from app.models.types import MatrixType, Move, PayoffMatrix, MATRIX_PAYOFFS
+from app.models.types import MatrixType, Move, PayoffMatrix, RoundResult, MATRIX_PAYOFFS
 from app.models.game import Game
-from app.strategies import create_strategy, StrategyType
-from app.utils.experiment_storage import ExperimentStorage, ExperimentResult, ExperimentMetrics, GameResult
+from app.strategies import StrategyType, HistoryEncoding
+from app.strategies.pool import StrategyPool
+from app.utils.experiment_storage import (
+    ExperimentStorage, ExperimentResult, ExperimentMetrics, GameResult, AnalyticalResult,
+    total_games, total_rounds, average_score
+)
+from app.utils.markov_solver import is_memory_one, solve_strategies
+from app.utils.lockstep import LockstepScheduler, create_batch_backend
+from app.utils.telemetry import round_usages, summarize_usage
+from app.utils.llm_scheduler import Priority, work_class
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +28,13 @@ class ExperimentConfig:
     num_games: int = 100
     num_rounds: int = 10
     strategies_to_test: List[StrategyType] = None
+    player1_strategy: StrategyType = StrategyType.CLAUDE_HAIKU
+    analytical: bool = False  # Solve memory-one pairings exactly instead of simulating
+    concurrency: int = 1  # Maximum number of games in flight at once
+    lockstep: bool = False  # Advance all games a round at a time, batching each round's LLM calls
+    batch_backend: str = "concurrent"  # Backend for lockstep waves: concurrent or message_batches
+    history_encoding: Optional[HistoryEncoding] = None  # How AI players see the history; None uses CLAUDE_HISTORY_ENCODING
+    scheduling_weight: float = 1.0  # Share of batch LLM capacity relative to other running experiments
     
     def __post_init__(self):
         if self.strategies_to_test is None:
@@ -38,20 +54,30 @@ class ExperimentRunner:
         self.storage = storage
         self.payoff_matrix = MATRIX_PAYOFFS[config.matrix_type]
         self.experiment_id = str(uuid.uuid4())
+        self.strategy_pool = StrategyPool(history_encoding=config.history_encoding)
         self.start_time = None
         self.end_time = None
+        # (usage, model) for every AI move so far, for the experiment's usage summary
+        self._usages = []
 
     def set_progress_callback(self, callback):
         self.progress_callback = callback
         
     async def run_full_experiment(self) -> ExperimentResult:
         """Run complete experiment testing AI against all specified strategies"""
+        # Experiments are batch work: interactive games go first, and concurrent
+        # experiments share what's left by weight
+        with work_class(Priority.BATCH, flow=self.experiment_id, weight=self.config.scheduling_weight):
+            return await self._run_full_experiment()
+
+    async def _run_full_experiment(self) -> ExperimentResult:
         self.start_time = datetime.now()
         
         print(f"\nStarting test run at {datetime.now().strftime('%H:%M:%S')}")
         logger.info(f"Starting experiment {self.experiment_id} with matrix {self.config.matrix_type}")
         
         all_games: List[GameResult] = []
+        analytical_results: List[AnalyticalResult] = []
         
         # Test AI against each strategy
         for opponent_strategy in self.config.strategies_to_test:
@@ -60,26 +86,29 @@ class ExperimentRunner:
             try:
                 # For LLM vs LLM, both players use Claude
                 if opponent_strategy == StrategyType.CLAUDE_HAIKU:
-                    games = await self._run_llm_vs_llm_games()
+                    all_games.extend(await self._run_llm_vs_llm_games())
+                elif self._can_solve_analytically(opponent_strategy):
+                    analytical_results.append(self._run_analytical_games(opponent_strategy))
                 else:
-                    games = await self._run_strategy_games(opponent_strategy)
-                
-                all_games.extend(games)
+                    all_games.extend(await self._run_strategy_games(opponent_strategy))
                 
                 # Save intermediate results after each strategy
                 self.end_time = datetime.now()
-                intermediate_metrics = self._calculate_experiment_metrics(all_games)
+                intermediate_metrics = self._calculate_experiment_metrics(all_games, analytical_results)
+                intermediate_usage = self._experiment_usage(all_games)
                 
                 intermediate_result = ExperimentResult(
                     experiment_id=self.experiment_id,
                     matrix_type=self.config.matrix_type.value,
-                    player1_strategy="claude_haiku",
+                    player1_strategy=self.config.player1_strategy.value,
                     player2_strategy="multiple",
                     payoff_matrix=self.payoff_matrix,
                     start_time=self.start_time,
                     end_time=self.end_time,
                     games=all_games,
-                    metrics=intermediate_metrics
+                    metrics=intermediate_metrics,
+                    usage=intermediate_usage,
+                    analytical_results=list(analytical_results)
                 )
                 
                 # Save intermediate results
@@ -95,19 +124,22 @@ class ExperimentRunner:
         self.end_time = datetime.now()
         
         # Calculate final metrics
-        metrics = self._calculate_experiment_metrics(all_games)
+        metrics = self._calculate_experiment_metrics(all_games, analytical_results)
+        usage = self._experiment_usage(all_games)
         
         # Create final experiment result
         result = ExperimentResult(
             experiment_id=self.experiment_id,
             matrix_type=self.config.matrix_type.value,
-            player1_strategy="claude_haiku",
+            player1_strategy=self.config.player1_strategy.value,
             player2_strategy="multiple",
             payoff_matrix=self.payoff_matrix,
             start_time=self.start_time,
             end_time=self.end_time,
             games=all_games,
-            metrics=metrics
+            metrics=metrics,
+            usage=usage,
+            analytical_results=analytical_results
         )
         
         # Final save
@@ -118,119 +150,237 @@ class ExperimentRunner:
         
     async def _run_strategy_games(self, opponent_strategy: StrategyType) -> List[GameResult]:
         """Run batch of games against a specific strategy"""
-        games: List[GameResult] = []
-
         print(f"\nStarting games against {opponent_strategy.value}")  # Add logging
-        
-        for game_num in range(self.config.num_games):
-            print(f"\nStarting game {game_num + 1}")  # Add logging
-            
-            # Create strategies
-            ai_strategy = create_strategy(StrategyType.CLAUDE_HAIKU, is_player1=True)
-            opponent = create_strategy(
-                opponent_strategy, 
-                is_player1=False,
-                matrix_type=self.config.matrix_type  # Add matrix_type for OptimalStrategy
-            )
-            
-            # Create and run game
-            game = Game(
-                player1_strategy=ai_strategy,
-                player2_strategy=opponent,
-                max_rounds=self.config.num_rounds,
-                payoff_matrix=self.payoff_matrix
-            )
-
-            if hasattr(self, 'progress_callback'):
-                self.progress_callback(opponent_strategy.value, game_num + 1, game.current_round)
-            
-            try:
-                game_result = await self._run_single_game(game)
-                games.append(game_result)
-                print(f"Completed game {game_num + 1}")  # Add logging
-            except Exception as e:
-                print(f"Error in game {game_num + 1}: {str(e)}")  # Add logging
-                raise
-            
+        games = await self._run_games(opponent_strategy.value, self.config.player1_strategy, opponent_strategy)
         print(f"Completed all games against {opponent_strategy.value}")  # Add logging
         return games
             
     async def _run_llm_vs_llm_games(self) -> List[GameResult]:
         """Run batch of games with LLM playing against itself"""
-        games: List[GameResult] = []
-        
-        for game_num in range(self.config.num_games):
-            # Create two AI strategies
-            ai_player1 = create_strategy(
-                StrategyType.CLAUDE_HAIKU, 
-                is_player1=True,
-                matrix_type=self.config.matrix_type
-            )
-            ai_player2 = create_strategy(
-                StrategyType.CLAUDE_HAIKU, 
-                is_player1=False,
-                matrix_type=self.config.matrix_type
-            )
-            
-            game = Game(
-                player1_strategy=ai_player1,
-                player2_strategy=ai_player2,
+        return await self._run_games(StrategyType.CLAUDE_HAIKU.value, StrategyType.CLAUDE_HAIKU, StrategyType.CLAUDE_HAIKU)
+
+    async def _run_games(self, label: str, player1_type: StrategyType, player2_type: StrategyType) -> List[GameResult]:
+        """
+        Run config.num_games independent games, at most config.concurrency at a time.
+
+        Strategies are taken from the strategy pool and returned to it after each game.
+        Results are returned in game order regardless of which game finishes first.
+        If any game fails, the games still running are cancelled and the error is raised.
+        """
+        if self.config.lockstep:
+            return await self._run_lockstep_games(label, player1_type, player2_type)
+
+        semaphore = asyncio.Semaphore(max(1, self.config.concurrency))
+        completed = 0
+        in_flight = 0
+
+        async def run_one(game_num: int) -> GameResult:
+            nonlocal completed, in_flight
+            async with semaphore:
+                # Reuse strategies from earlier games where possible
+                player1 = self.strategy_pool.acquire(player1_type, is_player1=True, matrix_type=self.config.matrix_type)
+                player2 = self.strategy_pool.acquire(player2_type, is_player1=False, matrix_type=self.config.matrix_type)
+                game = Game(
+                    player1_strategy=player1,
+                    player2_strategy=player2,
+                    max_rounds=self.config.num_rounds,
+                    payoff_matrix=self.payoff_matrix
+                )
+                in_flight += 1
+                self._report_progress(label, completed, in_flight)
+                print(f"\nStarting game {game_num + 1}")  # Add logging
+                try:
+                    game_result = await self._run_single_game(game)
+                except Exception as e:
+                    print(f"Error in game {game_num + 1}: {str(e)}")  # Add logging
+                    raise
+                finally:
+                    in_flight -= 1
+                    self.strategy_pool.release(player1)
+                    self.strategy_pool.release(player2)
+                completed += 1
+                print(f"Completed game {game_num + 1}")  # Add logging
+                self._report_progress(label, completed, in_flight)
+                return game_result
+
+        tasks = [asyncio.ensure_future(run_one(game_num)) for game_num in range(self.config.num_games)]
+        try:
+            return list(await asyncio.gather(*tasks))
+        except Exception:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def _run_lockstep_games(self, label: str, player1_type: StrategyType, player2_type: StrategyType) -> List[GameResult]:
+        """
+        Run config.num_games games in lockstep, one round of every game per wave.
+
+        Each wave's LLM requests are sent together through the configured batch
+        backend. Results are returned in game order.
+        """
+        games = []
+        for _ in range(self.config.num_games):
+            games.append(Game(
+                player1_strategy=self.strategy_pool.acquire(player1_type, is_player1=True, matrix_type=self.config.matrix_type),
+                player2_strategy=self.strategy_pool.acquire(player2_type, is_player1=False, matrix_type=self.config.matrix_type),
                 max_rounds=self.config.num_rounds,
                 payoff_matrix=self.payoff_matrix
-            )
-            
-            game_result = await self._run_single_game(game)
-            games.append(game_result)
-            
-        return games
+            ))
+
+        print(f"\nStarting {len(games)} games in lockstep")  # Add logging
+        self._report_progress(label, 0, len(games))
+        scheduler = LockstepScheduler(games, create_batch_backend(self.config.batch_backend))
+        started = time.perf_counter()
+        try:
+            rounds = await scheduler.run()
+            # The games share their wall time
+            wall_seconds = time.perf_counter() - started
+            results = [
+                self._game_result(game, game_rounds, wall_seconds=wall_seconds)
+                for game, game_rounds in zip(games, rounds)
+            ]
+        finally:
+            for game in games:
+                self.strategy_pool.release(game.player1_strategy)
+                self.strategy_pool.release(game.player2_strategy)
+        print(f"Completed {len(games)} games in {scheduler.waves} waves")  # Add logging
+        self._report_progress(label, len(games), 0)
+        return results
+
+    def _report_progress(self, label: str, completed: int, in_flight: int):
+        """Report (strategy, games completed, games in flight) to the progress callback"""
+        if hasattr(self, 'progress_callback'):
+            self.progress_callback(label, completed, in_flight)
     
+    def _can_solve_analytically(self, opponent_strategy: StrategyType) -> bool:
+        """Check whether a pairing can be solved exactly instead of simulated"""
+        return (
+            self.config.analytical
+            and is_memory_one(self.config.player1_strategy)
+            and is_memory_one(opponent_strategy)
+        )
+
+    def _run_analytical_games(self, opponent_strategy: StrategyType) -> AnalyticalResult:
+        """
+        Solve a pairing of memory-one strategies exactly.
+
+        Returns the expected scores and cooperation rate, which is what averaging
+        infinitely many simulated games converges to. The result stands in for
+        config.num_games games in the experiment metrics.
+        """
+        print(f"\nSolving {self.config.player1_strategy.value} vs {opponent_strategy.value} analytically")
+
+        solution = solve_strategies(
+            self.config.player1_strategy,
+            opponent_strategy,
+            matrix_type=self.config.matrix_type,
+            max_rounds=self.config.num_rounds,
+            payoff_matrix=self.payoff_matrix
+        )
+
+        return AnalyticalResult(
+            opponent_strategy=opponent_strategy.value,
+            expected_scores=solution.expected_scores,
+            cooperation_rate=solution.cooperation_rate,
+            total_rounds=self.config.num_rounds,
+            num_games=self.config.num_games
+        )
+
     async def _run_single_game(self, game: Game) -> GameResult:
         """Run a single game to completion and return results"""
         game_id = str(uuid.uuid4())
         
         try:
+            started = time.perf_counter()
             results = await game.run_all_rounds()
-            
-            # Calculate cooperation rate
-            p1_coop_moves = sum(1 for r in results if r.player1_move == Move.COOPERATE)
-            p2_coop_moves = sum(1 for r in results if r.player2_move == Move.COOPERATE)
-            avg_coop_rate = (p1_coop_moves + p2_coop_moves) / (2 * len(results))
-            
-            return GameResult(
-                game_id=game_id,
-                rounds=results,
-                final_scores=(game.player1_total_score, game.player2_total_score),
-                cooperation_rate=avg_coop_rate,
-                total_rounds=len(results)
-            )
+            return self._game_result(game, results, game_id, wall_seconds=time.perf_counter() - started)
             
         except Exception as e:
             logger.error(f"Error in game {game_id}: {str(e)}")
             raise
+
+    def _game_result(
+        self,
+        game: Game,
+        results: List[RoundResult],
+        game_id: Optional[str] = None,
+        wall_seconds: float = 0.0
+    ) -> GameResult:
+        """Summarize a finished game"""
+        # Calculate cooperation rate
+        p1_coop_moves = sum(1 for r in results if r.player1_move == Move.COOPERATE)
+        p2_coop_moves = sum(1 for r in results if r.player2_move == Move.COOPERATE)
+        avg_coop_rate = (p1_coop_moves + p2_coop_moves) / (2 * len(results))
+
+        usage = None
+        usages = round_usages(
+            results, getattr(game, 'player1_model', None), getattr(game, 'player2_model', None)
+        )
+        if usages:
+            self._usages.extend(usages)
+            usage = summarize_usage(usages, len(results), wall_seconds)
+        
+        return GameResult(
+            game_id=game_id or str(uuid.uuid4()),
+            rounds=results,
+            final_scores=(game.player1_total_score, game.player2_total_score),
+            cooperation_rate=avg_coop_rate,
+            total_rounds=len(results),
+            usage=usage
+        )
+
+    def _experiment_usage(self, games: List[GameResult]):
+        """Usage summary over every AI move so far, or None without AI games"""
+        if not self._usages:
+            return None
+        wall_seconds = ((self.end_time or datetime.now()) - self.start_time).total_seconds()
+        return summarize_usage(self._usages, sum(g.total_rounds for g in games), wall_seconds)
     
-    def _calculate_experiment_metrics(self, games: List[GameResult]) -> ExperimentMetrics:
-        """Calculate aggregate metrics across all games"""
-        total_games = len(games)
-        if total_games == 0:
+    def _calculate_experiment_metrics(
+        self,
+        games: List[GameResult],
+        analytical_results: Optional[List[AnalyticalResult]] = None
+    ) -> ExperimentMetrics:
+        """
+        Calculate aggregate metrics across all games
+
+        Each analytical result counts as the num_games games it replaces.
+        """
+        analytical_results = analytical_results or []
+        game_count = total_games(games, analytical_results)
+        if game_count == 0:
             raise ValueError("No games to analyze")
             
         # Calculate average cooperation rate
-        avg_coop_rate = sum(g.cooperation_rate for g in games) / total_games
+        avg_coop_rate = (
+            sum(g.cooperation_rate for g in games)
+            + sum(a.cooperation_rate * a.num_games for a in analytical_results)
+        ) / game_count
         
         # Calculate average score difference from optimal
         optimal_score = self.payoff_matrix.optimal_strategy.expected_score_per_round[0]
-        actual_scores = [g.final_scores[0]/g.total_rounds for g in games]
-        avg_score_diff = sum(optimal_score - score for score in actual_scores) / total_games
+        score_diffs = [optimal_score - g.final_scores[0]/g.total_rounds for g in games]
+        score_diffs += [
+            (optimal_score - a.expected_scores[0]/a.total_rounds) * a.num_games
+            for a in analytical_results
+        ]
+        avg_score_diff = sum(score_diffs) / game_count
         
-        # Calculate "learning rate" - change in cooperation over time
-        early_coop = sum(g.cooperation_rate for g in games[:total_games//2]) / (total_games//2)
-        late_coop = sum(g.cooperation_rate for g in games[total_games//2:]) / (total_games - total_games//2)
-        learning_rate = late_coop - early_coop
+        # Calculate "learning rate" - change in cooperation over time. Solved
+        # pairings have no order, so only simulated games count
+        simulated = len(games)
+        if simulated < 2:
+            learning_rate = 0.0
+        else:
+            early_coop = sum(g.cooperation_rate for g in games[:simulated//2]) / (simulated//2)
+            late_coop = sum(g.cooperation_rate for g in games[simulated//2:]) / (simulated - simulated//2)
+            learning_rate = late_coop - early_coop
         
         return ExperimentMetrics(
             cooperation_rate=avg_coop_rate,
             points_below_optimal=avg_score_diff,
             learning_rate=learning_rate,
-            avg_score=sum(g.final_scores[0] for g in games) / total_games,
-            total_rounds=sum(g.total_rounds for g in games)
+            avg_score=average_score(games, analytical_results),
+            total_rounds=total_rounds(games, analytical_results)
         )
\ No newline at end of file
@@ -1,15 +1,17 @@
 from pathlib import Path
+import json
 import sqlite3
 from typing import Optional, List, Dict, Tuple
 from datetime import datetime
 import pandas as pd
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 
 # Local imports
 from app.models.types import (
     PayoffMatrix, Move, RoundResult, OptimalStrategy,
     ExperimentMetrics, GameResult, ExperimentResult
 )
+from app.utils.telemetry import UsageSummary
 
 @dataclass
 class ExperimentMetrics:
@@ -26,6 +28,16 @@ class GameResult:
     final_scores: Tuple[int, int]
     cooperation_rate: float
     total_rounds: int
+    usage: Optional[UsageSummary] = None  # Set for games with an AI player
+
+@dataclass
+class AnalyticalResult:
+    """Exact expectation for a pairing that was solved instead of simulated"""
+    opponent_strategy: str
+    expected_scores: Tuple[float, float]
+    cooperation_rate: float
+    total_rounds: int  # Rounds per game
+    num_games: int  # Simulated games the expectation stands in for
 
 @dataclass
 class ExperimentResult:
@@ -38,6 +50,32 @@ class ExperimentResult:
     end_time: datetime
     games: List[GameResult]
     metrics: ExperimentMetrics
+    usage: Optional[UsageSummary] = None  # Token, latency and cost totals over all AI moves
+    analytical_results: List[AnalyticalResult] = field(default_factory=list)  # Pairings solved exactly
+
+
+def total_games(games: List[GameResult], analytical_results: List[AnalyticalResult]) -> int:
+    """Number of games played, counting each solved pairing as the games it replaces"""
+    return len(games) + sum(a.num_games for a in analytical_results)
+
+
+def total_rounds(games: List[GameResult], analytical_results: List[AnalyticalResult]) -> int:
+    """Number of rounds played, counting each solved pairing as the games it replaces"""
+    return (
+        sum(g.total_rounds for g in games)
+        + sum(a.total_rounds * a.num_games for a in analytical_results)
+    )
+
+
+def average_score(games: List[GameResult], analytical_results: List[AnalyticalResult]) -> float:
+    """Player 1's average final score, weighting each solved pairing by the games it replaces"""
+    count = total_games(games, analytical_results)
+    if count == 0:
+        return 0.0
+    return (
+        sum(g.final_scores[0] for g in games)
+        + sum(a.expected_scores[0] * a.num_games for a in analytical_results)
+    ) / count
 
 
 class ExperimentStorage:
@@ -107,7 +145,7 @@ class ExperimentStorage:
                     str(experiment_result.payoff_matrix),  # Ensure this is a string if necessary
                     experiment_result.start_time,
                     experiment_result.end_time,
-                    len(experiment_result.games),  # Assuming you want to store the number of games
+                    total_games(experiment_result.games, experiment_result.analytical_results),
                     experiment_result.metrics.cooperation_rate,
                     experiment_result.metrics.points_below_optimal,
                     experiment_result.metrics.learning_rate
@@ -119,6 +157,23 @@ class ExperimentStorage:
         csv_path = self.csv_dir / f"{experiment_result.experiment_id}_games.csv"
         games_df.to_csv(csv_path, index=False)
 
+        # Solved pairings have no rounds, so they don't fit the games CSV
+        analytical_path = self.csv_dir / f"{experiment_result.experiment_id}_analytical.json"
+        if experiment_result.analytical_results:
+            analytical_path.write_text(json.dumps(
+                [asdict(result) for result in experiment_result.analytical_results], indent=2
+            ))
+
+        if experiment_result.usage is not None:
+            usage_path = self.csv_dir / f"{experiment_result.experiment_id}_usage.json"
+            usage_path.write_text(json.dumps({
+                "experiment": experiment_result.usage.to_dict(),
+                "games": {
+                    game.game_id: game.usage.to_dict()
+                    for game in experiment_result.games if game.usage is not None
+                }
+            }, indent=2))
+
     def _games_to_dataframe(self, result: ExperimentResult) -> pd.DataFrame:
         """Convert game results to pandas DataFrame for analysis"""
         rows = []
@@ -136,10 +191,18 @@ class ExperimentStorage:
                     'cumulative_player1_score': round.cumulative_player1_score,
                     'cumulative_player2_score': round.cumulative_player2_score,
                     'player1_reasoning': round.player1_reasoning,
-                    'player2_reasoning': round.player2_reasoning
+                    'player2_reasoning': round.player2_reasoning,
+                    **self._usage_columns('player1', round.player1_token_usage),
+                    **self._usage_columns('player2', round.player2_token_usage)
                 })
         return pd.DataFrame(rows)
 
+    @staticmethod
+    def _usage_columns(player: str, usage) -> Dict:
+        """Per-round usage columns for one player (empty for non-AI players)"""
+        fields = ['prompt_tokens', 'completion_tokens', 'cache_read_tokens', 'cache_creation_tokens', 'latency_seconds', 'retries']
+        return {f'{player}_{field}': getattr(usage, field) if usage is not None else None for field in fields}
+
     def get_experiment_results(self, experiment_id: str) -> Optional[ExperimentResult]:
         """Retrieve full experiment results"""
         # Get metadata from SQLite
@@ -151,22 +214,36 @@ class ExperimentStorage:
 
         # Get detailed game data from CSV
         csv_path = self.csv_dir / f"{experiment_id}_games.csv"
-        games_df = pd.read_csv(csv_path)
+        try:
+            games_df = pd.read_csv(csv_path)
+        except pd.errors.EmptyDataError:
+            # Every pairing was solved analytically
+            games_df = pd.DataFrame(columns=['game_id'])
+
+        analytical_results = []
+        analytical_path = self.csv_dir / f"{experiment_id}_analytical.json"
+        if analytical_path.exists():
+            analytical_results = [
+                AnalyticalResult(**{**result, 'expected_scores': tuple(result['expected_scores'])})
+                for result in json.loads(analytical_path.read_text())
+            ]
         
-        return self._construct_experiment_result(metadata, games_df)
+        return self._construct_experiment_result(metadata, games_df, analytical_results)
 
     def get_experiments_summary(self) -> pd.DataFrame:
         """Get summary of all experiments"""
         return pd.read_sql("SELECT * FROM experiments", self.connection)
     
-    def _construct_experiment_result(self, metadata, games_df) -> ExperimentResult:
+    def _construct_experiment_result(self, metadata, games_df, analytical_results=None) -> ExperimentResult:
         """
         Construct ExperimentResult from database metadata and games DataFrame
         
         Args:
             metadata: Row tuple from SQLite experiments table
             games_df: DataFrame containing detailed game data
+            analytical_results: Pairings that were solved instead of simulated
         """
+        analytical_results = analytical_results or []
         # Convert metadata row to dict for easier access
         meta_dict = {
             "experiment_id": metadata[0],
@@ -228,8 +305,8 @@ class ExperimentStorage:
             cooperation_rate=meta_dict['cooperation_rate'],
             points_below_optimal=meta_dict['points_below_optimal'],
             learning_rate=meta_dict['learning_rate'],
-            avg_score=sum(g.final_scores[0] for g in games) / len(games),
-            total_rounds=sum(g.total_rounds for g in games)
+            avg_score=average_score(games, analytical_results),
+            total_rounds=total_rounds(games, analytical_results)
         )
         
         return ExperimentResult(
@@ -241,5 +318,6 @@ class ExperimentStorage:
             start_time=meta_dict['start_time'],
             end_time=meta_dict['end_time'],
             games=games,
-            metrics=metrics
+            metrics=metrics,
+            analytical_results=analytical_results
         )
\ No newline at end of file
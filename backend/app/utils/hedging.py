@@ -0,0 +1,209 @@
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+from collections import deque
+import asyncio
+import logging
+import threading
+import time
+from app.utils.telemetry import percentile
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """
+    Rolling window of observed request latencies
+
+    Guarded by a threading lock so one tracker can be shared by strategies
+    running on different event loops.
+    """
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency at quantile q (0-1) of the window (nearest rank), or None with no samples"""
+        with self._lock:
+            samples = list(self._samples)
+        return percentile(samples, q)
+
+
+class HedgePolicy:
+    """
+    When to send a duplicate of a slow request
+
+    A hedge is sent once a request has been outstanding longer than the given
+    percentile of recent latencies. Nothing is hedged until `min_samples`
+    latencies have been observed, and at most `max_hedge_fraction` of requests
+    are hedged so a provider-wide slowdown cannot double the load.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        min_samples: int = 20,
+        min_delay: float = 0.05,
+        max_hedge_fraction: float = 0.1,
+        tracker: Optional[LatencyTracker] = None
+    ):
+        if not 0 < percentile < 1:
+            raise ValueError("percentile must be between 0 and 1")
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_hedge_fraction = max_hedge_fraction
+        self.tracker = tracker or LatencyTracker()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {
+            "requests": 0,
+            "hedges_sent": 0,
+            "hedges_won": 0,
+            "hedges_skipped": 0,
+            "losers_cancelled": 0
+        }
+
+    def _count(self, key: str, amount: float = 1):
+        with self._lock:
+            self._counters[key] += amount
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None if requests shouldn't be hedged yet"""
+        if len(self.tracker) < self.min_samples:
+            return None
+        return max(self.min_delay, self.tracker.percentile(self.percentile))
+
+    def _may_hedge(self) -> bool:
+        """Whether another hedge fits in the hedge budget"""
+        with self._lock:
+            allowed = self._counters["hedges_sent"] < self.max_hedge_fraction * self._counters["requests"]
+            if not allowed:
+                self._counters["hedges_skipped"] += 1
+            return allowed
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of hedging counters and the current hedge delay"""
+        with self._lock:
+            stats = dict(self._counters)
+        stats["latency_samples"] = len(self.tracker)
+        stats["hedge_delay"] = self.hedge_delay()
+        return stats
+
+    async def run(
+        self,
+        request: Callable[[], Awaitable[T]],
+        discard: Optional[Callable[[Optional[T]], None]] = None,
+        hedge: Optional[Callable[[], Optional[Awaitable[T]]]] = None
+    ) -> T:
+        """
+        Run a request, racing a duplicate against it if it is slow
+
+        The first copy to succeed wins and the other is cancelled. If one copy
+        fails the other is still awaited; the request only fails if both do.
+
+        Args:
+            request: Starts one copy of the request; called twice when hedging
+            discard: Called once for the losing copy, with its result if it
+                finished or None if it was cancelled, so its cost can be counted
+            hedge: Starts the duplicate instead of `request`, or returns None
+                if it can't be sent right now (e.g. no rate-limiter slot is free),
+                in which case the request is not hedged
+
+        Returns:
+            The winning copy's result
+        """
+        self._count("requests")
+        started = time.monotonic()
+        primary = asyncio.ensure_future(request())
+        primary_finished: List[float] = []
+        primary.add_done_callback(lambda _: primary_finished.append(time.monotonic()))
+        tasks = [primary]
+        try:
+            delay = self.hedge_delay()
+            if delay is not None:
+                done, _ = await asyncio.wait([primary], timeout=delay)
+                if not done and self._may_hedge():
+                    duplicate = hedge() if hedge is not None else request()
+                    if duplicate is None:
+                        self._count("hedges_skipped")
+                    else:
+                        self._count("hedges_sent")
+                        logger.info(f"Request outstanding after {delay:.2f}s, sending hedge")
+                        tasks.append(asyncio.ensure_future(duplicate))
+
+            winner, error = await self._first_success(tasks)
+        except BaseException:
+            # Cancelled from outside (e.g. the request timeout); take both copies down
+            for task in tasks:
+                task.cancel()
+            raise
+
+        if winner is None:
+            raise error
+
+        # Learn from the primary copy whichever copy won. Recording only winners
+        # would keep the fast hedges and drop the slow primaries they replaced,
+        # pulling the hedge delay down. A primary that lost has taken at least
+        # as long as it has been running, so that stands in for its latency
+        primary_done = primary_finished[0] if winner is primary else time.monotonic()
+        self.tracker.record(primary_done - started)
+        if winner is not primary:
+            self._count("hedges_won")
+        for task in tasks:
+            if task is winner:
+                continue
+            result = None
+            if task.done() and not task.cancelled() and task.exception() is None:
+                result = task.result()  # Both finished together; the loser was still paid for
+            else:
+                task.cancel()
+                self._count("losers_cancelled")
+            if discard is not None:
+                discard(result)
+        return winner.result()
+
+    async def _first_success(self, tasks):
+        """The first task to finish without raising, or None and the first error"""
+        pending = set(tasks)
+        first_error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # Prefer the primary when both finish in the same iteration
+            for task in sorted(done, key=tasks.index):
+                if task.exception() is None:
+                    return task, None
+                if first_error is None:
+                    first_error = task.exception()
+        return None, first_error
+
+
+_policies: Dict[str, HedgePolicy] = {}
+_policies_lock = threading.Lock()
+
+
+def get_hedge_policy(model: str) -> HedgePolicy:
+    """Get the process-wide hedge policy for a model, so latencies are learned across games"""
+    with _policies_lock:
+        policy = _policies.get(model)
+        if policy is None:
+            policy = HedgePolicy()
+            _policies[model] = policy
+        return policy
+
+
+def set_hedge_policy(model: str, policy: Optional[HedgePolicy]):
+    """Replace the process-wide hedge policy for a model (None creates a fresh one on next use)"""
+    with _policies_lock:
+        if policy is None:
+            _policies.pop(model, None)
+        else:
+            _policies[model] = policy
@@ -1,5 +1,8 @@
 # utils/history.py
 import json
+import os
+import threading
+from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
 from app.models.game import Game
@@ -8,22 +11,23 @@ from app.strategies.ai_strategy import AIStrategy
 class GameHistory:
     def __init__(self, storage_path: str = "game_history.json"):
         self.storage_path = Path(storage_path)
+        # Requests finish games from many worker threads at once
+        self._lock = threading.Lock()
         self._initialize_storage()
     
     def _initialize_storage(self):
         if not self.storage_path.exists():
             self.storage_path.write_text('{"completed_games": []}')
     
-    def save_game(self, game_id: str, game: Game):
-        history = self._read_history()
-        
+    def save_game(self, game_id: str, game: Game, evicted: bool = False):
+        """Record a game; `evicted` marks one dropped from active storage before it finished"""
         # Start with the original game data structure
         game_data = {
             "game_id": game_id,
             "timestamp": game.timestamp.isoformat(),
             "player1_strategy": game.player1_strategy.__class__.__name__,
             "player2_strategy": game.player2_strategy.__class__.__name__,
-            "rounds": [vars(round) for round in game.rounds],
+            "rounds": [asdict(round) for round in game.rounds],
             "final_scores": {
                 "player1": game.player1_total_score,
                 "player2": game.player2_total_score
@@ -36,6 +40,10 @@ class GameHistory:
             }
         }
 
+        if evicted:
+            game_data["evicted"] = True
+            game_data["max_rounds"] = game.max_rounds
+
         # Add AI-specific data only if AI strategies are involved
         if isinstance(game.player1_strategy, AIStrategy):
             game_data["player1_ai_data"] = {
@@ -49,8 +57,10 @@ class GameHistory:
                 "conversation_history": game.player2_strategy.conversation_history
             }
 
-        history["completed_games"].append(game_data)
-        self._write_history(history)
+        with self._lock:
+            history = self._read_history()
+            history["completed_games"].append(game_data)
+            self._write_history(history)
         
     def get_game(self, game_id: str):
         """
@@ -72,4 +82,7 @@ class GameHistory:
         return json.loads(self.storage_path.read_text())
     
     def _write_history(self, history):
-        self.storage_path.write_text(json.dumps(history, indent=2))
\ No newline at end of file
+        # Write then rename, so readers never see a half-written file
+        tmp_path = self.storage_path.with_name(f"{self.storage_path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(history, indent=2))
+        os.replace(tmp_path, self.storage_path)
\ No newline at end of file
@@ -0,0 +1,289 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from enum import Enum
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from app.utils.event_loop import EventLoopThread, get_event_loop_thread
+from app.utils.llm_scheduler import Priority, work_class
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+_FINISHED = {JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED}
+
+
+@dataclass
+class Job:
+    """A unit of background work and its progress"""
+    job_id: str
+    kind: str
+    params: Dict[str, Any]  # JSON-serializable, so the job can be rerun after a restart
+    status: JobStatus = JobStatus.QUEUED
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    rounds_done: int = 0
+    rounds_total: Optional[int] = None
+    tokens_used: int = 0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in _FINISHED
+
+    def update_progress(self, rounds: int = 0, tokens: int = 0):
+        """Add finished rounds and the tokens they used"""
+        self.rounds_done += rounds
+        self.tokens_used += tokens
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-friendly view for the API and the job store"""
+        data = asdict(self)
+        data["status"] = self.status.value
+        for key in ("created_at", "started_at", "finished_at"):
+            data[key] = data[key].isoformat() if data[key] else None
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        data = dict(data)
+        data["status"] = JobStatus(data["status"])
+        for key in ("created_at", "started_at", "finished_at"):
+            data[key] = datetime.fromisoformat(data[key]) if data[key] else None
+        return cls(**data)
+
+
+class JobStore:
+    """
+    SQLite copy of every job, so queued work survives a restart
+
+    Jobs are written on every status change. Jobs still queued or running
+    when the process stopped are handed back by unfinished().
+    """
+
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, status TEXT, data TEXT)"
+            )
+
+    def save(self, job: Job):
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, status, data) VALUES (?, ?, ?)",
+                (job.job_id, job.status.value, json.dumps(job.to_dict()))
+            )
+
+    def load(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self.connection.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return Job.from_dict(json.loads(row[0])) if row else None
+
+    def unfinished(self) -> List[Job]:
+        """Jobs that were queued or running, oldest first"""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT data FROM jobs WHERE status IN (?, ?)",
+                (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+            ).fetchall()
+        jobs = [Job.from_dict(json.loads(row[0])) for row in rows]
+        return sorted(jobs, key=lambda job: job.created_at)
+
+
+JobHandler = Callable[[Job], Awaitable[Dict[str, Any]]]
+
+
+class JobExecutor:
+    """
+    Runs background jobs on the shared event loop, at most `max_workers` at a time
+
+    Handlers are registered per job kind and receive the Job, which they
+    update with progress; what they return becomes the job's result.
+    submit() returns straight away, so no request thread waits on the work.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        store: Optional[JobStore] = None,
+        loop_thread: Optional[EventLoopThread] = None,
+        max_finished_jobs: int = 1000
+    ):
+        if max_workers < 1:
+            raise ValueError("Job executor needs at least one worker")
+        self.max_workers = max_workers
+        self.store = store
+        self.loop_thread = loop_thread or get_event_loop_thread()
+        self.max_finished_jobs = max_finished_jobs
+        self._handlers: Dict[str, tuple] = {}
+        self._jobs: Dict[str, Job] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._slots: Optional[asyncio.Semaphore] = None  # Created on the loop
+        self._lock = threading.Lock()
+
+    def register(self, kind: str, handler: JobHandler, priority: Priority = Priority.BATCH):
+        """Set the handler for a kind of job and the priority its LLM calls are scheduled at"""
+        self._handlers[kind] = (handler, priority)
+
+    def submit(self, kind: str, params: Dict[str, Any], rounds_total: Optional[int] = None) -> Job:
+        """Queue a job and return it without waiting"""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = Job(job_id=str(uuid.uuid4()), kind=kind, params=params, rounds_total=rounds_total)
+        self._enqueue(job)
+        return job
+
+    def resume(self) -> List[Job]:
+        """Requeue jobs the store says were unfinished, e.g. after a restart"""
+        if self.store is None:
+            return []
+        jobs = [job for job in self.store.unfinished() if job.job_id not in self._jobs]
+        for job in jobs:
+            # Interrupted jobs start over
+            job.status = JobStatus.QUEUED
+            job.started_at = None
+            job.rounds_done = 0
+            job.tokens_used = 0
+            self._enqueue(job)
+        if jobs:
+            logger.info(f"Resumed {len(jobs)} queued jobs")
+        return jobs
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and self.store is not None:
+            job = self.store.load(job_id)
+        return job
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Job]:
+        """Block until a job finishes or `timeout` passes, then return it"""
+        async def finished():
+            task = self._tasks.get(job_id)
+            if task is not None:
+                await asyncio.wait({task}, timeout=timeout)
+
+        self.loop_thread.run(finished())
+        return self.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; False if it had already finished or doesn't exist"""
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        self.loop_thread.call_soon(self._cancel_on_loop, job_id)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {status.value: 0 for status in JobStatus}
+            for job in self._jobs.values():
+                counts[job.status.value] += 1
+        counts["max_workers"] = self.max_workers
+        return counts
+
+    def _enqueue(self, job: Job):
+        with self._lock:
+            self._jobs[job.job_id] = job
+        self._save(job)
+        self.loop_thread.call_soon(self._start, job)
+
+    def _start(self, job: Job):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        self._tasks[job.job_id] = asyncio.ensure_future(self._run(job))
+
+    def _cancel_on_loop(self, job_id: str):
+        task = self._tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+        job = self._jobs.get(job_id)
+        if job is not None and job.status == JobStatus.QUEUED:
+            # A task cancelled before its first step never runs _run's cleanup
+            job.status = JobStatus.CANCELLED
+            self._finish(job)
+
+    async def _run(self, job: Job):
+        handler, priority = self._handlers[job.kind]
+        try:
+            async with self._slots:
+                job.status = JobStatus.RUNNING
+                job.started_at = datetime.now()
+                self._save(job)
+                with work_class(priority, flow=f"job-{job.job_id}"):
+                    job.result = await handler(job)
+            job.status = JobStatus.SUCCEEDED
+        except asyncio.CancelledError:
+            job.status = JobStatus.CANCELLED
+        except Exception as e:
+            logger.error(f"Job {job.job_id} ({job.kind}) failed: {str(e)}")
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+        finally:
+            self._finish(job)
+
+    def _finish(self, job: Job):
+        job.finished_at = job.finished_at or datetime.now()
+        self._tasks.pop(job.job_id, None)
+        self._save(job)
+        self._prune()
+
+    def _save(self, job: Job):
+        if self.store is not None:
+            try:
+                self.store.save(job)
+            except Exception as e:
+                logger.warning(f"Could not persist job {job.job_id}: {str(e)}")
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond max_finished_jobs (the store keeps them)"""
+        with self._lock:
+            finished = [job for job in self._jobs.values() if job.finished]
+            for job in sorted(finished, key=lambda j: j.finished_at)[:max(0, len(finished) - self.max_finished_jobs)]:
+                del self._jobs[job.job_id]
+
+
+_job_executor: Optional[JobExecutor] = None
+_job_executor_lock = threading.Lock()
+
+
+def get_job_executor() -> JobExecutor:
+    """
+    Get the process-wide job executor
+
+    JOB_WORKERS sets how many jobs run at once (default 4). If JOB_STORE_PATH
+    is set, jobs are persisted there and unfinished ones are resumed on start.
+    """
+    global _job_executor
+    with _job_executor_lock:
+        if _job_executor is None:
+            store_path = os.getenv("JOB_STORE_PATH")
+            _job_executor = JobExecutor(
+                max_workers=int(os.getenv("JOB_WORKERS", 4)),
+                store=JobStore(store_path) if store_path else None
+            )
+        return _job_executor
+
+
+def set_job_executor(executor: Optional[JobExecutor]):
+    """Replace the process-wide job executor (None recreates it from the environment)"""
+    global _job_executor
+    with _job_executor_lock:
+        _job_executor = executor
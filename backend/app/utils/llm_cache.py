@@ -0,0 +1,221 @@
+from typing import Dict, Optional, Any
+from enum import Enum
+from datetime import datetime
+from pathlib import Path
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import anthropic
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+
+class CacheMode(Enum):
+    OFF = "off"
+    RECORD = "record"  # Every call goes to the provider and its response is stored
+    READ_THROUGH = "read_through"  # Serve stored responses, call the provider on misses
+    REPLAY = "replay"  # Serve stored responses only; a miss is an error
+
+
+class LLMCacheMiss(Exception):
+    """Raised in replay mode when a request has no recorded response"""
+    pass
+
+
+class LLMCache:
+    """
+    Content-addressed SQLite store of messages.create() requests and responses.
+
+    The key is a hash of every request parameter (model, system prompt,
+    messages and sampling parameters), so any change to the prompt is a miss.
+    """
+
+    def __init__(self, path: str = "llm_cache.db"):
+        self.path = Path(path)
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.init_database()
+
+    def init_database(self):
+        """Initialize SQLite database with the responses table"""
+        c = self.connection.cursor()
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                cache_key TEXT PRIMARY KEY,
+                model TEXT,
+                request TEXT,
+                response TEXT,
+                created_at TIMESTAMP
+            )
+        ''')
+        self.connection.commit()
+
+    @staticmethod
+    def make_key(params: Dict[str, Any]) -> str:
+        """Stable hash of a request's parameters"""
+        canonical = json.dumps(params, sort_keys=True, default=str, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Get the stored response JSON for a key, if any"""
+        with self._lock:
+            c = self.connection.cursor()
+            c.execute("SELECT response FROM responses WHERE cache_key = ?", (key,))
+            row = c.fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, params: Dict[str, Any], response_json: str):
+        """Store (or replace) the response for a key"""
+        with self._lock, self.connection:
+            self.connection.execute(
+                """
+                INSERT INTO responses (cache_key, model, request, response, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(cache_key) DO UPDATE SET
+                    response = excluded.response,
+                    created_at = excluded.created_at
+                """,
+                (
+                    key,
+                    params.get("model"),
+                    json.dumps(params, sort_keys=True, default=str),
+                    response_json,
+                    datetime.now()
+                )
+            )
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced}
+
+
+class CachedMessages:
+    """Drop-in replacement for client.messages that records and replays through an LLMCache"""
+
+    def __init__(self, messages, cache: LLMCache, mode: CacheMode):
+        self._messages = messages
+        self.cache = cache
+        self.mode = mode
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    def __getattr__(self, name):
+        return getattr(self._messages, name)
+
+    async def create(self, **params) -> anthropic.types.Message:
+        # Streams are consumed incrementally and are not cached
+        if params.get("stream") or self.mode == CacheMode.OFF:
+            return await self._messages.create(**params)
+
+        key = LLMCache.make_key(params)
+
+        if self.mode in (CacheMode.READ_THROUGH, CacheMode.REPLAY):
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.hits += 1
+                return anthropic.types.Message.model_validate_json(cached)
+            self.cache.misses += 1
+            if self.mode == CacheMode.REPLAY:
+                raise LLMCacheMiss(f"No recorded response for request {key[:12]}")
+
+            # Identical requests already in flight share one provider call
+            pending = self._in_flight.get(key)
+            while pending is not None:
+                self.cache.coalesced += 1
+                # wait() leaves the shared call running if this caller is cancelled
+                await asyncio.wait({pending})
+                if not pending.cancelled():
+                    return pending.result()
+                # The leading caller was cancelled; issue the call ourselves or follow whoever did
+                pending = self._in_flight.get(key)
+
+            future = asyncio.get_running_loop().create_future()
+            self._in_flight[key] = future
+            try:
+                response = await self._fetch_and_store(key, params)
+                future.set_result(response)
+                return response
+            except Exception as e:
+                future.set_exception(e)
+                # Mark the exception as retrieved when nobody else was waiting
+                future.exception()
+                raise
+            except BaseException:
+                # Cancellation belongs to this caller only; waiters retry instead of inheriting it
+                future.cancel()
+                raise
+            finally:
+                self._in_flight.pop(key, None)
+
+        # RECORD: every call is a fresh sample from the provider
+        return await self._fetch_and_store(key, params)
+
+    async def _fetch_and_store(self, key: str, params: Dict[str, Any]):
+        response = await self._messages.create(**params)
+        try:
+            self.cache.put(key, params, response.model_dump_json())
+        except Exception as e:
+            logger.warning(f"Could not cache LLM response: {str(e)}")
+        return response
+
+
+class CachingClient:
+    """Wraps an AsyncAnthropic client so messages.create() goes through the cache"""
+
+    def __init__(self, client: anthropic.AsyncAnthropic, cache: LLMCache, mode: CacheMode):
+        self._client = client
+        self.messages = CachedMessages(client.messages, cache, mode)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+_cache: Optional[LLMCache] = None
+_cache_mode: Optional[CacheMode] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache_mode() -> CacheMode:
+    """Cache mode set by configure_llm_cache(), or LLM_CACHE_MODE (default off)"""
+    if _cache_mode is not None:
+        return _cache_mode
+    return CacheMode(os.getenv("LLM_CACHE_MODE", CacheMode.OFF.value))
+
+
+def get_llm_cache() -> LLMCache:
+    """Get the process-wide cache, stored at LLM_CACHE_PATH (default llm_cache.db)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache(os.getenv("LLM_CACHE_PATH", "llm_cache.db"))
+        return _cache
+
+
+def configure_llm_cache(mode: CacheMode, path: Optional[str] = None):
+    """
+    Set the cache mode (and optionally the database) for this process
+
+    Clients already handed out by the client pool keep their previous mode.
+    """
+    global _cache, _cache_mode
+    with _cache_lock:
+        _cache_mode = mode
+        if path is not None:
+            _cache = LLMCache(path)
+
+
+def wrap_client(client: anthropic.AsyncAnthropic):
+    """Wrap a client with the process-wide cache unless caching is off"""
+    mode = get_cache_mode()
+    if mode == CacheMode.OFF:
+        return client
+    return CachingClient(client, get_llm_cache(), mode)
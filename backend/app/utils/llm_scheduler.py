@@ -0,0 +1,179 @@
+from typing import Callable, Deque, Dict, Iterator, List, Optional
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import Enum
+import itertools
+from app.utils.telemetry import percentile
+
+
+class Priority(Enum):
+    """Scheduling class of an LLM request"""
+    INTERACTIVE = "interactive"  # A user is waiting on it, e.g. /move and /complete
+    BATCH = "batch"  # Experiments and other background sweeps
+
+
+# Lower ranks are served first
+_RANK = {Priority.INTERACTIVE: 0, Priority.BATCH: 1}
+
+
+@dataclass(frozen=True)
+class WorkClass:
+    """Who a request is for: its priority and, for batch work, which flow it shares capacity in"""
+    priority: Priority = Priority.BATCH
+    flow: str = "default"  # e.g. an experiment id
+    weight: float = 1.0  # Share of batch capacity relative to other flows
+
+
+_work_class: ContextVar[WorkClass] = ContextVar("llm_work_class", default=WorkClass())
+
+
+def current_work_class() -> WorkClass:
+    """The work class LLM requests made from the current context are scheduled under"""
+    return _work_class.get()
+
+
+@contextmanager
+def work_class(priority: Priority, flow: Optional[str] = None, weight: float = 1.0) -> Iterator[WorkClass]:
+    """
+    Schedule LLM requests made inside the block, and tasks started from it, under a work class
+
+    Args:
+        priority: INTERACTIVE requests are served before any waiting BATCH request
+        flow: Batch flow to share capacity in (defaults to the priority's name)
+        weight: The flow's share of batch capacity relative to other flows
+    """
+    if weight <= 0:
+        raise ValueError("Scheduling weight must be positive")
+    work = WorkClass(priority, flow or priority.value, weight)
+    token = _work_class.set(work)
+    try:
+        yield work
+    finally:
+        _work_class.reset(token)
+
+
+@dataclass
+class _Ticket:
+    work: WorkClass
+    finish: float  # Virtual finish tag; orders batch tickets
+    seq: int
+    enqueued_at: float
+    wake: Optional[Callable[[], None]] = None  # Set by the waiter; called when it may be able to proceed
+
+
+class _WaitStats:
+    """Queue waits for one priority class or flow"""
+
+    def __init__(self, window: int):
+        self.granted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.recent: Deque[float] = deque(maxlen=window)
+
+    def record(self, wait: float):
+        self.granted += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.recent.append(wait)
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "granted": self.granted,
+            "mean_wait": self.total_wait / self.granted if self.granted else 0.0,
+            "p95_wait": percentile(self.recent, 0.95, default=0.0),
+            "max_wait": self.max_wait
+        }
+
+
+class FairQueue:
+    """
+    Order in which waiting LLM requests get capacity
+
+    Interactive requests go first, in arrival order. Batch requests are
+    ordered by self-clocked weighted fair queuing: each flow's requests get
+    virtual finish tags that advance by cost / weight, so concurrent
+    experiments share batch capacity in proportion to their weights and a
+    new flow can't be starved by one that has been queueing for hours.
+
+    Not thread-safe on its own; RateLimiter calls it under its lock.
+    """
+
+    def __init__(self, wait_window: int = 1000):
+        self.wait_window = wait_window
+        self._waiting: List[_Ticket] = []
+        self._virtual_time = 0.0
+        self._flow_finish: Dict[str, float] = {}
+        self._seq = itertools.count()
+        self._priority_waits = {priority: _WaitStats(wait_window) for priority in Priority}
+        self._flow_waits: Dict[str, _WaitStats] = {}
+
+    def _finish_tag(self, work: WorkClass, cost: float) -> float:
+        if work.priority != Priority.BATCH:
+            return 0.0
+        start = max(self._virtual_time, self._flow_finish.get(work.flow, 0.0))
+        return start + max(cost, 1.0) / work.weight
+
+    def enqueue(self, work: WorkClass, cost: float, now: float) -> _Ticket:
+        """Add a waiter; `cost` is its estimated tokens"""
+        finish = self._finish_tag(work, cost)
+        if work.priority == Priority.BATCH:
+            self._flow_finish[work.flow] = finish
+        ticket = _Ticket(work, finish, next(self._seq), now)
+        self._waiting.append(ticket)
+        return ticket
+
+    def would_lead(self, work: WorkClass, cost: float) -> bool:
+        """Whether a waiter enqueued now would be the head; charges nothing"""
+        head = self.head()
+        if head is None:
+            return True
+        # A new ticket's sequence number is the largest, so it only leads on a strictly better tag
+        return (_RANK[work.priority], self._finish_tag(work, cost)) < (_RANK[head.work.priority], head.finish)
+
+    def head(self) -> Optional[_Ticket]:
+        """The waiter to serve next"""
+        if not self._waiting:
+            return None
+        return min(self._waiting, key=lambda t: (_RANK[t.work.priority], t.finish, t.seq))
+
+    def waiting(self, priority: Optional[Priority] = None) -> int:
+        return sum(1 for t in self._waiting if priority is None or t.work.priority == priority)
+
+    def grant(self, ticket: _Ticket, now: float):
+        """Remove a waiter that got capacity and record how long it queued"""
+        self._waiting.remove(ticket)
+        wait = now - ticket.enqueued_at
+        self._priority_waits[ticket.work.priority].record(wait)
+        if ticket.work.priority == Priority.BATCH:
+            self._virtual_time = max(self._virtual_time, ticket.finish)
+            if ticket.work.flow not in self._flow_waits:
+                self._flow_waits[ticket.work.flow] = _WaitStats(self.wait_window)
+            self._flow_waits[ticket.work.flow].record(wait)
+            self._forget_idle_flows()
+
+    def cancel(self, ticket: _Ticket):
+        """Remove a waiter that gave up"""
+        if ticket in self._waiting:
+            self._waiting.remove(ticket)
+            self._forget_idle_flows()
+
+    def _forget_idle_flows(self):
+        # A flow whose tag the clock has passed would restart from the clock anyway
+        active = {t.work.flow for t in self._waiting}
+        for flow in [f for f, finish in self._flow_finish.items() if finish <= self._virtual_time and f not in active]:
+            del self._flow_finish[flow]
+
+    def stats(self) -> Dict[str, float]:
+        """Flat queue-wait counters per priority class"""
+        stats = {}
+        for priority in Priority:
+            stats[f"{priority.value}_waiting"] = self.waiting(priority)
+            for key, value in self._priority_waits[priority].snapshot().items():
+                stats[f"{priority.value}_{key}"] = value
+        return stats
+
+    def flow_stats(self) -> Dict[str, Dict[str, float]]:
+        """Queue-wait counters for each batch flow seen"""
+        return {flow: waits.snapshot() for flow, waits in self._flow_waits.items()}
@@ -0,0 +1,342 @@
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+from dataclasses import dataclass
+from enum import Enum
+import asyncio
+import logging
+import random
+import threading
+import time
+import anthropic
+
+# Local imports
+from app.utils.rate_limiter import RateLimiter, RateLimitedError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LLMTimeoutError(ValueError):
+    """The provider did not answer in time"""
+    pass
+
+
+class LLMServerError(ValueError):
+    """The provider failed (5xx, overloaded or unreachable); worth retrying"""
+    pass
+
+
+class LLMClientError(ValueError):
+    """The provider rejected the request (4xx); retrying will not help"""
+    pass
+
+
+class LLMResponseError(ValueError):
+    """The provider answered but the response could not be used"""
+    pass
+
+
+class LLMTransportError(Exception):
+    """A call failed for good; the message explains why"""
+    pass
+
+
+class CircuitOpenError(LLMTransportError):
+    """Raised without calling the provider while the circuit breaker is open"""
+    pass
+
+
+class ErrorKind(Enum):
+    TIMEOUT = "timeout"
+    RATE_LIMITED = "rate_limited"
+    SERVER = "server"
+    CLIENT = "client"
+    INVALID_RESPONSE = "invalid_response"
+    UNKNOWN = "unknown"
+
+
+# Kinds that say the provider itself is unhealthy
+_PROVIDER_FAILURES = {ErrorKind.TIMEOUT, ErrorKind.SERVER}
+# Kinds that a retry cannot fix
+_NOT_RETRYABLE = {ErrorKind.CLIENT}
+
+
+def classify_error(error: BaseException) -> ErrorKind:
+    """Classify an error raised by a provider call"""
+    if isinstance(error, RateLimitedError):
+        return ErrorKind.RATE_LIMITED
+    if isinstance(error, (LLMTimeoutError, asyncio.TimeoutError, anthropic.APITimeoutError)):
+        return ErrorKind.TIMEOUT
+    if isinstance(error, LLMServerError):
+        return ErrorKind.SERVER
+    if isinstance(error, LLMClientError):
+        return ErrorKind.CLIENT
+    if isinstance(error, LLMResponseError):
+        return ErrorKind.INVALID_RESPONSE
+    if isinstance(error, anthropic.RateLimitError):
+        return ErrorKind.RATE_LIMITED
+    if isinstance(error, anthropic.APIStatusError):
+        return ErrorKind.SERVER if is_retryable_status(error.status_code) else ErrorKind.CLIENT
+    if isinstance(error, anthropic.APIError):
+        return ErrorKind.SERVER  # Connection errors and errors without a status
+    return ErrorKind.UNKNOWN
+
+
+def is_retryable_status(status_code: int) -> bool:
+    """5xx (including 529 overloaded), request timeouts and conflicts are transient"""
+    return status_code >= 500 or status_code in (408, 409)
+
+
+class BackoffPolicy:
+    """
+    Exponential backoff with full jitter.
+
+    The n-th retry sleeps a uniform random time in [0, min(max_delay, base_delay * multiplier ** n)],
+    so callers that failed together do not retry together.
+    """
+
+    def __init__(self, base_delay: float = 1.0, max_delay: float = 30.0, multiplier: float = 2.0, rng: Optional[random.Random] = None):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.rng = rng or random.Random()
+
+    def delay(self, retry: int) -> float:
+        """Seconds to wait before retry number `retry` (0-based)"""
+        ceiling = min(self.max_delay, self.base_delay * self.multiplier ** retry)
+        return self.rng.uniform(0, ceiling)
+
+
+@dataclass
+class CallInfo:
+    """What happened during one call, filled in by LLMTransport.call()"""
+    attempts: int = 0  # Requests sent, including retries and 429s
+    rate_limited: int = 0
+    backoff_seconds: float = 0.0
+
+    @property
+    def retries(self) -> int:
+        return max(0, self.attempts - 1)
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"  # Calls flow normally
+    OPEN = "open"  # Calls fail fast
+    HALF_OPEN = "half_open"  # One probe call decides whether to close again
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast after repeated provider failures.
+
+    After `failure_threshold` consecutive timeouts or server errors the circuit
+    opens and calls are rejected without reaching the provider. After
+    `reset_timeout` seconds a single probe is let through: success closes the
+    circuit, failure opens it again. Guarded by a threading lock so it can be
+    shared across event loops.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go to the provider now"""
+        with self._lock:
+            if self.state == CircuitState.CLOSED:
+                return True
+            if self.state == CircuitState.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = CircuitState.HALF_OPEN
+            if self.state == CircuitState.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        """The provider answered"""
+        with self._lock:
+            self.state = CircuitState.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """The provider timed out or failed"""
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == CircuitState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != CircuitState.OPEN:
+                    self.times_opened += 1
+                    logger.warning(f"Circuit breaker opened after {self.consecutive_failures} consecutive failures")
+                self.state = CircuitState.OPEN
+                self.opened_at = time.monotonic()
+
+    def record_neutral(self):
+        """The call ended without telling us anything about the provider"""
+        with self._lock:
+            self._probe_in_flight = False
+
+
+class LLMTransport:
+    """
+    Retry loop shared by all AI strategies.
+
+    Each call is retried with jittered exponential backoff according to how it
+    failed: timeouts and server errors are retried and count toward the circuit
+    breaker, client errors fail immediately, and 429s wait out the rate
+    limiter without using up attempts. Waiting never blocks the event loop.
+    """
+
+    def __init__(self, circuit_breaker: Optional[CircuitBreaker] = None, max_delay: float = 30.0):
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {
+            "calls": 0,
+            "attempts": 0,
+            "successes": 0,
+            "retries": 0,
+            "exhausted": 0,
+            "circuit_rejections": 0,
+            "backoff_seconds": 0.0
+        }
+        for kind in ErrorKind:
+            self._counters[f"errors_{kind.value}"] = 0
+
+    def _count(self, key: str, amount: float = 1):
+        with self._lock:
+            self._counters[key] += amount
+
+    async def call(
+        self,
+        request: Callable[[], Awaitable[T]],
+        max_retries: int = 3,
+        base_delay: float = 1.0,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_rate_limit_retries: int = 10,
+        estimated_tokens: float = 200,
+        tokens_used: Optional[Callable[[T], float]] = None,
+        call_info: Optional[CallInfo] = None
+    ) -> T:
+        """
+        Make a provider call with retries
+
+        Args:
+            request: Makes one attempt; called again for every retry
+            max_retries: Attempts allowed for errors other than 429s
+            base_delay: First backoff ceiling in seconds
+            rate_limiter: Limiter to hold a slot from, if any
+            max_rate_limit_retries: 429s tolerated before giving up
+            estimated_tokens: Token estimate for the rate limiter
+            tokens_used: Actual tokens used by a result, for the rate limiter
+            call_info: Filled in with this call's attempts and backoff, if given
+
+        Returns:
+            The request's result
+
+        Raises:
+            CircuitOpenError: If the circuit breaker rejected the call
+            LLMTransportError: If every attempt failed
+        """
+        self._count("calls")
+        call_info = call_info if call_info is not None else CallInfo()
+        backoff = BackoffPolicy(base_delay=base_delay, max_delay=self.max_delay)
+        last_error = None
+        attempt = 0
+        rate_limited = 0
+        while attempt < max_retries:
+            if not self.circuit_breaker.allow():
+                self._count("circuit_rejections")
+                raise CircuitOpenError("Circuit breaker open: provider is failing, not sending request")
+
+            self._count("attempts")
+            call_info.attempts += 1
+            try:
+                result = await self._attempt(request, rate_limiter, estimated_tokens, tokens_used)
+            except asyncio.CancelledError:
+                self.circuit_breaker.record_neutral()
+                raise
+            except Exception as e:
+                last_error = str(e)
+                kind = classify_error(e)
+                self._count(f"errors_{kind.value}")
+                if kind in _PROVIDER_FAILURES:
+                    self.circuit_breaker.record_failure()
+                elif kind in (ErrorKind.CLIENT, ErrorKind.INVALID_RESPONSE):
+                    self.circuit_breaker.record_success()  # The provider is up
+                else:
+                    self.circuit_breaker.record_neutral()
+
+                if kind == ErrorKind.RATE_LIMITED:
+                    # The limiter already backs off; 429s don't count as failed attempts
+                    rate_limited += 1
+                    call_info.rate_limited += 1
+                    if rate_limited > max_rate_limit_retries:
+                        break
+                    if rate_limiter is None:
+                        await self._sleep(getattr(e, "retry_after", None) or backoff.delay(rate_limited - 1), call_info)
+                    continue
+                attempt += 1
+                if kind in _NOT_RETRYABLE:
+                    break
+                if attempt < max_retries:
+                    self._count("retries")
+                    await self._sleep(backoff.delay(attempt - 1), call_info)
+                continue
+
+            self.circuit_breaker.record_success()
+            self._count("successes")
+            return result
+
+        self._count("exhausted")
+        raise LLMTransportError(f"Failed after {attempt + rate_limited} attempts. Last error: {last_error}")
+
+    async def _attempt(self, request, rate_limiter, estimated_tokens, tokens_used):
+        """One attempt, inside a rate limiter slot if a limiter is given"""
+        if rate_limiter is None:
+            return await request()
+
+        async with rate_limiter.slot(estimated_tokens) as usage:
+            result = await request()
+            if tokens_used is not None:
+                usage.tokens = tokens_used(result)
+            return result
+
+    async def _sleep(self, seconds: float, call_info: CallInfo):
+        self._count("backoff_seconds", seconds)
+        call_info.backoff_seconds += seconds
+        await asyncio.sleep(seconds)
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of transport counters and circuit breaker state"""
+        with self._lock:
+            stats = dict(self._counters)
+        stats["circuit_state"] = self.circuit_breaker.state.value
+        stats["circuit_times_opened"] = self.circuit_breaker.times_opened
+        return stats
+
+
+_transport: Optional[LLMTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_llm_transport() -> LLMTransport:
+    """Get the process-wide transport, so all strategies share one circuit breaker and set of counters"""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = LLMTransport()
+        return _transport
+
+
+def set_llm_transport(transport: Optional[LLMTransport]):
+    """Replace the process-wide transport (None creates a fresh one on next use)"""
+    global _transport
+    with _transport_lock:
+        _transport = transport
@@ -0,0 +1,288 @@
+from typing import Any, Dict, List, Optional, Tuple, Union
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+import asyncio
+import logging
+import anthropic
+
+# Local imports
+from app.models.game import Game
+from app.models.types import RoundResult
+from app.strategies.ai_strategy import AIStrategy
+from app.utils.llm_cache import CacheMode, get_cache_mode
+from app.utils.rate_limiter import RateLimiter, get_rate_limiter, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+
+class BatchRequestError(Exception):
+    """A request in a batch did not produce a message"""
+    pass
+
+
+@dataclass
+class BatchItem:
+    client: Any  # The client the strategy would have called directly
+    params: Dict[str, Any]  # messages.create() parameters
+
+
+BatchOutcome = Union[anthropic.types.Message, BaseException]
+
+
+class BatchBackend(ABC):
+    """Sends one wave of messages.create() requests and returns one outcome per request, in order"""
+
+    # Per-request timeout strategies should use while this backend is serving them (None: wait indefinitely)
+    request_timeout: Optional[float] = 30.0
+
+    @abstractmethod
+    async def submit(self, items: List[BatchItem]) -> List[BatchOutcome]:
+        """Send the wave; a request that failed is returned as its exception rather than raised"""
+
+
+class ConcurrentBatchBackend(BatchBackend):
+    """
+    Local stand-in for a batch API: sends every request in the wave concurrently.
+
+    Requests go through the shared rate limiter, which backs the whole wave off on 429s.
+    """
+
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None):
+        self.rate_limiter = rate_limiter
+
+    async def submit(self, items: List[BatchItem]) -> List[BatchOutcome]:
+        return list(await asyncio.gather(*(self._create(item) for item in items), return_exceptions=True))
+
+    async def _create(self, item: BatchItem) -> anthropic.types.Message:
+        if self.rate_limiter is None:
+            return await item.client.messages.create(**item.params)
+
+        async with self.rate_limiter.slot() as usage:
+            try:
+                response = await item.client.messages.create(**item.params)
+            except anthropic.RateLimitError as e:
+                self.rate_limiter.record_rate_limited(parse_retry_after(e.response.headers.get("retry-after")))
+                raise
+            usage.tokens = response.usage.input_tokens + response.usage.output_tokens
+            return response
+
+
+class MessageBatchBackend(BatchBackend):
+    """
+    Submits each wave to the Message Batches API and polls until it has ended.
+
+    Batches are billed at a discount but can take minutes to process, so
+    strategies drop their per-request timeout while this backend is in use.
+    """
+
+    request_timeout = None
+
+    def __init__(self, poll_interval: float = 5.0):
+        self.poll_interval = poll_interval
+
+    async def submit(self, items: List[BatchItem]) -> List[BatchOutcome]:
+        if not items:
+            return []
+        batches = items[0].client.messages.batches
+        batch = await batches.create(requests=[
+            {"custom_id": f"req-{i}", "params": item.params}
+            for i, item in enumerate(items)
+        ])
+        logger.info(f"Submitted message batch {batch.id} with {len(items)} requests")
+
+        while batch.processing_status != "ended":
+            await asyncio.sleep(self.poll_interval)
+            batch = await batches.retrieve(batch.id)
+
+        outcomes: Dict[str, BatchOutcome] = {}
+        async for entry in await batches.results(batch.id):
+            if entry.result.type == "succeeded":
+                outcomes[entry.custom_id] = entry.result.message
+            else:
+                outcomes[entry.custom_id] = BatchRequestError(f"Batch request {entry.result.type}")
+        return [
+            outcomes.get(f"req-{i}", BatchRequestError("No result returned for batch request"))
+            for i in range(len(items))
+        ]
+
+
+def create_batch_backend(name: str = "concurrent") -> BatchBackend:
+    """
+    Create a batch backend by name
+
+    Args:
+        name: "concurrent" (local stand-in) or "message_batches"
+    """
+    if name == "concurrent":
+        # Replayed responses come from the local cache, so they are not rate limited
+        rate_limiter = None if get_cache_mode() == CacheMode.REPLAY else get_rate_limiter()
+        return ConcurrentBatchBackend(rate_limiter)
+    if name == "message_batches":
+        return MessageBatchBackend()
+    raise ValueError(f"Unknown batch backend {name}")
+
+
+class WaveCollector:
+    """
+    Collects requests made during a wave and sends them to the backend together.
+
+    A wave is flushed as soon as the expected number of requests has arrived;
+    anything else (retries, or strategies that fall back without a request)
+    is flushed after `linger` seconds without a full wave.
+    """
+
+    def __init__(self, backend: BatchBackend, linger: float = 0.05):
+        self.backend = backend
+        self.linger = linger
+        self.batch_sizes: List[int] = []
+        self._expected = 0
+        self._pending: List[Tuple[BatchItem, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._dispatches = set()
+
+    def expect(self, count: int):
+        """Set the number of requests that make up the next wave"""
+        self._expected = count
+
+    async def submit(self, client: Any, params: Dict[str, Any]) -> anthropic.types.Message:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((BatchItem(client, params), future))
+
+        if self._expected and len(self._pending) >= self._expected:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.linger, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        self._expected = 0
+        if not pending:
+            return
+        self.batch_sizes.append(len(pending))
+        task = asyncio.ensure_future(self._dispatch(pending))
+        self._dispatches.add(task)
+        task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, pending: List[Tuple[BatchItem, asyncio.Future]]):
+        try:
+            outcomes = await self.backend.submit([item for item, _ in pending])
+        except BaseException as e:
+            outcomes = [e] * len(pending)
+
+        for (_, future), outcome in zip(pending, outcomes):
+            if future.done():
+                continue  # The caller gave up (timeout or cancellation)
+            if isinstance(outcome, BaseException):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+
+class _BatchingMessages:
+    def __init__(self, client: Any, collector: WaveCollector):
+        self._client = client
+        self._collector = collector
+
+    def __getattr__(self, name):
+        return getattr(self._client.messages, name)
+
+    async def create(self, **params) -> anthropic.types.Message:
+        # Streams are consumed incrementally and cannot be batched
+        if params.get("stream"):
+            return await self._client.messages.create(**params)
+        return await self._collector.submit(self._client, params)
+
+
+class BatchingClient:
+    """Client whose messages.create() joins the current wave instead of calling the provider"""
+
+    def __init__(self, client: Any, collector: WaveCollector):
+        self._client = client
+        self.messages = _BatchingMessages(client, collector)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class LockstepScheduler:
+    """
+    Advances a set of games one round at a time, all games together.
+
+    Every game's LLM requests for a round form one wave that is sent through a
+    batch backend, and the responses are fanned back to each game's strategies.
+    Games may have different lengths; finished games drop out of later waves.
+    """
+
+    def __init__(self, games: List[Game], backend: Optional[BatchBackend] = None, linger: float = 0.05):
+        self.games = games
+        self.backend = backend or ConcurrentBatchBackend()
+        self.collector = WaveCollector(self.backend, linger)
+        self.waves = 0
+
+    async def run(self) -> List[List[RoundResult]]:
+        """
+        Play every game to completion
+
+        Returns:
+            List[List[RoundResult]]: Each game's rounds, in game order
+
+        Raises:
+            Exception: The first error from any game; the rest of its wave is cancelled
+        """
+        with self._batching():
+            while True:
+                active = [game for game in self.games if not game.is_game_over()]
+                if not active:
+                    break
+                self.collector.expect(sum(len(self._batched_strategies(game)) for game in active))
+
+                tasks = [asyncio.ensure_future(game.process_round()) for game in active]
+                try:
+                    await asyncio.gather(*tasks)
+                except Exception:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    raise
+                self.waves += 1
+
+            for game in self.games:
+                await game.drain_reasoning()
+        return [game.rounds for game in self.games]
+
+    @staticmethod
+    def _batched_strategies(game: Game) -> List[AIStrategy]:
+        """Strategies in a game that call an LLM client"""
+        return [
+            strategy for strategy in (game.player1_strategy, game.player2_strategy)
+            if isinstance(strategy, AIStrategy) and hasattr(strategy, "client")
+        ]
+
+    @contextmanager
+    def _batching(self):
+        """
+        Route the games' LLM strategies through the wave collector
+
+        Their own rate limiting is suspended (the backend limits whole waves)
+        and their client, rate limiter and request timeout are restored afterwards.
+        """
+        saved = []
+        for game in self.games:
+            for strategy in self._batched_strategies(game):
+                saved.append((strategy, strategy._client, strategy.rate_limiter, strategy.request_timeout))
+                strategy.client = BatchingClient(strategy.client, self.collector)
+                strategy.rate_limiter = None
+                strategy.request_timeout = self.backend.request_timeout
+        try:
+            yield
+        finally:
+            for strategy, client, rate_limiter, request_timeout in saved:
+                strategy.client = client
+                strategy.rate_limiter = rate_limiter
+                strategy.request_timeout = request_timeout
@@ -0,0 +1,186 @@
+from typing import List, Tuple, Optional
+from dataclasses import dataclass
+import numpy as np
+
+# Local imports
+from app.models.types import Move, PayoffMatrix, MatrixType, MATRIX_PAYOFFS
+from app.strategies import StrategyType, create_strategy
+from app.strategies.base import BaseStrategy
+from app.strategies.always_cooperate import AlwaysCooperate
+from app.strategies.always_defect import AlwaysDefect
+from app.strategies.tit_for_tat import TitForTat
+from app.strategies.pavlov import Pavlov
+from app.strategies.grim import GrimTrigger
+from app.strategies.random_strategy import RandomStrategy
+from app.strategies.optimal_strategy import OptimalStrategy
+
+# Joint outcomes from player 1's perspective, in chain state order
+STATES = [
+    (Move.COOPERATE, Move.COOPERATE),
+    (Move.COOPERATE, Move.DEFECT),
+    (Move.DEFECT, Move.COOPERATE),
+    (Move.DEFECT, Move.DEFECT),
+]
+
+# Maps a state seen by player 1 to the same state seen by player 2 (CD <-> DC)
+_SWAP = [0, 2, 1, 3]
+
+
+@dataclass
+class MemoryOnePolicy:
+    initial_cooperation: float  # Probability of cooperating in round 1
+    cooperation_after: Tuple[float, float, float, float]  # P(cooperate) after (my move, their move) = CC, CD, DC, DD
+
+
+@dataclass
+class MarkovResult:
+    expected_scores: Tuple[float, float]  # Expected cumulative scores over max_rounds
+    per_round_scores: List[Tuple[float, float]]  # Expected scores in each round
+    cooperation_rates: Tuple[float, float]  # Expected fraction of rounds each player cooperates
+    state_distributions: np.ndarray  # Shape (max_rounds, 4): P(CC, CD, DC, DD) in each round
+    max_rounds: int
+
+    @property
+    def cooperation_rate(self) -> float:
+        """Average cooperation rate of both players"""
+        return sum(self.cooperation_rates) / 2
+
+
+def _own_payoffs(payoff_matrix: PayoffMatrix, is_player1: bool) -> List[float]:
+    """Payoff a player receives in each state, with states from that player's perspective"""
+    by_state = [
+        payoff_matrix.cooperate_cooperate,
+        payoff_matrix.cooperate_defect,
+        payoff_matrix.defect_cooperate,
+        payoff_matrix.defect_defect
+    ]
+    if is_player1:
+        return [p[0] for p in by_state]
+    return [by_state[_SWAP[i]][1] for i in range(4)]
+
+
+def memory_one_policy(strategy: BaseStrategy, payoff_matrix: PayoffMatrix) -> MemoryOnePolicy:
+    """
+    Express a classical strategy as a memory-one policy
+
+    Args:
+        strategy: The strategy instance
+        payoff_matrix: The matrix being played (Pavlov's win/lose test depends on it)
+
+    Returns:
+        MemoryOnePolicy: Cooperation probabilities for the first round and after each outcome
+
+    Raises:
+        ValueError: If the strategy is not a memory-one policy (e.g. AI strategies)
+    """
+    if isinstance(strategy, AlwaysCooperate):
+        return MemoryOnePolicy(1.0, (1.0, 1.0, 1.0, 1.0))
+    if isinstance(strategy, AlwaysDefect):
+        return MemoryOnePolicy(0.0, (0.0, 0.0, 0.0, 0.0))
+    if isinstance(strategy, TitForTat):
+        return MemoryOnePolicy(1.0, (1.0, 0.0, 1.0, 0.0))
+    if isinstance(strategy, GrimTrigger):
+        # Grim only defects once triggered, so its own last move encodes the trigger
+        return MemoryOnePolicy(1.0, (1.0, 0.0, 0.0, 0.0))
+    if isinstance(strategy, Pavlov):
+        # Win = score >= 3: repeat the last move, otherwise switch
+        payoffs = _own_payoffs(payoff_matrix, strategy.is_player1)
+        after = tuple(
+            float((my_move == Move.COOPERATE) == (payoffs[i] >= 3))
+            for i, (my_move, _) in enumerate(STATES)
+        )
+        return MemoryOnePolicy(1.0, after)
+    if isinstance(strategy, RandomStrategy):
+        return MemoryOnePolicy(0.5, (0.5, 0.5, 0.5, 0.5))
+    if isinstance(strategy, OptimalStrategy):
+        rate = strategy.optimal_coop_rate
+        return MemoryOnePolicy(rate, (rate, rate, rate, rate))
+
+    raise ValueError(f"Strategy {strategy.name} is not a memory-one policy")
+
+
+def is_memory_one(strategy_type: StrategyType) -> bool:
+    """Check whether a registered strategy type can be solved analytically"""
+    return strategy_type in (
+        StrategyType.ALWAYS_COOPERATE,
+        StrategyType.ALWAYS_DEFECT,
+        StrategyType.TIT_FOR_TAT,
+        StrategyType.PAVLOV,
+        StrategyType.GRIM,
+        StrategyType.RANDOM,
+        StrategyType.OPTIMAL,
+    )
+
+
+def solve_game(player1_strategy: BaseStrategy, player2_strategy: BaseStrategy, payoff_matrix: PayoffMatrix, max_rounds: int = 10) -> MarkovResult:
+    """
+    Compute exact expected scores for two memory-one strategies
+
+    The joint outcome of a round is a 4-state Markov chain (CC, CD, DC, DD), so
+    the distribution over outcomes in every round follows from the first-round
+    distribution and one 4x4 transition matrix.
+
+    Args:
+        player1_strategy: Strategy for player 1
+        player2_strategy: Strategy for player 2
+        payoff_matrix: The payoff matrix being played
+        max_rounds: Number of rounds in the game
+
+    Returns:
+        MarkovResult: Exact expected scores and cooperation rates
+    """
+    policy1 = memory_one_policy(player1_strategy, payoff_matrix)
+    policy2 = memory_one_policy(player2_strategy, payoff_matrix)
+
+    def joint(p1_coop: float, p2_coop: float) -> np.ndarray:
+        return np.array([
+            p1_coop * p2_coop,
+            p1_coop * (1 - p2_coop),
+            (1 - p1_coop) * p2_coop,
+            (1 - p1_coop) * (1 - p2_coop)
+        ])
+
+    transition = np.array([
+        joint(policy1.cooperation_after[s], policy2.cooperation_after[_SWAP[s]])
+        for s in range(4)
+    ])
+
+    distributions = np.zeros((max_rounds, 4))
+    if max_rounds > 0:
+        distributions[0] = joint(policy1.initial_cooperation, policy2.initial_cooperation)
+        for t in range(1, max_rounds):
+            distributions[t] = distributions[t - 1] @ transition
+
+    player1_payoffs = np.array(_own_payoffs(payoff_matrix, True))
+    player2_payoffs = np.array([payoff_matrix.cooperate_cooperate[1], payoff_matrix.cooperate_defect[1],
+                                payoff_matrix.defect_cooperate[1], payoff_matrix.defect_defect[1]])
+    player1_round = distributions @ player1_payoffs
+    player2_round = distributions @ player2_payoffs
+
+    rounds = max(max_rounds, 1)
+    return MarkovResult(
+        expected_scores=(float(player1_round.sum()), float(player2_round.sum())),
+        per_round_scores=[(float(a), float(b)) for a, b in zip(player1_round, player2_round)],
+        cooperation_rates=(
+            float(distributions[:, 0:2].sum() / rounds),
+            float(distributions[:, [0, 2]].sum() / rounds)
+        ),
+        state_distributions=distributions,
+        max_rounds=max_rounds
+    )
+
+
+def solve_strategies(
+    player1_type: StrategyType,
+    player2_type: StrategyType,
+    matrix_type: MatrixType,
+    max_rounds: int = 10,
+    payoff_matrix: Optional[PayoffMatrix] = None
+) -> MarkovResult:
+    """Convenience wrapper around solve_game() for registered strategy types"""
+    return solve_game(
+        create_strategy(player1_type, is_player1=True, matrix_type=matrix_type),
+        create_strategy(player2_type, is_player1=False, matrix_type=matrix_type),
+        payoff_matrix or MATRIX_PAYOFFS[matrix_type],
+        max_rounds
+    )
@@ -0,0 +1,346 @@
+from typing import Callable, Dict, List, Optional, Any
+from dataclasses import dataclass, field
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import argparse
+import importlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+
+# Local imports
+from app.utils.rate_limiter import TokenBucket
+from app.strategies.history_encoding import decode_opponent_moves
+
+# A policy maps the opponent's past moves (oldest first) and the raw request to P(cooperate)
+Policy = Callable[[List[str], Dict[str, Any]], float]
+
+def extract_opponent_moves(request: Dict[str, Any]) -> List[str]:
+    """Recover the opponent's past moves from the game history in a messages request"""
+    texts = []
+    for message in request.get("messages", []):
+        content = message.get("content")
+        if isinstance(content, str):
+            texts.append(content)
+        elif isinstance(content, list):
+            texts.extend(block.get("text", "") for block in content if isinstance(block, dict))
+    return decode_opponent_moves("\n".join(texts))
+
+
+def always_cooperate(opponent_moves: List[str], request: Dict[str, Any]) -> float:
+    return 1.0
+
+
+def always_defect(opponent_moves: List[str], request: Dict[str, Any]) -> float:
+    return 0.0
+
+
+def tit_for_tat(opponent_moves: List[str], request: Dict[str, Any]) -> float:
+    if not opponent_moves:
+        return 1.0
+    return 1.0 if opponent_moves[-1] == "cooperate" else 0.0
+
+
+def cooperate_with_probability(p: float) -> Policy:
+    """Cooperate with probability p regardless of history"""
+    return lambda opponent_moves, request: p
+
+
+POLICIES: Dict[str, Policy] = {
+    "always_cooperate": always_cooperate,
+    "always_defect": always_defect,
+    "tit_for_tat": tit_for_tat,
+    "random": cooperate_with_probability(0.5),
+}
+
+
+def load_policy(spec: str) -> Policy:
+    """
+    Resolve a policy name
+
+    Accepts a built-in name, "p=<probability>", or "module:function" for a
+    custom policy with the Policy signature.
+    """
+    if spec in POLICIES:
+        return POLICIES[spec]
+    if spec.startswith("p="):
+        return cooperate_with_probability(float(spec[2:]))
+    if ":" in spec:
+        module_name, function_name = spec.split(":", 1)
+        return getattr(importlib.import_module(module_name), function_name)
+    raise ValueError(f"Unknown policy {spec}")
+
+
+@dataclass
+class MockServerConfig:
+    latency_distribution: str = "fixed"  # fixed, uniform, exponential or lognormal
+    latency_ms: float = 0.0  # Mean (or fixed) latency
+    latency_spread: float = 0.5  # Uniform: +/- fraction of the mean; lognormal: sigma
+    error_rate: float = 0.0  # Probability of a 500 response
+    rate_limit_rate: float = 0.0  # Probability of an injected 429
+    requests_per_minute: Optional[float] = None  # Enforce a real request budget with 429s
+    retry_after: float = 1.0  # retry-after sent with injected 429s
+    stream_chunk_chars: int = 8  # Characters per text delta when streaming
+    stream_chunk_delay_ms: float = 0.0  # Delay between streamed deltas, i.e. generation speed
+    policy: Policy = field(default=always_cooperate)
+    seed: Optional[int] = None
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Latency for one response, in seconds"""
+        mean = self.latency_ms / 1000.0
+        if mean <= 0:
+            return 0.0
+        if self.latency_distribution == "uniform":
+            return max(0.0, rng.uniform(mean * (1 - self.latency_spread), mean * (1 + self.latency_spread)))
+        if self.latency_distribution == "exponential":
+            return rng.expovariate(1 / mean)
+        if self.latency_distribution == "lognormal":
+            # Parameterized so the distribution's mean is latency_ms
+            sigma = self.latency_spread
+            return rng.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+        return mean
+
+
+class MockLLMServer:
+    """
+    Local stand-in for the Anthropic messages API.
+
+    Answers POST /v1/messages with a game move chosen by a policy, after a
+    sampled latency, with optional injected 500s and 429s. GET /v1/models
+    answers client warm-up and GET /stats returns request counters. Streaming
+    requests are answered with server-sent events. Point the app at it with
+    CLAUDE_BASE_URL=http://host:port.
+    """
+
+    def __init__(self, config: Optional[MockServerConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or MockServerConfig()
+        self.rng = random.Random(self.config.seed)
+        self._rng_lock = threading.Lock()
+        self.bucket = TokenBucket(self.config.requests_per_minute) if self.config.requests_per_minute else None
+        self.counters = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0, "streams_abandoned": 0}
+        self._counter_lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockLLMServer":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _count(self, key: str):
+        with self._counter_lock:
+            self.counters[key] += 1
+
+    def _random(self) -> float:
+        with self._rng_lock:
+            return self.rng.random()
+
+    def _rate_limit_wait(self) -> Optional[float]:
+        """retry-after for this request, or None if it may proceed"""
+        if self._random() < self.config.rate_limit_rate:
+            return self.config.retry_after
+        if self.bucket is not None:
+            with self._counter_lock:
+                wait = self.bucket.wait_time(1, time.monotonic())
+                if wait > 0:
+                    return wait
+                self.bucket.consume(1)
+        return None
+
+    def build_message(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a messages API response for a request"""
+        opponent_moves = extract_opponent_moves(request)
+        p_cooperate = self.config.policy(opponent_moves, request)
+        move = "COOPERATE" if self._random() < p_cooperate else "DEFECT"
+        reply = {
+            "move": move,
+            "reasoning": f"Mock policy after {len(opponent_moves)} rounds (p={p_cooperate:.2f})"
+        }
+        text = json.dumps(reply)
+        tool_choice = request.get("tool_choice") or {}
+        if tool_choice.get("type") == "tool":
+            # A forced tool call answers with the tool's input instead of text
+            content = {"type": "tool_use", "id": f"toolu_mock_{uuid.uuid4().hex[:16]}", "name": tool_choice["name"], "input": reply}
+            stop_reason = "tool_use"
+        else:
+            content = {"type": "text", "text": text}
+            stop_reason = "end_turn"
+        return {
+            "id": f"msg_mock_{uuid.uuid4().hex[:16]}",
+            "type": "message",
+            "role": "assistant",
+            "model": request.get("model", "mock"),
+            "content": [content],
+            "stop_reason": stop_reason,
+            "stop_sequence": None,
+            "usage": {
+                "input_tokens": len(json.dumps(request)) // 4,
+                "output_tokens": len(text) // 4
+            }
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass  # Keep load tests quiet
+
+            def _send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _send_event(self, event_type: str, data: Dict[str, Any]):
+                self.wfile.write(f"event: {event_type}\ndata: {json.dumps(data)}\n\n".encode())
+                self.wfile.flush()
+
+            def _send_stream(self, message: Dict[str, Any]):
+                """Send a message as server-sent events, the way the messages API streams"""
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+
+                block = message["content"][0]
+                if block["type"] == "tool_use":
+                    text = json.dumps(block["input"])
+                    block_start = dict(block, input={})
+                    delta_type, delta_field = "input_json_delta", "partial_json"
+                else:
+                    text = block["text"]
+                    block_start = {"type": "text", "text": ""}
+                    delta_type, delta_field = "text_delta", "text"
+                usage = message["usage"]
+                chunk = max(1, server.config.stream_chunk_chars)
+                try:
+                    self._send_event("message_start", {
+                        "type": "message_start",
+                        "message": dict(message, content=[], stop_reason=None, usage=dict(usage, output_tokens=1))
+                    })
+                    self._send_event("content_block_start", {
+                        "type": "content_block_start", "index": 0, "content_block": block_start
+                    })
+                    for start in range(0, len(text), chunk):
+                        time.sleep(server.config.stream_chunk_delay_ms / 1000.0)
+                        self._send_event("content_block_delta", {
+                            "type": "content_block_delta",
+                            "index": 0,
+                            "delta": {"type": delta_type, delta_field: text[start:start + chunk]}
+                        })
+                    self._send_event("content_block_stop", {"type": "content_block_stop", "index": 0})
+                    self._send_event("message_delta", {
+                        "type": "message_delta",
+                        "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+                        "usage": {"output_tokens": usage["output_tokens"]}
+                    })
+                    self._send_event("message_stop", {"type": "message_stop"})
+                except (BrokenPipeError, ConnectionResetError):
+                    server._count("streams_abandoned")  # The client stopped reading early
+
+            def _error(self, status: int, error_type: str, message: str, headers: Optional[Dict[str, str]] = None):
+                self._send_json(status, {"type": "error", "error": {"type": error_type, "message": message}}, headers)
+
+            def do_GET(self):
+                if self.path.startswith("/v1/models"):
+                    self._send_json(200, {
+                        "data": [{"type": "model", "id": "mock", "display_name": "Mock", "created_at": "2025-01-01T00:00:00Z"}],
+                        "has_more": False,
+                        "first_id": "mock",
+                        "last_id": "mock"
+                    })
+                elif self.path == "/stats":
+                    with server._counter_lock:
+                        self._send_json(200, dict(server.counters))
+                else:
+                    self._error(404, "not_found_error", "Not found")
+
+            def do_POST(self):
+                if not self.path.startswith("/v1/messages"):
+                    self._error(404, "not_found_error", "Not found")
+                    return
+
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                server._count("requests")
+
+                with server._rng_lock:
+                    latency = server.config.sample_latency(server.rng)
+                time.sleep(latency)
+
+                retry_after = server._rate_limit_wait()
+                if retry_after is not None:
+                    server._count("rate_limited")
+                    self._error(429, "rate_limit_error", "Mock rate limit", {"retry-after": f"{retry_after:.3f}"})
+                    return
+                if server._random() < server.config.error_rate:
+                    server._count("errors")
+                    self._error(500, "api_error", "Mock internal error")
+                    return
+
+                server._count("ok")
+                if request.get("stream"):
+                    self._send_stream(server.build_message(request))
+                else:
+                    self._send_json(200, server.build_message(request))
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the Anthropic messages API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="fixed", choices=["fixed", "uniform", "exponential", "lognormal"])
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-spread", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=float, default=None)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--stream-chunk-delay-ms", type=float, default=0.0)
+    parser.add_argument("--policy", default="always_cooperate", help="Built-in name, p=<prob> or module:function")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = MockServerConfig(
+        latency_distribution=args.latency,
+        latency_ms=args.latency_ms,
+        latency_spread=args.latency_spread,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        requests_per_minute=args.rpm,
+        retry_after=args.retry_after,
+        stream_chunk_delay_ms=args.stream_chunk_delay_ms,
+        policy=load_policy(args.policy),
+        seed=args.seed
+    )
+    server = MockLLMServer(config, host=args.host, port=args.port)
+    print(f"Mock LLM server listening on {server.base_url} (set CLAUDE_BASE_URL to use it)")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+from typing import Optional, Dict
+from contextlib import asynccontextmanager
+import asyncio
+import threading
+import logging
+import time
+import os
+from dotenv import load_dotenv
+from app.utils.llm_scheduler import FairQueue, Priority, WorkClass, current_work_class
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+
+class RateLimitedError(Exception):
+    """Raised by AI strategies when the provider rejects a request with a 429"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a retry-after header given in seconds; other formats are ignored"""
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at rate_per_minute"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate_per_second)
+        self.updated_at = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be consumed (0 if available now)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate_per_second
+
+    def consume(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta: float):
+        """Correct a previous estimate once the real cost is known"""
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class RateLimiter:
+    """
+    Process-wide limiter for provider calls.
+
+    Budgets requests/min and tokens/min with token buckets and bounds the
+    number of in-flight requests with an AIMD window: every successful call
+    grows the window by about one request per window, every 429 halves it and
+    pauses all callers until the provider's retry-after has passed.
+
+    Waiters are served in FairQueue order: interactive requests before batch
+    ones, and batch flows by weighted fair queuing. `interactive_reserve`
+    slots of the window are held back from batch work so an interactive
+    request never waits for a long batch call to finish.
+
+    Only the waiter at the head of the queue is ever woken: when a slot is
+    released, when the head is granted or gives up, and when its token
+    budget or a rate-limit pause runs out. The rest sleep until they reach
+    the head, so a deep queue costs nothing while it waits. State is guarded
+    by a threading lock and wakeups go through each waiter's own loop, so
+    one instance can be shared by strategies running on different event loops.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 1000,
+        tokens_per_minute: float = 100000,
+        initial_concurrency: float = 4,
+        min_concurrency: float = 1,
+        max_concurrency: float = 64,
+        decrease_factor: float = 0.5,
+        default_retry_after: float = 5.0,
+        interactive_reserve: int = 0
+    ):
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.concurrency_limit = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.default_retry_after = default_retry_after
+        self.interactive_reserve = interactive_reserve
+        self.queue = FairQueue()
+
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.total_requests = 0
+        self.total_rate_limited = 0
+        self.total_wait_time = 0.0
+        self._lock = threading.Lock()
+
+    def _try_acquire(self, estimated_tokens: float, ticket) -> Optional[float]:
+        """
+        Take a slot if one is available and it's this ticket's turn
+
+        Returns 0 once the slot is taken, the seconds until the token budget or
+        a pause allows it, or None if the ticket has to wait to be woken
+        (it isn't at the head of the queue, or the window is full).
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.queue.head() is not ticket:
+                return None
+            wait = self._capacity_wait(ticket.work.priority, estimated_tokens, now)
+            if wait != 0:
+                return wait
+            self._take(estimated_tokens, ticket, now)
+            return 0.0
+
+    def _capacity_wait(self, priority: Priority, estimated_tokens: float, now: float) -> Optional[float]:
+        """Seconds until a slot fits (0 if it does now), or None while the window is full; call under the lock"""
+        if now < self.paused_until:
+            return self.paused_until - now
+        limit = int(self.concurrency_limit)
+        if priority == Priority.BATCH:
+            limit = max(1, limit - self.interactive_reserve)
+        if self.in_flight >= limit:
+            return None
+        return max(
+            self.request_bucket.wait_time(1, now),
+            self.token_bucket.wait_time(estimated_tokens, now)
+        )
+
+    def _take(self, estimated_tokens: float, ticket, now: float):
+        """Charge a slot to the ticket at the head of the queue; call under the lock"""
+        self.request_bucket.consume(1)
+        self.token_bucket.consume(estimated_tokens)
+        self.in_flight += 1
+        self.total_requests += 1
+        self.total_wait_time += now - ticket.enqueued_at
+        self.queue.grant(ticket, now)
+        # The next waiter may fit in the window too
+        self._wake_head()
+
+    def _wake_head(self):
+        """Wake the waiter at the head of the queue so it checks for capacity; call under the lock"""
+        head = self.queue.head()
+        if head is not None and head.wake is not None:
+            head.wake()
+
+    def _cancel(self, ticket):
+        with self._lock:
+            self.queue.cancel(ticket)
+            # The ticket may have been the head, and been woken in place of the next one
+            self._wake_head()
+
+    async def acquire(self, estimated_tokens: float = 200, work: Optional[WorkClass] = None):
+        """
+        Wait until a request of roughly `estimated_tokens` fits the budget
+
+        Args:
+            estimated_tokens: Expected tokens for the request
+            work: Work class to queue under (defaults to the current context's)
+        """
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+
+        def wake():
+            try:
+                loop.call_soon_threadsafe(ready.set)
+            except RuntimeError:
+                pass  # The waiter's loop has closed
+
+        with self._lock:
+            ticket = self.queue.enqueue(work or current_work_class(), estimated_tokens, time.monotonic())
+            ticket.wake = wake
+        try:
+            while True:
+                ready.clear()
+                wait = self._try_acquire(estimated_tokens, ticket)
+                if wait == 0:
+                    return
+                try:
+                    # wait is None: sleep until woken; otherwise until the budget refills or the pause ends
+                    await asyncio.wait_for(ready.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._cancel(ticket)
+            raise
+
+    def try_acquire(self, estimated_tokens: float = 200, work: Optional[WorkClass] = None) -> bool:
+        """Take a slot only if one is free right now and nobody is queued ahead; never waits"""
+        work = work or current_work_class()
+        with self._lock:
+            now = time.monotonic()
+            # Only queue once the slot is ours, so a failed probe leaves no fair-queue charge behind
+            if not self.queue.would_lead(work, estimated_tokens):
+                return False
+            if self._capacity_wait(work.priority, estimated_tokens, now) != 0:
+                return False
+            self._take(estimated_tokens, self.queue.enqueue(work, estimated_tokens, now), now)
+            return True
+
+    def release(self, estimated_tokens: float = 200, actual_tokens: Optional[float] = None, success: bool = True):
+        """
+        Give back a slot taken by acquire()
+
+        Args:
+            estimated_tokens: The estimate passed to acquire()
+            actual_tokens: Tokens the call really used, if known
+            success: Whether the call succeeded (grows the concurrency window)
+        """
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            if actual_tokens is not None:
+                self.token_bucket.adjust(actual_tokens - estimated_tokens)
+            if success:
+                # Additive increase: about +1 per full window of successes
+                self.concurrency_limit = min(
+                    self.max_concurrency,
+                    self.concurrency_limit + 1 / max(self.concurrency_limit, 1)
+                )
+            self._wake_head()
+
+    def record_rate_limited(self, retry_after: Optional[float] = None):
+        """Multiplicative decrease and pause everyone until retry-after has passed"""
+        with self._lock:
+            now = time.monotonic()
+            self.total_rate_limited += 1
+            # Several in-flight calls usually hit the same 429 burst; only back off once
+            if now >= self.paused_until:
+                self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit * self.decrease_factor)
+            delay = retry_after if retry_after is not None else self.default_retry_after
+            self.paused_until = max(self.paused_until, now + delay)
+            logger.warning(f"Rate limited; pausing {delay:.1f}s, concurrency now {int(self.concurrency_limit)}")
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: float = 200, work: Optional[WorkClass] = None):
+        """
+        Hold a slot for the duration of one provider call.
+
+        Set `usage.tokens` on the yielded object to correct the token estimate.
+        """
+        await self.acquire(estimated_tokens, work)
+        async with self.held(estimated_tokens) as usage:
+            yield usage
+
+    @asynccontextmanager
+    async def held(self, estimated_tokens: float = 200):
+        """
+        Release a slot already taken with acquire() or try_acquire() when the block exits
+
+        Set `usage.tokens` on the yielded object to correct the token estimate.
+        """
+        usage = _SlotUsage()
+        try:
+            yield usage
+        except RateLimitedError as e:
+            self.release(estimated_tokens, usage.tokens, success=False)
+            self.record_rate_limited(e.retry_after)
+            raise
+        except BaseException:
+            self.release(estimated_tokens, usage.tokens, success=False)
+            raise
+        else:
+            self.release(estimated_tokens, usage.tokens, success=True)
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of limiter counters, including queue waits per priority class"""
+        with self._lock:
+            return {
+                "concurrency_limit": int(self.concurrency_limit),
+                "in_flight": self.in_flight,
+                "total_requests": self.total_requests,
+                "total_rate_limited": self.total_rate_limited,
+                "total_wait_time": self.total_wait_time,
+                "paused_for": max(0.0, self.paused_until - time.monotonic()),
+                **self.queue.stats()
+            }
+
+    def flow_stats(self) -> Dict[str, Dict[str, float]]:
+        """Queue waits for each batch flow, e.g. each experiment"""
+        with self._lock:
+            return self.queue.flow_stats()
+
+
+class _SlotUsage:
+    def __init__(self):
+        self.tokens: Optional[float] = None
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Get the process-wide rate limiter shared by all AI strategies
+
+    Limits come from CLAUDE_RPM_LIMIT and CLAUDE_TPM_LIMIT when set, and
+    CLAUDE_INTERACTIVE_RESERVE slots are kept free of batch work.
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(
+                requests_per_minute=float(os.getenv("CLAUDE_RPM_LIMIT", 1000)),
+                tokens_per_minute=float(os.getenv("CLAUDE_TPM_LIMIT", 100000)),
+                interactive_reserve=int(os.getenv("CLAUDE_INTERACTIVE_RESERVE", 0))
+            )
+        return _rate_limiter
+
+
+def set_rate_limiter(rate_limiter: Optional[RateLimiter]):
+    """Replace the process-wide rate limiter (None recreates it from the environment)"""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        _rate_limiter = rate_limiter
@@ -1,32 +1,224 @@
 # utils/storage.py
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, Iterator, Optional, Set, Tuple
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import fields, is_dataclass
+from enum import Enum
 from uuid import uuid4
+import os
+import sys
+import threading
+import time
 from app.models.game import Game
 from app.strategies.base import BaseStrategy
 
+# Called with (game_id, game, reason) after a game is evicted; reason is "idle" or "capacity"
+EvictionCallback = Callable[[str, Game, str], None]
+
+
+class GameBusyError(Exception):
+    """Raised by in_use() when another request or job is already playing the game"""
+    pass
+
+
+def _deep_sizeof(obj, seen: set) -> int:
+    """Approximate bytes held by plain data: containers, strings, numbers and dataclasses"""
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool, Enum)) or obj is None:
+        return size
+    if isinstance(obj, dict):
+        return size + sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(_deep_sizeof(item, seen) for item in obj)
+    if is_dataclass(obj):
+        return size + sum(_deep_sizeof(getattr(obj, f.name), seen) for f in fields(obj))
+    return size
+
+
+def estimate_game_bytes(game: Game) -> int:
+    """Approximate memory held by a game's rounds, strategy histories and AI conversation logs"""
+    seen = set()
+    total = _deep_sizeof(game.rounds, seen)
+    for strategy in (game.player1_strategy, game.player2_strategy):
+        total += _deep_sizeof(strategy.history, seen)
+        total += _deep_sizeof(getattr(strategy, "conversation_history", None), seen)
+    return total
+
+
 class GameStorage:
-    def __init__(self):
-        self.active_games: Dict[str, Game] = {}
-    
+    """
+    Active games, bounded by count and idle time
+
+    Games are kept in least-recently-used order. Creating a game beyond
+    `max_games` evicts the least recently used one, and games not touched
+    for `idle_ttl` seconds are evicted on the next create or lookup. Games
+    held with in_use() are never evicted, and only one holder at a time may
+    play a game. `on_evict` is called for each
+    evicted game, outside the storage lock, e.g. to save it to history.
+    """
+
+    def __init__(
+        self,
+        max_games: Optional[int] = None,
+        idle_ttl: Optional[float] = None,
+        on_evict: Optional[EvictionCallback] = None
+    ):
+        self.max_games = max_games
+        self.idle_ttl = idle_ttl
+        self.on_evict = on_evict
+        self.active_games: "OrderedDict[str, Game]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+        self._pins: Set[str] = set()
+        self.evicted = {"idle": 0, "capacity": 0}
+        self._lock = threading.Lock()
+
     def create_game(self, player1_strategy: BaseStrategy, player2_strategy: BaseStrategy, max_rounds: int = 10) -> Tuple[str, Game]:
         """
         Create a new game with two players
-        
+
         Args:
             player1_strategy: Strategy for player 1
             player2_strategy: Strategy for player 2
-            
+
         Returns:
             Tuple of (game_id, game)
         """
         game_id = str(uuid4())
         game = Game(player1_strategy, player2_strategy, max_rounds=max_rounds)  # Game class will need updating too
-        self.active_games[game_id] = game
+        with self._lock:
+            self.active_games[game_id] = game
+            self._last_access[game_id] = time.monotonic()
+            evicted = self._evict_expired()
+            evicted += self._evict_over_capacity()
+        self._notify(evicted)
         return game_id, game
-    
+
     def get_game(self, game_id: str) -> Optional[Game]:
-        return self.active_games.get(game_id)
-        
+        with self._lock:
+            evicted = self._evict_expired()
+            game = self.active_games.get(game_id)
+            if game is not None:
+                self.active_games.move_to_end(game_id)
+                self._last_access[game_id] = time.monotonic()
+        self._notify(evicted)
+        return game
+
     def remove_game(self, game_id: str):
-        if game_id in self.active_games:
-            del self.active_games[game_id]
\ No newline at end of file
+        with self._lock:
+            if game_id in self.active_games:
+                del self.active_games[game_id]
+                self._last_access.pop(game_id, None)
+
+    @contextmanager
+    def in_use(self, game_id: str) -> Iterator[Optional[Game]]:
+        """
+        Look up a game and hold it exclusively while work on it is running
+
+        The lookup and the pin happen under one lock, so a game can't be
+        evicted between the two. A held game is never evicted, and holding
+        it keeps concurrent requests or jobs from interleaving rounds.
+        Yields None (and pins nothing) if the game is not in storage.
+
+        Raises:
+            GameBusyError: If the game is already held
+        """
+        with self._lock:
+            evicted = self._evict_expired()
+            game = self.active_games.get(game_id)
+            busy = game_id in self._pins
+            if game is not None and not busy:
+                self._pins.add(game_id)
+        self._notify(evicted)
+        if busy:
+            raise GameBusyError(f"Game {game_id} is already being played")
+        if game is None:
+            yield None
+            return
+        try:
+            yield game
+        finally:
+            with self._lock:
+                self._pins.discard(game_id)
+                if game_id in self.active_games:
+                    self.active_games.move_to_end(game_id)
+                    self._last_access[game_id] = time.monotonic()
+
+    def evict_expired(self) -> int:
+        """Evict games idle for longer than idle_ttl; returns how many were evicted"""
+        with self._lock:
+            evicted = self._evict_expired()
+        self._notify(evicted)
+        return len(evicted)
+
+    def stats(self) -> Dict[str, float]:
+        """Gauges for the resident games"""
+        with self._lock:
+            games = list(self.active_games.values())
+            stats = {
+                "resident_games": len(games),
+                "max_games": self.max_games,
+                "idle_ttl": self.idle_ttl,
+                "in_use": len(self._pins),
+                "evicted_idle": self.evicted["idle"],
+                "evicted_capacity": self.evicted["capacity"]
+            }
+        # Sizing walks every game's history, so don't hold up game requests for it
+        stats["resident_bytes"] = sum(estimate_game_bytes(game) for game in games)
+        return stats
+
+    def __len__(self) -> int:
+        return len(self.active_games)
+
+    def _evict_expired(self):
+        if self.idle_ttl is None:
+            return []
+        cutoff = time.monotonic() - self.idle_ttl
+        # Oldest access first, so stop at the first game that is still fresh
+        expired = []
+        for game_id in self.active_games:
+            if self._last_access[game_id] > cutoff:
+                break
+            if game_id not in self._pins:
+                expired.append(game_id)
+        return [self._pop(game_id, "idle") for game_id in expired]
+
+    def _evict_over_capacity(self):
+        if self.max_games is None:
+            return []
+        excess = len(self.active_games) - self.max_games
+        victims = [game_id for game_id in self.active_games if game_id not in self._pins][:max(0, excess)]
+        return [self._pop(game_id, "capacity") for game_id in victims]
+
+    def _pop(self, game_id: str, reason: str):
+        self._last_access.pop(game_id, None)
+        self.evicted[reason] += 1
+        return game_id, self.active_games.pop(game_id), reason
+
+    def _notify(self, evicted):
+        if self.on_evict is None:
+            return
+        for game_id, game, reason in evicted:
+            self.on_evict(game_id, game, reason)
+
+
+def _optional_env(name: str, default: Optional[str], cast):
+    """Environment setting where "none" means unbounded"""
+    value = os.getenv(name, default)
+    if value is None or value.lower() == "none":
+        return None
+    return cast(value)
+
+
+def create_game_storage(on_evict: Optional[EvictionCallback] = None) -> GameStorage:
+    """
+    Game storage bounded by ACTIVE_GAMES_MAX games (default 1000) and
+    ACTIVE_GAME_TTL_SECONDS of idle time (default 3600); "none" disables either bound
+    """
+    return GameStorage(
+        max_games=_optional_env("ACTIVE_GAMES_MAX", "1000", int),
+        idle_ttl=_optional_env("ACTIVE_GAME_TTL_SECONDS", "3600", float),
+        on_evict=on_evict
+    )
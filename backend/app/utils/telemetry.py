@@ -0,0 +1,169 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass
+import math
+from app.models.types import RoundResult, TokenUsage
+
+# USD per million tokens: (input, output). Cache writes cost 1.25x input, cache reads 0.1x input
+MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "claude-3-5-sonnet": (3.00, 15.00),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-3-haiku": (0.25, 1.25),
+    "claude-3-opus": (15.00, 75.00),
+}
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.1
+
+
+def model_pricing(model: Optional[str]) -> Optional[Tuple[float, float]]:
+    """Prices for a model name, matching dated and -latest variants by prefix"""
+    if not model:
+        return None
+    for prefix, pricing in MODEL_PRICING.items():
+        if model.startswith(prefix):
+            return pricing
+    return None
+
+
+def estimate_cost(usage: TokenUsage, model: Optional[str]) -> Optional[float]:
+    """Estimated USD cost of one move's usage, or None if the model isn't priced"""
+    pricing = model_pricing(model)
+    if pricing is None:
+        return None
+    input_price, output_price = pricing
+    uncached_input = usage.prompt_tokens - usage.cache_read_tokens - usage.cache_creation_tokens
+    cost = (
+        uncached_input * input_price
+        + usage.cache_creation_tokens * input_price * CACHE_WRITE_MULTIPLIER
+        + usage.cache_read_tokens * input_price * CACHE_READ_MULTIPLIER
+        + usage.completion_tokens * output_price
+    ) / 1_000_000
+    # A losing hedge duplicated the request; charge it at the winner's blended rate
+    billed_tokens = usage.total_tokens - usage.hedged_tokens
+    if usage.hedged_tokens and billed_tokens > 0:
+        cost *= usage.total_tokens / billed_tokens
+    return cost
+
+
+def percentile(values: Iterable[float], q: float, default: Optional[float] = None) -> Optional[float]:
+    """
+    Value at quantile q (0-1), or `default` if there are no values
+
+    Uses the nearest-rank method, so the result is always one of the values.
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return default
+    return ordered[max(1, math.ceil(q * len(ordered))) - 1]
+
+
+@dataclass
+class UsageSummary:
+    """Token, latency and cost totals for a game or an experiment"""
+    rounds: int
+    requests: int  # AI moves made
+    prompt_tokens: int
+    completion_tokens: int
+    cache_read_tokens: int
+    cache_creation_tokens: int
+    hedged_tokens: int
+    total_tokens: int
+    retries: int
+    mean_latency_seconds: float
+    p95_latency_seconds: float
+    wall_seconds: float
+    estimated_cost_usd: float  # Excludes models without known pricing
+    unpriced_requests: int = 0
+    cancelled_hedges: int = 0  # Hedged duplicates cancelled in flight, whose cost isn't in the totals
+
+    @property
+    def rounds_per_second(self) -> float:
+        return self.rounds / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.total_tokens / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    @property
+    def tokens_per_round(self) -> float:
+        return self.total_tokens / self.rounds if self.rounds else 0.0
+
+    @property
+    def cost_per_round_usd(self) -> float:
+        return self.estimated_cost_usd / self.rounds if self.rounds else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        """Fields plus derived throughput, for JSON output"""
+        summary = dict(vars(self))
+        summary.update(
+            rounds_per_second=self.rounds_per_second,
+            tokens_per_second=self.tokens_per_second,
+            tokens_per_round=self.tokens_per_round,
+            cost_per_round_usd=self.cost_per_round_usd
+        )
+        return summary
+
+
+def summarize_usage(
+    usages: Iterable[Tuple[TokenUsage, Optional[str]]],
+    rounds: int,
+    wall_seconds: float
+) -> UsageSummary:
+    """
+    Summarize per-move usage
+
+    Args:
+        usages: (usage, model) for every AI move
+        rounds: Rounds played
+        wall_seconds: Elapsed time, for throughput
+
+    Returns:
+        UsageSummary: Totals, latency and estimated cost
+    """
+    total = TokenUsage(0, 0, 0)
+    latencies = []
+    cost = 0.0
+    unpriced = 0
+    for usage, model in usages:
+        total = total + usage
+        latencies.append(usage.latency_seconds)
+        move_cost = estimate_cost(usage, model)
+        if move_cost is None:
+            unpriced += 1
+        else:
+            cost += move_cost
+
+    return UsageSummary(
+        rounds=rounds,
+        requests=len(latencies),
+        prompt_tokens=total.prompt_tokens,
+        completion_tokens=total.completion_tokens,
+        cache_read_tokens=total.cache_read_tokens,
+        cache_creation_tokens=total.cache_creation_tokens,
+        hedged_tokens=total.hedged_tokens,
+        total_tokens=total.total_tokens,
+        retries=total.retries,
+        mean_latency_seconds=sum(latencies) / len(latencies) if latencies else 0.0,
+        p95_latency_seconds=percentile(latencies, 0.95, default=0.0),
+        wall_seconds=wall_seconds,
+        estimated_cost_usd=cost,
+        unpriced_requests=unpriced,
+        cancelled_hedges=total.cancelled_hedges
+    )
+
+
+def round_usages(
+    rounds: List[RoundResult],
+    player1_model: Optional[str],
+    player2_model: Optional[str]
+) -> List[Tuple[TokenUsage, Optional[str]]]:
+    """(usage, model) for every AI move in a list of rounds"""
+    usages = []
+    for round_result in rounds:
+        for usage, model in (
+            (getattr(round_result, "player1_token_usage", None), player1_model),
+            (getattr(round_result, "player2_token_usage", None), player2_model)
+        ):
+            # Non-AI players have no usage
+            if isinstance(usage, TokenUsage):
+                usages.append((usage, model))
+    return usages
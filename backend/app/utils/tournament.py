@@ -0,0 +1,164 @@
+from typing import List, Optional, Dict, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+import multiprocessing
+import logging
+import os
+import numpy as np
+
+# Local imports
+from app.models.types import MatrixType
+from app.models.batch_game import run_batch_games
+from app.strategies import StrategyType, get_available_strategies
+from app.strategies.batch import has_batch_kernel
+
+logger = logging.getLogger(__name__)
+
+# Set in each worker process by _init_worker
+_shared_payoffs: Optional[np.ndarray] = None
+
+
+def _init_worker(shared_array, shape: Tuple[int, int, int]):
+    """Attach a worker process to the shared payoff array"""
+    global _shared_payoffs
+    _shared_payoffs = np.frombuffer(shared_array, dtype=np.float64).reshape(shape)
+
+
+def _play_pairing(
+    index: Tuple[int, int, int],
+    player1_type: StrategyType,
+    player2_type: StrategyType,
+    matrix_type: MatrixType,
+    num_games: int,
+    num_rounds: int,
+    seed: int
+) -> Tuple[int, int, int]:
+    """Play one pairing on the batch engine and write its average into the shared array"""
+    result = run_batch_games(
+        player1_type,
+        player2_type,
+        num_games=num_games,
+        num_rounds=num_rounds,
+        matrix_type=matrix_type,
+        seed=seed
+    )
+    _shared_payoffs[index] = result.player1_scores.mean() / max(num_rounds, 1)
+    return index
+
+
+@dataclass
+class LeaderboardEntry:
+    rank: int
+    strategy: str
+    avg_score_per_round: float
+
+
+@dataclass
+class TournamentResult:
+    strategies: List[StrategyType]
+    matrix_types: List[MatrixType]
+    payoffs: np.ndarray  # (matrix, row strategy, column strategy): row's average score per round
+
+    def leaderboard(self, matrix_type: Optional[MatrixType] = None) -> List[LeaderboardEntry]:
+        """
+        Rank strategies by average score per round
+
+        Args:
+            matrix_type: Rank within one matrix, or across all matrices if None
+
+        Returns:
+            List[LeaderboardEntry]: Entries sorted best first
+        """
+        if matrix_type is None:
+            scores = self.payoffs.mean(axis=(0, 2))
+        else:
+            scores = self.payoffs[self.matrix_types.index(matrix_type)].mean(axis=1)
+
+        order = np.argsort(-scores, kind="stable")
+        return [
+            LeaderboardEntry(
+                rank=rank + 1,
+                strategy=self.strategies[i].value,
+                avg_score_per_round=float(scores[i])
+            )
+            for rank, i in enumerate(order)
+        ]
+
+
+class Tournament:
+    """
+    Round-robin tournament between every classical strategy, for each matrix.
+
+    Every ordered pairing (including self-play) is an independent CPU-bound task
+    run on the batch engine in a process pool. Workers write their pairing's
+    average straight into a shared-memory array, so only indices travel back.
+    """
+
+    def __init__(
+        self,
+        matrix_types: Optional[List[MatrixType]] = None,
+        strategies: Optional[List[StrategyType]] = None,
+        num_games: int = 1000,
+        num_rounds: int = 10,
+        max_workers: Optional[int] = None,
+        seed: Optional[int] = None
+    ):
+        self.matrix_types = matrix_types or list(MatrixType)
+        self.strategies = strategies or [s for s in get_available_strategies() if has_batch_kernel(s)]
+        self.num_games = num_games
+        self.num_rounds = num_rounds
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.seed = seed
+
+        unsupported = [s.value for s in self.strategies if not has_batch_kernel(s)]
+        if unsupported:
+            raise ValueError(f"Strategies without batch kernels cannot enter a tournament: {unsupported}")
+
+    def set_progress_callback(self, callback):
+        self.progress_callback = callback
+
+    def run(self) -> TournamentResult:
+        """Play every pairing and return the payoff matrix of averages"""
+        shape = (len(self.matrix_types), len(self.strategies), len(self.strategies))
+        shared_array = multiprocessing.RawArray('d', int(np.prod(shape)))
+        payoffs = np.frombuffer(shared_array, dtype=np.float64).reshape(shape)
+
+        tasks = [
+            (m, i, j)
+            for m in range(shape[0])
+            for i in range(shape[1])
+            for j in range(shape[2])
+        ]
+        seeds = np.random.SeedSequence(self.seed).generate_state(len(tasks))
+
+        logger.info(f"Running tournament: {len(tasks)} pairings on {self.max_workers} workers")
+
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(shared_array, shape)
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _play_pairing,
+                    (m, i, j),
+                    self.strategies[i],
+                    self.strategies[j],
+                    self.matrix_types[m],
+                    self.num_games,
+                    self.num_rounds,
+                    int(seed)
+                )
+                for (m, i, j), seed in zip(tasks, seeds)
+            ]
+
+            for completed, future in enumerate(as_completed(futures), start=1):
+                future.result()
+                if hasattr(self, 'progress_callback'):
+                    self.progress_callback(completed, len(tasks))
+
+        return TournamentResult(
+            strategies=list(self.strategies),
+            matrix_types=list(self.matrix_types),
+            payoffs=payoffs.copy()
+        )
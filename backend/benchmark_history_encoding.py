@@ -0,0 +1,109 @@
+# benchmark_history_encoding.py
+import argparse
+import asyncio
+import os
+import random
+from typing import List, Optional
+import anthropic
+from app.models.types import Move, RoundResult, MATRIX_PAYOFFS, MatrixType
+from app.strategies.haiku_strategy import HaikuStrategy, PromptStyle, DEFAULT_MODEL
+from app.strategies.history_encoding import HistoryEncoding, decode_opponent_moves
+
+RECALL_QUESTION = (
+    "Ignore the usual response format. List your opponent's moves in every round so far, oldest first, "
+    "as a single string of C and D letters with nothing else, e.g. CCDC."
+)
+
+
+def random_history(num_rounds: int, rng: random.Random) -> List[RoundResult]:
+    """A random game, scored with the baseline matrix"""
+    payoffs = MATRIX_PAYOFFS[MatrixType.BASELINE]
+    table = {
+        (Move.COOPERATE, Move.COOPERATE): payoffs.cooperate_cooperate,
+        (Move.COOPERATE, Move.DEFECT): payoffs.cooperate_defect,
+        (Move.DEFECT, Move.COOPERATE): payoffs.defect_cooperate,
+        (Move.DEFECT, Move.DEFECT): payoffs.defect_defect
+    }
+    rounds = []
+    total1 = total2 = 0
+    for number in range(1, num_rounds + 1):
+        move1, move2 = rng.choice(list(Move)), rng.choice(list(Move))
+        score1, score2 = table[(move1, move2)]
+        total1 += score1
+        total2 += score2
+        rounds.append(RoundResult(number, move1, move2, "", "", score1, score2, total1, total2))
+    return rounds
+
+
+def build_strategy(encoding: HistoryEncoding, history: List[RoundResult], api_key: str) -> HaikuStrategy:
+    strategy = HaikuStrategy(
+        "Benchmark", True, api_key, prompt_style=PromptStyle.TRANSCRIPT, history_encoding=encoding, token_budget=None
+    )
+    for round_result in history:
+        strategy.add_round(round_result)
+    return strategy
+
+
+async def count_tokens(client: Optional[anthropic.AsyncAnthropic], strategy: HaikuStrategy, user_message) -> int:
+    """Input tokens for a request: counted by the API if a client is given, otherwise estimated"""
+    if client is None:
+        return (len(strategy.system_prompt) + len(user_message["content"])) // 4
+    result = await client.messages.count_tokens(
+        model=strategy.model_name,
+        system=strategy.system_prompt,
+        messages=[user_message]
+    )
+    return result.input_tokens
+
+
+async def model_recall(client: anthropic.AsyncAnthropic, strategy: HaikuStrategy, history: List[RoundResult]) -> bool:
+    """Whether the model reads the opponent's moves back correctly from the encoded history"""
+    user_message = strategy._next_user_message(len(history))
+    response = await client.messages.create(
+        model=strategy.model_name,
+        max_tokens=len(history) + 20,
+        system=strategy.system_prompt,
+        messages=[{"role": "user", "content": f"{user_message['content']}\n\n{RECALL_QUESTION}"}]
+    )
+    expected = "".join("C" if r.player2_move == Move.COOPERATE else "D" for r in history)
+    return response.content[0].text.strip().upper() == expected
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare history encodings on prompt size and readability")
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--samples", type=int, default=5, help="Random games per size")
+    parser.add_argument("--ask-model", action="store_true", help="Also check the model can read the history back (costs tokens)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    api_key = os.getenv("CLAUDE_API_KEY")
+    client = anthropic.AsyncAnthropic(api_key=api_key, base_url=os.getenv("CLAUDE_BASE_URL")) if api_key else None
+    if client is None:
+        print("CLAUDE_API_KEY not set: token counts are estimated at 4 characters per token")
+    rng = random.Random(args.seed)
+
+    print(f"\n{'encoding':10} {'rounds':>6} {'tokens':>8} {'tokens/round':>13} {'decoded':>8} {'model read':>11}")
+    for num_rounds in args.rounds:
+        games = [random_history(num_rounds, rng) for _ in range(args.samples)]
+        for encoding in HistoryEncoding:
+            tokens = decoded = recalled = 0
+            for history in games:
+                strategy = build_strategy(encoding, history, api_key or "benchmark-only")
+                user_message = strategy._next_user_message(num_rounds)
+                tokens += await count_tokens(client, strategy, user_message)
+                expected = [r.player2_move.value for r in history]
+                decoded += decode_opponent_moves(user_message["content"]) == expected
+                if args.ask_model and client is not None:
+                    recalled += await model_recall(client, strategy, history)
+
+            mean_tokens = tokens / len(games)
+            model_read = f"{recalled}/{len(games)}" if args.ask_model and client is not None else "-"
+            print(
+                f"{encoding.value:10} {num_rounds:6} {mean_tokens:8.0f} {mean_tokens / num_rounds:13.1f} "
+                f"{decoded}/{len(games):<6} {model_read:>11}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
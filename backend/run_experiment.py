@@ -1,23 +1,27 @@
 # experiments/run_experiment.py
 import asyncio
+import os
 from datetime import datetime
 from app.utils.experiment_runner import ExperimentConfig, ExperimentRunner
 from app.utils.experiment_storage import ExperimentStorage
 from app.models.types import MatrixType
 from app.strategies import StrategyType
+from app.strategies.haiku_strategy import DEFAULT_MODEL
+from app.utils.client_pool import warm_client_pool
 
 async def run_matrix_experiment(matrix_type: MatrixType):
     config = ExperimentConfig(
         matrix_type=matrix_type,
         num_games=10,
-        num_rounds=10
+        num_rounds=10,
+        concurrency=10
     )
     storage = ExperimentStorage()
     runner = ExperimentRunner(config, storage)
     
     # Add progress callback
-    def progress_callback(strategy: str, game_num: int, round_num: int):
-        print(f"Strategy: {strategy:15} Game: {game_num}/10  Round: {round_num}/10", end='\r')
+    def progress_callback(strategy: str, completed: int, in_flight: int):
+        print(f"Strategy: {strategy:15} Completed: {completed}/10  In flight: {in_flight}", end='\r')
     
     runner.set_progress_callback(progress_callback)
     results = await runner.run_full_experiment()
@@ -26,6 +30,10 @@ async def run_matrix_experiment(matrix_type: MatrixType):
 async def main():
     # Run experiments for different matrices
     print(f"\nStarting experiments at {datetime.now().strftime('%H:%M:%S')}")
+
+    # Open the shared client's connections before the first game
+    if os.getenv('CLAUDE_API_KEY'):
+        await warm_client_pool(os.getenv('CLAUDE_API_KEY'), [DEFAULT_MODEL])
     
     experiment_ids = []
     for matrix_type in [MatrixType.MIXED_30]: # TODO MatrixType.BASELINE, , MatrixType.MIXED_30, MatrixType.MIXED_70]: 
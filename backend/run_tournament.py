@@ -0,0 +1,28 @@
+# run_tournament.py
+from datetime import datetime
+from app.utils.tournament import Tournament
+
+def main():
+    print(f"\nStarting tournament at {datetime.now().strftime('%H:%M:%S')}")
+
+    tournament = Tournament(num_games=10000, num_rounds=10)
+
+    def progress_callback(completed: int, total: int):
+        print(f"Pairings: {completed}/{total}", end='\r')
+
+    tournament.set_progress_callback(progress_callback)
+    result = tournament.run()
+
+    for matrix_type in result.matrix_types:
+        print(f"\n\nLeaderboard for matrix: {matrix_type.value}")
+        for entry in result.leaderboard(matrix_type):
+            print(f"{entry.rank:2}. {entry.strategy:18} {entry.avg_score_per_round:6.3f}")
+
+    print("\n\nOverall leaderboard")
+    for entry in result.leaderboard():
+        print(f"{entry.rank:2}. {entry.strategy:18} {entry.avg_score_per_round:6.3f}")
+
+    print(f"\nTournament completed at {datetime.now().strftime('%H:%M:%S')}")
+
+if __name__ == "__main__":
+    main()
@@ -20,8 +20,8 @@ async def test_run():
     storage = ExperimentStorage()
     runner = ExperimentRunner(config, storage)
     
-    def progress_callback(strategy: str, game_num: int, round_num: int):
-        print(f"Strategy: {strategy:15} Game: {game_num}/5  Round: {round_num}/5", end='\r')
+    def progress_callback(strategy: str, completed: int, in_flight: int):
+        print(f"Strategy: {strategy:15} Completed: {completed}/5  In flight: {in_flight}", end='\r')
     
     runner.set_progress_callback(progress_callback)
     results = await runner.run_full_experiment()
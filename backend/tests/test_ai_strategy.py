@@ -60,4 +60,16 @@ async def test_ai_strategy_reset():
     
     assert strategy.total_tokens_used == 0
     assert len(strategy.conversation_history) == 0
-    assert strategy.last_error is None
\ No newline at end of file
+    assert strategy.last_error is None
+    assert strategy.last_usage is None
+
+@pytest.mark.asyncio
+async def test_ai_strategy_last_usage_is_per_move():
+    strategy = MockAIStrategy()
+    await strategy.get_move(0)
+    await strategy.get_move(1)
+
+    assert strategy.total_tokens_used == 300
+    assert strategy.last_usage.total_tokens == 150
+    assert strategy.last_usage.retries == 0
+    assert strategy.last_usage.latency_seconds >= 0
\ No newline at end of file
@@ -1,8 +1,30 @@
 # tests/test_api.py
 import pytest
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from app import create_app
+from app.models.game import Game
+from app.models.types import Move, TokenUsage
+from app.strategies.ai_strategy import AIStrategy, AIResponse
+from app.strategies.always_defect import AlwaysDefect
+from app.utils.history import GameHistory
+from app.api import routes
+from app.utils.event_loop import get_event_loop_thread
 import json
 
+class SlowAIStrategy(AIStrategy):
+    """AI player whose every move takes a while"""
+    def __init__(self):
+        super().__init__("Slow AI", True, retry_delay=0)
+        self.model_name = "slow-mock"
+        self.calls = 0
+
+    async def _get_ai_response(self, current_round: int) -> AIResponse:
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return AIResponse(move=Move.COOPERATE, reasoning="", token_usage=TokenUsage(10, 5, 15))
+
 @pytest.fixture
 def client():
     """Create a test client using an app configured for testing"""
@@ -18,6 +40,14 @@ def test_get_strategies(client):
     assert "strategies" in data
     assert len(data["strategies"]) > 0
 
+def test_llm_stats(client):
+    """Queue waits are reported per priority class"""
+    response = client.get('/api/llm/stats')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert "interactive_mean_wait" in data["rate_limiter"]
+    assert "batch_p95_wait" in data["rate_limiter"]
+
 def test_create_game(client):
     """Test creating a new game"""
     response = client.post('/api/game/new', 
@@ -94,4 +124,210 @@ def test_create_game_invalid_strategy(client):
                          })
     assert response.status_code == 400
     data = json.loads(response.data)
-    assert "error" in data
\ No newline at end of file
+    assert "error" in data
+def test_concurrent_games_share_one_loop(client, monkeypatch, tmp_path):
+    """Rounds from concurrent requests all run on the shared event loop"""
+    monkeypatch.setattr(routes, "game_history", GameHistory(str(tmp_path / "history.json")))
+    loops = set()
+    process_round = Game.process_round
+
+    async def recording_process_round(self):
+        loops.add(asyncio.get_running_loop())
+        return await process_round(self)
+
+    monkeypatch.setattr(Game, "process_round", recording_process_round)
+
+    def play(_):
+        with client.application.test_client() as thread_client:
+            game_id = thread_client.post('/api/game/new', json={
+                "player1Strategy": "tit_for_tat",
+                "player2Strategy": "always_defect",
+                "rounds": 3
+            }).get_json()["game_id"]
+            thread_client.post(f'/api/game/{game_id}/move')
+            response = thread_client.post(f'/api/game/{game_id}/complete')
+            history = thread_client.get(f'/api/game/{game_id}/history')
+            return response.status_code, len(response.get_json()["rounds"]), history.status_code
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(play, range(20)))
+
+    assert results == [(200, 2, 200)] * 20
+    assert loops == {get_event_loop_thread().loop}
+
+def read_events(body: str):
+    """(event, data) pairs from a Server-Sent Events body, skipping comments"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n") if not line.startswith(":"))
+        if fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+def test_stream_complete_game(client, monkeypatch, tmp_path):
+    """Each round is sent as its own event, then the final scores"""
+    monkeypatch.setattr(routes, "game_history", GameHistory(str(tmp_path / "history.json")))
+    game_id = client.post('/api/game/new', json={
+        "player1Strategy": "tit_for_tat",
+        "player2Strategy": "always_defect",
+        "rounds": 3
+    }).get_json()["game_id"]
+
+    response = client.post(f'/api/game/{game_id}/complete/stream')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+
+    events = read_events(response.get_data(as_text=True))
+    assert [event for event, _ in events] == ["round", "round", "round", "complete"]
+    assert [data["round_number"] for _, data in events[:3]] == [1, 2, 3]
+    assert events[2][1]["game_over"]
+    assert events[3][1]["final_scores"] == {"player1": 2, "player2": 7}
+    assert client.get(f'/api/game/{game_id}/state').status_code == 404
+
+def test_stream_stops_when_client_disconnects(client):
+    """Closing the stream cancels the rest of the game"""
+    strategy = SlowAIStrategy()
+    game_id, game = routes.game_storage.create_game(strategy, AlwaysDefect(is_player1=False), max_rounds=100)
+
+    response = client.post(f'/api/game/{game_id}/complete/stream', buffered=False)
+    stream = iter(response.response)
+    first = next(stream)
+    assert "event: round" in (first.decode() if isinstance(first, bytes) else first)
+    response.close()
+
+    time.sleep(0.2)
+    calls = strategy.calls
+    time.sleep(0.2)
+    assert strategy.calls == calls
+    assert game.current_round < 5
+    with routes.game_storage.in_use(game_id) as held:  # Closing the stream let go of the game
+        assert held is game
+    routes.game_storage.remove_game(game_id)
+
+def test_background_complete_game(client, monkeypatch, tmp_path):
+    """A background completion returns a job id straight away; the job has the result"""
+    monkeypatch.setattr(routes, "game_history", GameHistory(str(tmp_path / "history.json")))
+    game_id = client.post('/api/game/new', json={
+        "player1Strategy": "tit_for_tat",
+        "player2Strategy": "always_defect",
+        "rounds": 4
+    }).get_json()["game_id"]
+
+    response = client.post(f'/api/game/{game_id}/complete', json={"background": True})
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+
+    for _ in range(200):
+        job = client.get(f'/api/jobs/{job_id}').get_json()
+        if job["status"] not in ("queued", "running"):
+            break
+        time.sleep(0.01)
+
+    assert job["status"] == "succeeded"
+    assert (job["rounds_done"], job["rounds_total"]) == (4, 4)
+    assert job["result"]["final_scores"] == {"player1": 3, "player2": 8}
+    assert client.get(f'/api/game/{game_id}/state').status_code == 404
+    assert client.get('/api/jobs/missing').status_code == 404
+
+def test_game_is_busy_while_a_completion_job_plays_it(client):
+    """Moves and other completions are refused while a background job owns the game"""
+    strategy = SlowAIStrategy()
+    game_id, game = routes.game_storage.create_game(strategy, AlwaysDefect(is_player1=False), max_rounds=1000)
+
+    job_id = client.post(f'/api/game/{game_id}/complete', json={"background": True}).get_json()["job_id"]
+    for _ in range(200):
+        if game.current_round > 0:
+            break
+        time.sleep(0.01)
+
+    response = client.post(f'/api/game/{game_id}/move')
+    assert response.status_code == 409
+    assert response.get_json()["job_id"] == job_id
+    assert client.post(f'/api/game/{game_id}/complete').status_code == 409
+    assert client.post(f'/api/game/{game_id}/complete', json={"background": True}).status_code == 409
+    assert client.post(f'/api/game/{game_id}/complete/stream').status_code == 409
+
+    client.post(f'/api/jobs/{job_id}/cancel')
+    for _ in range(200):
+        if client.get(f'/api/jobs/{job_id}').get_json()["status"] == "cancelled":
+            break
+        time.sleep(0.01)
+    rounds = game.current_round
+    assert [r.round_number for r in game.rounds] == list(range(1, rounds + 1))
+
+    # Once the job has stopped the game can be played again
+    assert client.post(f'/api/game/{game_id}/move').get_json()["round_number"] == rounds + 1
+    routes.game_storage.remove_game(game_id)
+
+def test_game_batch_vectorized(client):
+    """Classical pairings run on the batch engine and answer with statistics straight away"""
+    response = client.post('/api/games/batch', json={
+        "games": [
+            {"player1Strategy": "tit_for_tat", "player2Strategy": "always_defect", "rounds": 4},
+            {"player1Strategy": "always_cooperate", "player2Strategy": "always_cooperate", "rounds": 10, "matrix": "stag_hunt"}
+        ],
+        "repeat": 500
+    })
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["status"] == "succeeded"
+
+    summary = data["summary"]
+    assert summary["games"] == 1000
+    first, second = summary["specs"]
+    assert first["player1_mean_score"] == 3 and first["player2_mean_score"] == 8
+    assert first["player2_win_rate"] == 1.0
+    assert second["player1_cooperation_rate"] == 1.0 and second["tie_rate"] == 1.0
+
+    details = client.get(f'/api/games/batch/{data["batch_id"]}').get_json()
+    assert details["progress"]["rounds_done"] == details["progress"]["rounds_total"] == 500 * 14
+    assert len(details["specs"][0]["player1_scores"]) == 500
+
+def test_game_batch_in_background(client):
+    response = client.post('/api/games/batch', json={
+        "games": [{"player1Strategy": "random", "player2Strategy": "pavlov"}],
+        "repeat": 10,
+        "seed": 3,
+        "wait": False
+    })
+    assert response.status_code in (200, 202)
+    batch_id = response.get_json()["batch_id"]
+
+    for _ in range(200):
+        data = client.get(f'/api/games/batch/{batch_id}').get_json()
+        if data["status"] == "succeeded":
+            break
+        time.sleep(0.01)
+    assert data["summary"]["games"] == 10
+
+def test_game_batch_cancelled_while_waiting(client, monkeypatch):
+    """A batch cancelled before it finished is reported as cancelled, not as a server error"""
+    async def slow_run(self):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(routes.BulkGameRunner, "run", slow_run)
+    executor = routes.get_job_executor()
+    wait = executor.wait
+
+    def cancel_then_wait(job_id, timeout=None):
+        executor.cancel(job_id)
+        return wait(job_id, timeout=timeout)
+
+    monkeypatch.setattr(executor, "wait", cancel_then_wait)
+    response = client.post('/api/games/batch', json={
+        "games": [{"player1Strategy": "tit_for_tat", "player2Strategy": "grim"}]
+    })
+    assert response.status_code == 409
+    assert response.get_json()["status"] == "cancelled"
+
+def test_game_batch_validation(client):
+    assert client.post('/api/games/batch', json={"games": []}).status_code == 400
+    assert client.post('/api/games/batch', json={"games": [{"player1Strategy": "tit_for_tat"}]}).status_code == 400
+    assert client.post('/api/games/batch', json={
+        "games": [{"player1Strategy": "tit_for_tat", "player2Strategy": "grim"}], "repeat": 10 ** 6
+    }).status_code == 400
+    assert client.post('/api/games/batch', json={"games": ["tit_for_tat"]}).status_code == 400
+    assert client.post('/api/games/batch', json={
+        "games": [{"player1Strategy": "tit_for_tat", "player2Strategy": "grim", "matrix": {"name": "baseline"}}]
+    }).status_code == 400
+    assert client.get('/api/games/batch/missing').status_code == 404
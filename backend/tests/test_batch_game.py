@@ -0,0 +1,61 @@
+import pytest
+import numpy as np
+from app.models.game import Game
+from app.models.batch_game import BatchGame, run_batch_games
+from app.models.types import Move, MatrixType, MATRIX_PAYOFFS
+from app.strategies import StrategyType, create_strategy
+from app.strategies.batch import create_batch_strategy, has_batch_kernel
+
+DETERMINISTIC = [
+    StrategyType.ALWAYS_COOPERATE,
+    StrategyType.ALWAYS_DEFECT,
+    StrategyType.TIT_FOR_TAT,
+    StrategyType.PAVLOV,
+    StrategyType.GRIM,
+]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("matrix_type", list(MatrixType))
+@pytest.mark.parametrize("player1_type", DETERMINISTIC)
+@pytest.mark.parametrize("player2_type", DETERMINISTIC)
+async def test_matches_scalar_game(matrix_type, player1_type, player2_type):
+    """Batch engine should produce the same scores as the scalar Game"""
+    game = Game(
+        create_strategy(player1_type, is_player1=True),
+        create_strategy(player2_type, is_player1=False),
+        max_rounds=7,
+        payoff_matrix=MATRIX_PAYOFFS[matrix_type]
+    )
+    rounds = await game.run_all_rounds()
+
+    result = run_batch_games(player1_type, player2_type, num_games=3, num_rounds=7, matrix_type=matrix_type)
+
+    assert np.all(result.player1_scores == game.player1_total_score)
+    assert np.all(result.player2_scores == game.player2_total_score)
+    p1_coop = sum(r.player1_move == Move.COOPERATE for r in rounds) / 7
+    assert np.allclose(result.player1_cooperation_rate, p1_coop)
+
+def test_stochastic_kernels_match_rates():
+    """Random and mixed optimal kernels should hit their cooperation rates"""
+    result = run_batch_games(StrategyType.RANDOM, StrategyType.OPTIMAL, num_games=20000, num_rounds=10, matrix_type=MatrixType.MIXED_30, seed=1)
+
+    assert result.num_games == 20000
+    assert abs(result.player1_cooperation_rate.mean() - 0.5) < 0.01
+    assert abs(result.player2_cooperation_rate.mean() - 0.3) < 0.01
+
+def test_seed_is_reproducible():
+    a = run_batch_games(StrategyType.RANDOM, StrategyType.PAVLOV, num_games=100, seed=7)
+    b = run_batch_games(StrategyType.RANDOM, StrategyType.PAVLOV, num_games=100, seed=7)
+    assert np.array_equal(a.player1_scores, b.player1_scores)
+
+def test_ai_strategy_has_no_kernel():
+    assert not has_batch_kernel(StrategyType.CLAUDE_HAIKU)
+    with pytest.raises(ValueError):
+        create_batch_strategy(StrategyType.CLAUDE_HAIKU, num_games=1)
+
+def test_mismatched_batch_sizes():
+    with pytest.raises(ValueError):
+        BatchGame(
+            create_batch_strategy(StrategyType.TIT_FOR_TAT, num_games=2),
+            create_batch_strategy(StrategyType.TIT_FOR_TAT, num_games=3)
+        )
@@ -0,0 +1,85 @@
+# tests/test_bulk_games.py
+import pytest
+import asyncio
+from app.models.game import Game
+from app.models.types import MatrixType, MATRIX_PAYOFFS
+from app.strategies import StrategyType
+from app.strategies.pool import StrategyPool
+from app.utils.bulk_games import MAX_BULK_ROUNDS, BulkGameRunner, GameSpec, parse_game_specs
+
+def test_parse_game_specs_defaults():
+    specs = parse_game_specs({"games": [{"player1Strategy": "grim", "player2Strategy": "random"}], "repeat": 3})
+    assert specs == [GameSpec(StrategyType.GRIM, StrategyType.RANDOM, rounds=10, matrix=MatrixType.BASELINE, repeat=3)]
+    assert specs[0].vectorized
+
+def test_parse_game_specs_rejects_bad_values():
+    with pytest.raises(ValueError):
+        parse_game_specs({"games": [{"player1Strategy": "grim", "player2Strategy": "nope"}]})
+    with pytest.raises(ValueError):
+        parse_game_specs({"games": [{"player1Strategy": "grim", "player2Strategy": "grim", "rounds": 0}]})
+    with pytest.raises(ValueError):
+        parse_game_specs({"games": [{"player1Strategy": "grim", "player2Strategy": "grim", "matrix": "nope"}]})
+
+@pytest.mark.parametrize("body", [
+    [{"player1Strategy": "grim", "player2Strategy": "grim"}],
+    {"games": ["grim"]},
+    {"games": [["grim", "random"]]},
+    {"games": [{"player1Strategy": "grim", "player2Strategy": "grim", "matrix": ["baseline"]}]},
+    {"games": [{"player1Strategy": "grim", "player2Strategy": "grim", "rounds": "many"}]},
+    {"games": [{"player1Strategy": "grim", "player2Strategy": "grim", "rounds": MAX_BULK_ROUNDS + 1}]},
+    {"games": [{"player1Strategy": "grim", "player2Strategy": "grim"}], "repeat": None}
+])
+def test_parse_game_specs_reports_malformed_specs_as_value_errors(body):
+    with pytest.raises(ValueError):
+        parse_game_specs(body)
+
+@pytest.mark.asyncio
+async def test_scalar_path_matches_vectorized(monkeypatch):
+    """Specs that can't be vectorized run as ordinary games with the same results"""
+    specs = [GameSpec(StrategyType.PAVLOV, StrategyType.TIT_FOR_TAT, rounds=6, matrix=MatrixType.MIXED_70, repeat=20)]
+    vectorized = await BulkGameRunner(specs).run()
+
+    monkeypatch.setattr(GameSpec, "vectorized", property(lambda self: False))
+    progress = []
+    runner = BulkGameRunner(specs, concurrency=4)
+    runner.set_progress_callback(lambda rounds, tokens: progress.append(rounds))
+    scalar = await runner.run()
+
+    for key in ("player1_mean_score", "player2_mean_score", "player1_cooperation_rate", "tie_rate"):
+        assert scalar["summary"]["specs"][0][key] == pytest.approx(vectorized["summary"]["specs"][0][key])
+    assert scalar["specs"][0]["player1_scores"] == vectorized["specs"][0]["player1_scores"]
+    assert sum(progress) == 20 * 6
+
+@pytest.mark.asyncio
+async def test_scalar_path_bounds_games_in_flight(monkeypatch):
+    """Only `concurrency` games and tasks exist at a time, however many the spec repeats"""
+    monkeypatch.setattr(GameSpec, "vectorized", property(lambda self: False))
+    in_flight = 0
+    peak = 0
+    peak_tasks = 0
+    run_all_rounds = Game.run_all_rounds
+
+    async def counting_run_all_rounds(self):
+        nonlocal in_flight, peak, peak_tasks
+        in_flight += 1
+        peak = max(peak, in_flight)
+        peak_tasks = max(peak_tasks, len(asyncio.all_tasks()))
+        try:
+            await asyncio.sleep(0)
+            return await run_all_rounds(self)
+        finally:
+            in_flight -= 1
+
+    monkeypatch.setattr(Game, "run_all_rounds", counting_run_all_rounds)
+    specs = [GameSpec(StrategyType.GRIM, StrategyType.RANDOM, rounds=3, repeat=500)]
+    result = await BulkGameRunner(specs, concurrency=4).run()
+
+    assert result["summary"]["games"] == 500
+    assert peak == 4
+    assert peak_tasks <= 4 + 1  # The workers and the test itself
+
+def test_ai_players_are_prompted_with_the_spec_matrix(monkeypatch):
+    monkeypatch.setenv("CLAUDE_API_KEY", "fake-key")
+    strategy = StrategyPool().acquire(StrategyType.CLAUDE_HAIKU, True, MatrixType.STAG_HUNT)
+    assert strategy.payoff_matrix == MATRIX_PAYOFFS[MatrixType.STAG_HUNT]
+    assert "If you both DEFECT: You get 3 points" in strategy.system_prompt
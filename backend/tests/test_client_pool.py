@@ -0,0 +1,44 @@
+import pytest
+import asyncio
+from unittest.mock import AsyncMock, patch
+from app.utils.client_pool import get_client, warm_client_pool
+from app.strategies.haiku_strategy import HaikuStrategy
+
+@pytest.mark.asyncio
+async def test_client_shared_per_key_and_model():
+    client = get_client("key-a", "model-1")
+    assert get_client("key-a", "model-1") is client
+    assert get_client("key-b", "model-1") is not client
+    assert get_client("key-a", "model-2") is not client
+
+def test_clients_not_shared_across_loops():
+    async def fetch():
+        return get_client("key-a", "model-1")
+
+    first = asyncio.run(fetch())
+    second = asyncio.run(fetch())
+    assert first is not second
+
+@pytest.mark.asyncio
+async def test_strategies_share_pooled_client():
+    strategy1 = HaikuStrategy("Test", True, "pool-key")
+    strategy2 = HaikuStrategy("Test", False, "pool-key")
+    assert strategy1.client is strategy2.client
+
+    # An explicitly set client takes precedence
+    mock_client = AsyncMock()
+    strategy1.client = mock_client
+    assert strategy1.client is mock_client
+
+@pytest.mark.asyncio
+async def test_warm_client_pool_opens_connection():
+    client = get_client("warm-key", "model-1")
+    with patch.object(client.models, "list", new=AsyncMock()) as mock_list:
+        await warm_client_pool("warm-key", ["model-1"])
+    mock_list.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_warm_client_pool_tolerates_errors():
+    client = get_client("warm-key", "model-2")
+    with patch.object(client.models, "list", new=AsyncMock(side_effect=Exception("offline"))):
+        await warm_client_pool("warm-key", ["model-2"])
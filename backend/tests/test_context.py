@@ -0,0 +1,127 @@
+import pytest
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.models.game import Game
+from app.models.types import Move, RoundResult
+from app.strategies import StrategyType, create_strategy
+from app.strategies.always_defect import AlwaysDefect
+from app.strategies.context import SlidingWindowPolicy, FullHistoryPolicy, create_context_policy
+from app.strategies.haiku_strategy import HaikuStrategy, PromptStyle
+
+def make_round(number, player1_move, player2_move, player1_score, player2_score):
+    return RoundResult(
+        round_number=number,
+        player1_move=player1_move,
+        player2_move=player2_move,
+        player1_reasoning="",
+        player2_reasoning="",
+        player1_score=player1_score,
+        player2_score=player2_score,
+        cumulative_player1_score=0,
+        cumulative_player2_score=0
+    )
+
+def test_aggregates_are_from_each_players_view():
+    policy = SlidingWindowPolicy(window=1)
+    policy.observe(make_round(1, Move.COOPERATE, Move.DEFECT, 0, 5), is_player1=True)
+    policy.observe(make_round(2, Move.DEFECT, Move.DEFECT, 1, 1), is_player1=True)
+    policy.observe(make_round(3, Move.DEFECT, Move.COOPERATE, 5, 0), is_player1=True)
+
+    totals = policy.aggregates
+    assert totals.outcome_counts == {"CC": 0, "CD": 1, "DC": 1, "DD": 1}
+    assert (totals.my_score, totals.opponent_score) == (6, 6)
+    assert totals.opponent_defection_streak == 0
+    assert totals.longest_opponent_defection_streak == 2
+
+    player2 = SlidingWindowPolicy(window=1)
+    player2.observe(make_round(1, Move.COOPERATE, Move.DEFECT, 0, 5), is_player1=False)
+    assert player2.aggregates.outcome_counts["DC"] == 1
+    assert player2.aggregates.my_score == 5
+
+def test_summary_only_once_rounds_fall_out_of_the_window():
+    policy = SlidingWindowPolicy(window=2)
+    history = [make_round(n, Move.COOPERATE, Move.DEFECT, 0, 5) for n in range(1, 4)]
+    for round_result in history[:2]:
+        policy.observe(round_result, is_player1=True)
+    assert policy.summary() is None
+
+    policy.observe(history[2], is_player1=True)
+    assert "all 3 rounds" in policy.summary()
+    assert "defection streak: 3" in policy.summary()
+    assert policy.visible_rounds(history) == history[1:]
+
+def test_create_context_policy():
+    assert isinstance(create_context_policy(), FullHistoryPolicy)
+    assert create_context_policy(5).window == 5
+    with pytest.raises(ValueError):
+        create_context_policy(0)
+
+def test_bounded_context_needs_transcript_prompts():
+    with patch('anthropic.AsyncAnthropic'):
+        strategy = HaikuStrategy("Test", True, "fake-key", context_policy=SlidingWindowPolicy(5))
+        assert strategy.prompt_style == PromptStyle.TRANSCRIPT
+        with pytest.raises(ValueError):
+            HaikuStrategy("Test", True, "fake-key", prompt_style=PromptStyle.CONVERSATION, context_policy=SlidingWindowPolicy(5))
+
+@pytest.mark.asyncio
+async def test_long_game_has_flat_prompts():
+    with patch('anthropic.AsyncAnthropic'):
+        strategy = HaikuStrategy("Test", True, "fake-key", context_policy=SlidingWindowPolicy(10), token_budget=None)
+    strategy.rate_limiter = None
+    prompt_sizes = []
+
+    async def create(**params):
+        prompt_sizes.append(len(params["messages"][-1]["content"][0]["text"]))
+        response = MagicMock()
+        response.content = [MagicMock(text=json.dumps({"move": "DEFECT", "reasoning": "Test reasoning"}))]
+        response.usage = MagicMock(input_tokens=prompt_sizes[-1] // 4, output_tokens=10, cache_read_input_tokens=0, cache_creation_input_tokens=0)
+        return response
+
+    mock_client = AsyncMock()
+    mock_client.messages.create.side_effect = create
+    strategy.client = mock_client
+
+    game = Game(strategy, AlwaysDefect(is_player1=False), max_rounds=1000)
+    results = await game.run_all_rounds()
+
+    assert len(results) == 1000
+    assert strategy.last_error is None
+    assert all(entry["move"] == "defect" for entry in strategy.conversation_history)
+    # Once the window is full, prompts only grow by the digits in the counters
+    assert max(prompt_sizes[20:]) - min(prompt_sizes[20:]) < 50
+
+@pytest.mark.asyncio
+async def test_configured_window_has_no_default_token_budget(monkeypatch):
+    monkeypatch.setenv("CLAUDE_API_KEY", "fake-key")
+    monkeypatch.setenv("CLAUDE_CONTEXT_WINDOW", "10")
+    monkeypatch.delenv("CLAUDE_TOKEN_BUDGET", raising=False)
+    strategy = create_strategy(StrategyType.CLAUDE_HAIKU, is_player1=True)
+    strategy.rate_limiter = None
+
+    async def create(**params):
+        response = MagicMock()
+        response.content = [MagicMock(text=json.dumps({"move": "DEFECT", "reasoning": "Test reasoning"}))]
+        response.usage = MagicMock(input_tokens=300, output_tokens=50, cache_read_input_tokens=0, cache_creation_input_tokens=0)
+        return response
+
+    mock_client = AsyncMock()
+    mock_client.messages.create.side_effect = create
+    strategy.client = mock_client
+
+    game = Game(strategy, AlwaysDefect(is_player1=False), max_rounds=500)
+    results = await game.run_all_rounds()
+
+    assert strategy.token_budget is None
+    assert len(results) == 500
+    assert strategy.last_error is None
+    assert all(entry["move"] == "defect" for entry in strategy.conversation_history)
+
+def test_explicit_token_budget_still_applies_with_a_window(monkeypatch):
+    monkeypatch.setenv("CLAUDE_API_KEY", "fake-key")
+    monkeypatch.setenv("CLAUDE_CONTEXT_WINDOW", "10")
+    monkeypatch.setenv("CLAUDE_TOKEN_BUDGET", "5000")
+    assert create_strategy(StrategyType.CLAUDE_HAIKU, is_player1=True).token_budget == 5000
+
+    monkeypatch.delenv("CLAUDE_CONTEXT_WINDOW")
+    monkeypatch.delenv("CLAUDE_TOKEN_BUDGET")
+    assert create_strategy(StrategyType.CLAUDE_HAIKU, is_player1=True).token_budget == 10000
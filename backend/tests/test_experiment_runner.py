@@ -201,4 +201,84 @@ async def test_run_llm_vs_llm_games(runner):
 def test_metrics_calculation_empty_games(runner):
     """Test metrics calculation with empty games list"""
     with pytest.raises(ValueError):
-        runner._calculate_experiment_metrics([])
\ No newline at end of file
+        runner._calculate_experiment_metrics([])
+# Test concurrent game execution
+@pytest.mark.asyncio
+async def test_concurrent_games_keep_order(mock_storage):
+    """Games run concurrently but results come back in game order"""
+    config = ExperimentConfig(
+        matrix_type=MatrixType.BASELINE,
+        num_games=6,
+        num_rounds=1,
+        strategies_to_test=[StrategyType.ALWAYS_COOPERATE],
+        concurrency=3
+    )
+    runner = ExperimentRunner(config, mock_storage)
+    progress = []
+    runner.set_progress_callback(lambda strategy, completed, in_flight: progress.append((completed, in_flight)))
+
+    running = 0
+    max_running = 0
+
+    def make_mock_game(game_num):
+        game = Mock(spec=Game)
+        game.player1_total_score = game_num
+        game.player2_total_score = 0
+
+        async def run_all_rounds():
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            # Earlier games finish last
+            await asyncio.sleep(0.01 * (6 - game_num))
+            running -= 1
+            return [Mock(player1_move=Move.COOPERATE, player2_move=Move.COOPERATE)]
+
+        game.run_all_rounds = run_all_rounds
+        return game
+
+    mock_games = iter(make_mock_game(n) for n in range(6))
+    with patch('app.strategies.pool.create_strategy'), \
+         patch('app.utils.experiment_runner.Game', side_effect=lambda **kwargs: next(mock_games)):
+        games = await runner._run_strategy_games(StrategyType.ALWAYS_COOPERATE)
+
+    assert [g.final_scores[0] for g in games] == list(range(6))
+    assert max_running == 3
+    assert progress[-1] == (6, 0)
+    assert max(in_flight for _, in_flight in progress) == 3
+
+@pytest.mark.asyncio
+async def test_concurrent_game_error_cancels_others(mock_storage):
+    """A failing game cancels the games still in flight"""
+    config = ExperimentConfig(
+        matrix_type=MatrixType.BASELINE,
+        num_games=4,
+        num_rounds=1,
+        strategies_to_test=[StrategyType.ALWAYS_COOPERATE],
+        concurrency=4
+    )
+    runner = ExperimentRunner(config, mock_storage)
+    cancelled = []
+
+    def make_mock_game(game_num):
+        game = Mock(spec=Game)
+
+        async def run_all_rounds():
+            if game_num == 0:
+                raise Exception("Game error")
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(game_num)
+                raise
+
+        game.run_all_rounds = run_all_rounds
+        return game
+
+    mock_games = iter(make_mock_game(n) for n in range(4))
+    with patch('app.strategies.pool.create_strategy'), \
+         patch('app.utils.experiment_runner.Game', side_effect=lambda **kwargs: next(mock_games)):
+        with pytest.raises(Exception, match="Game error"):
+            await runner._run_strategy_games(StrategyType.ALWAYS_COOPERATE)
+
+    assert sorted(cancelled) == [1, 2, 3]
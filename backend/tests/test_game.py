@@ -1,5 +1,8 @@
 import pytest
+import asyncio
 from app.models.game import Game, Move
+from app.models.types import TokenUsage
+from app.strategies.ai_strategy import AIStrategy, AIResponse
 from app.strategies.base import BaseStrategy
 from app.strategies.always_cooperate import AlwaysCooperate
 from app.strategies.haiku_strategy import HaikuStrategy
@@ -138,6 +141,7 @@ def mock_haiku_strategy():
         async def get_move(self, current_round: int) -> Move:
             # Override to avoid fallback behavior
             self.conversation_history = [{"reasoning": "Test reasoning"}]
+            self.last_usage = TokenUsage(100, 0, 100)
             return Move.COOPERATE
 
         async def _get_ai_response(self, current_round):
@@ -164,4 +168,109 @@ async def test_game_with_ai_player(mock_haiku_strategy):
     
     assert result.token_usage is not None
     assert result.player1_reasoning == "Test reasoning"
-    assert result.token_usage.prompt_tokens == 100
\ No newline at end of file
+    assert result.token_usage.prompt_tokens == 100
+    assert result.player1_token_usage.prompt_tokens == 100
+    assert result.player2_token_usage is None
+
+    # Usage is per round, not cumulative
+    result = await game.process_round()
+    assert result.token_usage.prompt_tokens == 100
+
+class CallLog:
+    """Which rounds' AI requests started and finished, and how many overlapped"""
+    def __init__(self):
+        self.started = []
+        self.finished = []
+        self.running = 0
+        self.max_running = 0
+
+class SlowAIStrategy(AIStrategy):
+    """AI strategy whose responses take a fixed amount of time"""
+    def __init__(self, is_player1: bool, delay: float = 0.2, error: Exception = None, calls: CallLog = None):
+        super().__init__("Slow AI", is_player1)
+        self.model_name = "slow-model"
+        self.delay = delay
+        self.error = error
+        self.calls = calls or CallLog()
+
+    async def get_move(self, current_round: int) -> Move:
+        response = await self._get_ai_response(current_round)
+        if self.error:
+            raise self.error
+        self.conversation_history.append({"reasoning": response.reasoning})
+        return response.move
+
+    async def _get_ai_response(self, current_round: int) -> AIResponse:
+        self.calls.started.append(current_round)
+        self.calls.running += 1
+        self.calls.max_running = max(self.calls.max_running, self.calls.running)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.calls.running -= 1
+        self.calls.finished.append(current_round)
+        return AIResponse(move=Move.COOPERATE, reasoning="Slow reasoning", token_usage=TokenUsage(0, 0, 0))
+
+@pytest.mark.asyncio
+async def test_ai_moves_are_collected_concurrently():
+    """Both AI players should be asked for their move at the same time"""
+    calls = CallLog()
+    game = Game(SlowAIStrategy(True, calls=calls), SlowAIStrategy(False, calls=calls))
+
+    result = await game.process_round()
+
+    assert calls.max_running == 2  # The second request started before the first finished
+    assert result.player1_reasoning == "Slow reasoning"
+    assert result.player2_reasoning == "Slow reasoning"
+
+@pytest.mark.asyncio
+async def test_concurrent_move_errors_are_recorded():
+    """An error from one side is recorded in ai_errors and re-raised"""
+    game = Game(
+        SlowAIStrategy(True, delay=0.01),
+        SlowAIStrategy(False, delay=0.01, error=ValueError("Token budget exceeded"))
+    )
+
+    with pytest.raises(ValueError, match="Token budget exceeded"):
+        await game.process_round()
+
+    assert game.ai_errors["player1"] is None
+    assert game.ai_errors["player2"] == "Token budget exceeded"
+    assert game.current_round == 0
+
+@pytest.mark.asyncio
+async def test_prefetched_moves_are_used():
+    """With prefetch on, the next round's AI request starts when the previous round is scored"""
+    player1 = SlowAIStrategy(True, delay=0.01)
+    calls = player1.calls
+    game = Game(player1, AlwaysCooperate(is_player1=False), max_rounds=3)
+    game.prefetch = True
+    game.prefetch_moves()
+    await asyncio.sleep(0)
+    assert calls.started == [0]  # Requested before the round is asked for
+
+    await game.process_round()
+    assert "player1" in game._prefetched  # Round 2 is already being requested
+    await asyncio.sleep(0)
+    assert calls.started == [0, 1]
+
+    await game.process_round()
+    assert game._prefetched["player1"][0] == 2  # Round 3 prefetched too
+
+    await game.process_round()
+    assert game.is_game_over()
+    assert game._prefetched == {}
+    # Every round used its prefetched request instead of asking again
+    assert calls.started == [0, 1, 2]
+    assert calls.finished == [0, 1, 2]
+
+@pytest.mark.asyncio
+async def test_reset_cancels_prefetched_moves():
+    game = Game(SlowAIStrategy(True), AlwaysCooperate(is_player1=False))
+    game.prefetch_moves()
+    _, task = game._prefetched["player1"]
+
+    game.reset()
+    await asyncio.sleep(0)
+    assert task.cancelled()
+    assert game._prefetched == {}
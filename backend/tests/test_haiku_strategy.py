@@ -215,4 +215,238 @@ async def test_full_game_round(strategy, mock_anthropic_client, sample_round_res
     move = await strategy.get_move(1)
     assert move == Move.COOPERATE
     assert len(strategy.conversation_history) == 1
-    assert strategy.total_tokens_used == 80
\ No newline at end of file
+    assert strategy.total_tokens_used == 80
+@pytest.mark.asyncio
+async def test_rate_limit_error(strategy, mock_anthropic_client):
+    """Test 429s are surfaced with the provider's retry-after"""
+    from app.utils.rate_limiter import RateLimitedError
+
+    mock_http_response = MagicMock(status_code=429, headers={"retry-after": "3"})
+    mock_client = AsyncMock()
+    mock_client.messages.create.side_effect = anthropic.RateLimitError(
+        message="Rate limited",
+        response=mock_http_response,
+        body=None
+    )
+    strategy.client = mock_client
+
+    with pytest.raises(RateLimitedError) as exc_info:
+        await strategy._get_ai_response(0)
+    assert exc_info.value.retry_after == 3.0
+
+# Prompt caching tests
+def make_response(move="COOPERATE", input_tokens=50, output_tokens=30, cache_read=0, cache_creation=0):
+    mock_response = MagicMock()
+    mock_response.content = [MagicMock(text=json.dumps({"move": move, "reasoning": "Test reasoning"}))]
+    mock_response.usage.input_tokens = input_tokens
+    mock_response.usage.output_tokens = output_tokens
+    mock_response.usage.cache_read_input_tokens = cache_read
+    mock_response.usage.cache_creation_input_tokens = cache_creation
+    return mock_response
+
+@pytest.mark.asyncio
+async def test_conversation_prefix_is_append_only(strategy, sample_round_result):
+    """Each request should start with the previous request's messages unchanged"""
+    mock_client = AsyncMock()
+    mock_client.messages.create.return_value = make_response()
+    strategy.client = mock_client
+
+    await strategy._get_ai_response(0)
+    strategy.add_round(sample_round_result)
+    await strategy._get_ai_response(1)
+
+    first, second = [call.kwargs for call in mock_client.messages.create.call_args_list]
+    assert first["system"] == second["system"]
+    assert first["system"][0]["cache_control"] == {"type": "ephemeral"}
+
+    assert len(first["messages"]) == 1
+    assert len(second["messages"]) == 3
+    assert second["messages"][0]["content"] == first["messages"][0]["content"][0]["text"]
+    assert second["messages"][1]["role"] == "assistant"
+    assert second["messages"][-1]["content"][0]["cache_control"] == {"type": "ephemeral"}
+    # Only the new round is reported in the new turn
+    assert "Opponent played: defect" in second["messages"][-1]["content"][0]["text"]
+    assert "Opponent played" not in second["messages"][0]["content"]
+
+@pytest.mark.asyncio
+async def test_cache_token_accounting(strategy):
+    """Cache reads and writes should be reported separately and included in prompt tokens"""
+    mock_client = AsyncMock()
+    mock_client.messages.create.return_value = make_response(input_tokens=20, cache_read=1000, cache_creation=200)
+    strategy.client = mock_client
+
+    response = await strategy._get_ai_response(0)
+    assert response.token_usage.prompt_tokens == 1220
+    assert response.token_usage.cache_read_tokens == 1000
+    assert response.token_usage.cache_creation_tokens == 200
+    assert response.token_usage.total_tokens == 1250
+
+@pytest.mark.asyncio
+async def test_failed_request_does_not_extend_conversation(strategy):
+    mock_client = AsyncMock()
+    mock_client.messages.create.return_value = MagicMock(content=[MagicMock(text="Invalid JSON")])
+    strategy.client = mock_client
+
+    with pytest.raises(ValueError):
+        await strategy._get_ai_response(0)
+    assert strategy._transcript == []
+
+@pytest.mark.asyncio
+async def test_transcript_prompt_style(mock_anthropic_client, sample_round_result):
+    from app.strategies.haiku_strategy import PromptStyle
+    strategy = HaikuStrategy("Test", True, "fake-key", prompt_style=PromptStyle.TRANSCRIPT)
+    mock_client = AsyncMock()
+    mock_client.messages.create.return_value = make_response()
+    strategy.client = mock_client
+
+    strategy.add_round(sample_round_result)
+    await strategy._get_ai_response(1)
+
+    messages = mock_client.messages.create.call_args.kwargs["messages"]
+    assert len(messages) == 1
+    assert "Game history" in messages[0]["content"][0]["text"]
+    assert strategy._transcript == []
+
+@pytest.mark.asyncio
+async def test_reset_clears_conversation(strategy):
+    mock_client = AsyncMock()
+    mock_client.messages.create.return_value = make_response()
+    strategy.client = mock_client
+
+    await strategy._get_ai_response(0)
+    strategy.reset()
+    assert strategy._transcript == []
+    assert strategy._reported_rounds == 0
+
+# Streaming tests
+class FakeStream:
+    """Async iterable of messages API stream events"""
+    def __init__(self, text, chunk=6):
+        usage = MagicMock(input_tokens=40, cache_read_input_tokens=0, cache_creation_input_tokens=0)
+        self.events = [MagicMock(type="message_start", message=MagicMock(usage=usage))]
+        for start in range(0, len(text), chunk):
+            self.events.append(MagicMock(type="content_block_delta", delta=MagicMock(type="text_delta", text=text[start:start + chunk])))
+        self.events.append(MagicMock(type="message_delta", usage=MagicMock(output_tokens=25)))
+        self.closed = False
+
+    async def __aiter__(self):
+        for event in self.events:
+            yield event
+
+    async def close(self):
+        self.closed = True
+
+@pytest.mark.asyncio
+async def test_streamed_reasoning_patches_round(mock_anthropic_client, sample_round_result):
+    from app.strategies.haiku_strategy import REASONING_PENDING
+    strategy = HaikuStrategy("Test", True, "fake-key", stream=True)
+    mock_client = AsyncMock()
+    mock_client.messages.create.return_value = FakeStream(json.dumps({"move": "COOPERATE", "reasoning": "Be nice"}))
+    strategy.client = mock_client
+
+    move = await strategy.get_move(0)
+    assert move == Move.COOPERATE
+    assert mock_client.messages.create.call_args.kwargs["stream"] is True
+
+    # The game records the round before the reasoning has arrived
+    round_result = sample_round_result
+    round_result.player1_reasoning = strategy.conversation_history[-1]["reasoning"]
+    strategy.add_round(round_result)
+    await strategy.drain_reasoning()
+
+    assert strategy.conversation_history[-1]["reasoning"] == "Be nice"
+    assert strategy.conversation_history[-1]["token_usage"]["completion_tokens"] == 25
+    assert round_result.player1_reasoning == "Be nice"
+    assert REASONING_PENDING not in strategy._transcript[-1]["content"]
+
+@pytest.mark.asyncio
+async def test_stream_closed_early_without_reasoning_capture(mock_anthropic_client):
+    strategy = HaikuStrategy("Test", True, "fake-key", stream=True, capture_reasoning=False)
+    stream = FakeStream(json.dumps({"move": "DEFECT", "reasoning": "x" * 200}))
+    mock_client = AsyncMock()
+    mock_client.messages.create.return_value = stream
+    strategy.client = mock_client
+
+    response = await strategy._get_ai_response(0)
+
+    assert response.move == Move.DEFECT
+    assert stream.closed
+    assert json.loads(strategy._transcript[-1]["content"]) == {"move": "DEFECT"}
+
+@pytest.mark.asyncio
+async def test_stream_with_reasoning_first(mock_anthropic_client):
+    """A response that doesn't lead with the move is parsed once complete"""
+    strategy = HaikuStrategy("Test", True, "fake-key", stream=True)
+    mock_client = AsyncMock()
+    mock_client.messages.create.return_value = FakeStream("{\"reasoning\": \"Hmm\", \"move\": \"DEFECT\"}")
+    strategy.client = mock_client
+
+    response = await strategy._get_ai_response(0)
+    assert response.move == Move.DEFECT
+    assert response.reasoning == "Hmm"
+
+@pytest.mark.asyncio
+async def test_stream_without_move(mock_anthropic_client):
+    strategy = HaikuStrategy("Test", True, "fake-key", stream=True)
+    mock_client = AsyncMock()
+    mock_client.messages.create.return_value = FakeStream("not json")
+    strategy.client = mock_client
+
+    with pytest.raises(ValueError, match="Failed to parse AI response"):
+        await strategy._get_ai_response(0)
+
+# Structured output tests
+@pytest.mark.asyncio
+async def test_structured_output_forces_move_tool(mock_anthropic_client):
+    strategy = HaikuStrategy("Test", True, "fake-key", structured_output=True)
+    tool_block = MagicMock(type="tool_use", input={"reasoning": "Tool reasoning", "move": "DEFECT"})
+    tool_block.name = "make_move"
+    mock_response = make_response()
+    mock_response.content = [tool_block]
+    mock_client = AsyncMock()
+    mock_client.messages.create.return_value = mock_response
+    strategy.client = mock_client
+
+    response = await strategy._get_ai_response(0)
+
+    assert response.move == Move.DEFECT
+    assert response.reasoning == "Tool reasoning"
+    params = mock_client.messages.create.call_args.kwargs
+    assert params["tool_choice"] == {"type": "tool", "name": "make_move"}
+    assert params["tools"][0]["input_schema"]["properties"]["move"]["enum"] == ["COOPERATE", "DEFECT"]
+    assert "make_move tool" in strategy.system_prompt
+    assert strategy.parse_failures == 0
+
+@pytest.mark.parametrize("prompt_style", ["conversation", "transcript"])
+def test_structured_output_prompts_ask_for_the_tool(prompt_style):
+    from app.strategies.haiku_strategy import PromptStyle
+    strategy = HaikuStrategy(
+        "Test", True, "fake-key", structured_output=True, prompt_style=PromptStyle(prompt_style)
+    )
+
+    user_turn = strategy._next_user_message(0)["content"]
+
+    assert "call the make_move tool with your move and reasoning" in user_turn
+    assert "JSON" not in user_turn
+    assert "JSON" not in strategy.system_prompt
+
+@pytest.mark.asyncio
+async def test_prose_around_json_is_recovered(strategy):
+    mock_response = make_response()
+    mock_response.content = [MagicMock(text='Sure! Here is my move:\n{"reasoning": "They defected", "move": "DEFECT"}\nGood luck.')]
+    mock_client = AsyncMock()
+    mock_client.messages.create.return_value = mock_response
+    strategy.client = mock_client
+
+    response = await strategy._get_ai_response(0)
+
+    assert response.move == Move.DEFECT
+    assert response.reasoning == "They defected"
+    assert strategy.parse_failures == 1
+    assert strategy.parse_recoveries == 1
+
+def test_truncated_json_is_recovered(strategy):
+    move, reasoning = strategy._parse_response('{"move": "COOPERATE", "reasoning": "Keep the peace", "extra": ')
+    assert move == Move.COOPERATE
+    assert reasoning == "Keep the peace"
+    assert strategy.parse_recoveries == 1
@@ -0,0 +1,190 @@
+import pytest
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.models.types import Move
+from app.strategies.haiku_strategy import HaikuStrategy
+from app.utils.hedging import HedgePolicy, LatencyTracker
+from app.utils.rate_limiter import RateLimiter
+
+class SlowThenFast:
+    """Request whose first copy is slow and later copies are fast"""
+    def __init__(self, slow=1.0, fast=0.01):
+        self.delays = [slow]
+        self.fast = fast
+        self.started = 0
+        self.cancelled = 0
+
+    async def __call__(self):
+        delay = self.delays.pop(0) if self.delays else self.fast
+        self.started += 1
+        copy = self.started
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return copy
+
+def trained_policy(latency=0.02, samples=20, **kwargs):
+    tracker = LatencyTracker()
+    for _ in range(samples):
+        tracker.record(latency)
+    return HedgePolicy(min_samples=samples, min_delay=0.0, tracker=tracker, **kwargs)
+
+def test_latency_percentile():
+    tracker = LatencyTracker(window=100)
+    assert tracker.percentile(0.95) is None
+    for ms in range(1, 101):
+        tracker.record(ms / 1000)
+    assert tracker.percentile(0.95) == 0.095
+    assert tracker.percentile(0.5) == 0.05
+
+def test_no_hedging_until_enough_samples():
+    policy = HedgePolicy(min_samples=5)
+    for _ in range(4):
+        policy.tracker.record(0.1)
+    assert policy.hedge_delay() is None
+    policy.tracker.record(0.1)
+    assert policy.hedge_delay() == 0.1
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged_and_loser_cancelled():
+    policy = trained_policy()
+    request = SlowThenFast()
+    discarded = []
+
+    assert await policy.run(request, discard=discarded.append) == 2
+    await asyncio.sleep(0)  # Let the cancellation land
+    assert request.started == 2
+    assert request.cancelled == 1
+    assert discarded == [None]
+    stats = policy.stats()
+    assert stats["hedges_sent"] == 1
+    assert stats["hedges_won"] == 1
+
+@pytest.mark.asyncio
+async def test_primary_latency_is_learned_when_the_hedge_wins():
+    policy = trained_policy(latency=0.05)
+    request = SlowThenFast(slow=1.0, fast=0.01)
+
+    assert await policy.run(request) == 2
+    # The primary had been outstanding past the hedge delay; the hedge itself took 0.01s
+    assert policy.tracker.percentile(0.99) > 0.05
+
+@pytest.mark.asyncio
+async def test_fast_request_is_not_hedged():
+    policy = trained_policy(latency=0.5)
+    request = SlowThenFast(slow=0.01)
+
+    assert await policy.run(request) == 1
+    assert request.started == 1
+    assert policy.stats()["hedges_sent"] == 0
+
+@pytest.mark.asyncio
+async def test_hedge_budget_limits_duplicates():
+    policy = trained_policy(max_hedge_fraction=0.1)
+    await policy.run(SlowThenFast(slow=0.2))
+
+    request = SlowThenFast(slow=0.1)
+    assert await policy.run(request) == 1
+    assert request.started == 1
+    assert policy.stats()["hedges_skipped"] == 1
+
+@pytest.mark.asyncio
+async def test_failed_copy_falls_back_to_the_other():
+    policy = trained_policy()
+    calls = 0
+
+    async def request():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(0.1)
+            raise ValueError("primary failed")
+        await asyncio.sleep(0.2)
+        return "hedge"
+
+    assert await policy.run(request) == "hedge"
+
+@pytest.mark.asyncio
+async def test_both_copies_failing_raises():
+    policy = trained_policy()
+
+    async def request():
+        await asyncio.sleep(0.05)
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError, match="failed"):
+        await policy.run(request)
+
+@pytest.mark.asyncio
+async def test_unavailable_hedge_is_skipped():
+    policy = trained_policy()
+    request = SlowThenFast(slow=0.1)
+
+    assert await policy.run(request, hedge=lambda: None) == 1
+    assert request.started == 1
+    assert policy.stats()["hedges_sent"] == 0
+    assert policy.stats()["hedges_skipped"] == 1
+
+def hedged_strategy(delays, rate_limiter=None):
+    """HaikuStrategy that always hedges, with the first request taking delays[0] seconds"""
+    with patch('anthropic.AsyncAnthropic'):
+        strategy = HaikuStrategy("Test", True, "fake-key", hedge=True)
+    strategy.hedge_policy = trained_policy()
+    strategy.rate_limiter = rate_limiter
+
+    response = MagicMock()
+    response.content = [MagicMock(text=json.dumps({"move": "DEFECT", "reasoning": "Test reasoning"}))]
+    response.usage = MagicMock(input_tokens=50, output_tokens=30, cache_read_input_tokens=0, cache_creation_input_tokens=0)
+
+    async def create(**kwargs):
+        await asyncio.sleep(delays.pop(0) if delays else 0.01)
+        return response
+
+    mock_client = AsyncMock()
+    mock_client.messages.create.side_effect = create
+    strategy.client = mock_client
+    return strategy, mock_client
+
+@pytest.mark.asyncio
+async def test_hedge_takes_its_own_rate_limiter_slot():
+    limiter = RateLimiter(initial_concurrency=2, max_concurrency=2)
+    strategy, mock_client = hedged_strategy([0.2], limiter)
+
+    await limiter.acquire()  # The first copy's slot, as the transport would take it
+    result = await strategy._get_ai_response(0)
+    limiter.release()
+
+    assert mock_client.messages.create.call_count == 2
+    assert result.move == Move.DEFECT
+    assert limiter.stats()["total_requests"] == 2
+    assert limiter.stats()["in_flight"] == 0
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_a_free_rate_limiter_slot():
+    limiter = RateLimiter(initial_concurrency=1, max_concurrency=1)
+    strategy, mock_client = hedged_strategy([0.1], limiter)
+
+    await limiter.acquire()
+    await strategy._get_ai_response(0)
+    limiter.release()
+
+    assert mock_client.messages.create.call_count == 1
+    assert limiter.stats()["total_requests"] == 1
+    assert strategy.hedge_policy.stats()["hedges_skipped"] == 1
+
+@pytest.mark.asyncio
+async def test_hedged_strategy_reports_the_cancelled_duplicate():
+    strategy, mock_client = hedged_strategy([1.0])
+
+    result = await strategy._get_ai_response(0)
+    assert result.move == Move.DEFECT
+    assert mock_client.messages.create.call_count == 2
+    # The cancelled copy's cost is unknown, so it is counted rather than guessed
+    assert result.token_usage.cancelled_hedges == 1
+    assert result.token_usage.hedged_tokens == 0
+    assert result.token_usage.total_tokens == 80
+    # Only the winner is recorded in the conversation
+    assert len(strategy._transcript) == 2
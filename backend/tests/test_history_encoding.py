@@ -0,0 +1,59 @@
+import pytest
+from unittest.mock import patch
+from app.models.types import Move, RoundResult
+from app.strategies import StrategyType
+from app.strategies.haiku_strategy import HaikuStrategy, PromptStyle
+from app.strategies.history_encoding import HistoryEncoding, decode_opponent_moves, encode_rounds, encoding_legend
+from app.strategies.pool import StrategyPool
+
+@pytest.fixture
+def rounds():
+    return [
+        RoundResult(1, Move.COOPERATE, Move.DEFECT, "", "", 0, 5, 0, 5),
+        RoundResult(2, Move.DEFECT, Move.DEFECT, "", "", 1, 1, 1, 6),
+        RoundResult(3, Move.DEFECT, Move.COOPERATE, "", "", 5, 0, 6, 6)
+    ]
+
+def test_moves_encoding(rounds):
+    assert encode_rounds(rounds, True, HistoryEncoding.MOVES) == "Rounds 1-3: CD,DD,DC\nTotal scores: You: 6, Opponent: 6"
+    assert encode_rounds(rounds[:1], False, HistoryEncoding.MOVES) == "Round 1: DC\nTotal scores: You: 5, Opponent: 0"
+
+def test_table_encoding(rounds):
+    lines = encode_rounds(rounds, False, HistoryEncoding.TABLE).splitlines()
+    assert len(lines) == 4
+    assert lines[1] == "1 | D | C | 5 | 0"
+
+@pytest.mark.parametrize("encoding", list(HistoryEncoding))
+@pytest.mark.parametrize("is_player1", [True, False])
+def test_every_encoding_decodes(rounds, encoding, is_player1):
+    text = encode_rounds(rounds, is_player1, encoding)
+    opponent_moves = [(r.player2_move if is_player1 else r.player1_move).value for r in rounds]
+    assert decode_opponent_moves(text) == opponent_moves
+
+def test_moves_decode_across_conversation_updates(rounds):
+    text = "\n".join([
+        encode_rounds(rounds[:1], True, HistoryEncoding.MOVES),
+        encode_rounds(rounds[1:], True, HistoryEncoding.MOVES)
+    ])
+    assert decode_opponent_moves(text) == ["defect", "defect", "cooperate"]
+
+def test_compact_encoding_is_shorter(rounds):
+    verbose = encode_rounds(rounds * 10, True, HistoryEncoding.VERBOSE)
+    compact = encode_rounds(rounds * 10, True, HistoryEncoding.MOVES)
+    assert len(compact) * 5 < len(verbose)
+
+def test_strategy_prompt_uses_encoding(rounds):
+    with patch('anthropic.AsyncAnthropic'):
+        strategy = HaikuStrategy("Test", True, "fake-key", prompt_style=PromptStyle.TRANSCRIPT, history_encoding=HistoryEncoding.MOVES)
+    for round_result in rounds:
+        strategy.add_round(round_result)
+
+    assert encoding_legend(HistoryEncoding.MOVES) in strategy.system_prompt
+    assert "Rounds 1-3: CD,DD,DC" in strategy._next_user_message(3)["content"]
+    assert encoding_legend(HistoryEncoding.VERBOSE) is None
+
+def test_pool_creates_strategies_with_encoding(monkeypatch):
+    monkeypatch.setenv("CLAUDE_API_KEY", "fake-key")
+    pool = StrategyPool(history_encoding=HistoryEncoding.TABLE)
+    strategy = pool.acquire(StrategyType.CLAUDE_HAIKU, is_player1=True)
+    assert strategy.history_encoding == HistoryEncoding.TABLE
@@ -0,0 +1,112 @@
+# tests/test_jobs.py
+import pytest
+import asyncio
+import time
+from app.utils.event_loop import EventLoopThread
+from app.utils.jobs import Job, JobExecutor, JobStatus, JobStore
+from app.utils.llm_scheduler import Priority, current_work_class
+
+@pytest.fixture
+def loop_thread():
+    thread = EventLoopThread(name="test-jobs")
+    yield thread
+    thread.stop()
+
+def wait_for(executor, job_id, timeout=2.0):
+    """Poll a job until it finishes"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = executor.get(job_id)
+        if job.finished:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+def test_job_reports_progress_and_result(loop_thread):
+    executor = JobExecutor(max_workers=2, loop_thread=loop_thread)
+    seen = {}
+
+    async def play(job: Job):
+        seen["work_class"] = current_work_class()
+        for _ in range(job.params["rounds"]):
+            await asyncio.sleep(0)
+            job.update_progress(rounds=1, tokens=100)
+        return {"done": True}
+
+    executor.register("play", play, Priority.INTERACTIVE)
+    job = executor.submit("play", {"rounds": 3}, rounds_total=3)
+    assert job.status == JobStatus.QUEUED
+
+    job = wait_for(executor, job.job_id)
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.result == {"done": True}
+    assert (job.rounds_done, job.tokens_used) == (3, 300)
+    assert seen["work_class"].priority == Priority.INTERACTIVE
+
+def test_workers_bound_running_jobs(loop_thread):
+    executor = JobExecutor(max_workers=2, loop_thread=loop_thread)
+    running = 0
+    max_running = 0
+
+    async def work(job: Job):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        return {}
+
+    executor.register("work", work)
+    jobs = [executor.submit("work", {}) for _ in range(6)]
+    for job in jobs:
+        wait_for(executor, job.job_id)
+    assert max_running == 2
+    assert executor.stats()["succeeded"] == 6
+
+def test_failed_and_cancelled_jobs(loop_thread):
+    executor = JobExecutor(max_workers=1, loop_thread=loop_thread)
+
+    async def fail(job: Job):
+        raise ValueError("no such game")
+
+    async def hang(job: Job):
+        await asyncio.sleep(10)
+
+    executor.register("fail", fail)
+    executor.register("hang", hang)
+
+    failed = wait_for(executor, executor.submit("fail", {}).job_id)
+    assert failed.status == JobStatus.FAILED
+    assert failed.error == "no such game"
+
+    hanging = executor.submit("hang", {})
+    queued = executor.submit("hang", {})
+    assert executor.cancel(queued.job_id)
+    assert executor.cancel(hanging.job_id)
+    assert wait_for(executor, hanging.job_id).status == JobStatus.CANCELLED
+    assert wait_for(executor, queued.job_id).status == JobStatus.CANCELLED
+    assert not executor.cancel(hanging.job_id)
+
+    with pytest.raises(ValueError):
+        executor.submit("unknown", {})
+
+def test_queued_jobs_survive_a_restart(tmp_path, loop_thread):
+    path = str(tmp_path / "jobs.db")
+    store = JobStore(path)
+    # A job left queued by a process that stopped
+    store.save(Job(job_id="left-over", kind="work", params={"n": 2}))
+    store.save(Job(job_id="done", kind="work", params={"n": 1}, status=JobStatus.SUCCEEDED))
+
+    executor = JobExecutor(store=JobStore(path), loop_thread=loop_thread)
+
+    async def work(job: Job):
+        return {"n": job.params["n"]}
+
+    executor.register("work", work)
+    resumed = executor.resume()
+
+    assert [job.job_id for job in resumed] == ["left-over"]
+    job = wait_for(executor, "left-over")
+    assert job.result == {"n": 2}
+    assert JobStore(path).load("left-over").status == JobStatus.SUCCEEDED
+    assert JobStore(path).unfinished() == []
@@ -0,0 +1,116 @@
+import pytest
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+import anthropic
+from app.utils.llm_cache import LLMCache, CachingClient, CacheMode, LLMCacheMiss
+
+def make_message(text: str) -> anthropic.types.Message:
+    return anthropic.types.Message.model_validate({
+        "id": "msg_test",
+        "type": "message",
+        "role": "assistant",
+        "model": "test-model",
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": 10, "output_tokens": 5}
+    })
+
+REQUEST = {
+    "model": "test-model",
+    "max_tokens": 150,
+    "system": "You are playing a game",
+    "messages": [{"role": "user", "content": "Round 1"}]
+}
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMCache(str(tmp_path / "cache.db"))
+
+def make_client(cache, mode, delay=0.0):
+    inner = MagicMock()
+    calls = []
+
+    async def create(**params):
+        calls.append(params)
+        await asyncio.sleep(delay)
+        return make_message(f'{{"move": "COOPERATE", "reasoning": "call {len(calls)}"}}')
+
+    inner.messages.create = create
+    return CachingClient(inner, cache, mode), calls
+
+def test_key_depends_on_every_parameter():
+    key = LLMCache.make_key(REQUEST)
+    assert key == LLMCache.make_key(dict(REQUEST))
+    assert key != LLMCache.make_key({**REQUEST, "temperature": 0.5})
+    assert key != LLMCache.make_key({**REQUEST, "system": "Different prompt"})
+
+@pytest.mark.asyncio
+async def test_record_then_replay(cache):
+    recorder, calls = make_client(cache, CacheMode.RECORD)
+    recorded = await recorder.messages.create(**REQUEST)
+    await recorder.messages.create(**REQUEST)
+    assert len(calls) == 2  # Record mode always samples the provider
+
+    replayer, replay_calls = make_client(cache, CacheMode.REPLAY)
+    replayed = await replayer.messages.create(**REQUEST)
+
+    assert replay_calls == []
+    assert replayed.content[0].text == '{"move": "COOPERATE", "reasoning": "call 2"}'
+    assert replayed.usage.input_tokens == recorded.usage.input_tokens
+
+@pytest.mark.asyncio
+async def test_replay_miss_raises(cache):
+    replayer, _ = make_client(cache, CacheMode.REPLAY)
+    with pytest.raises(LLMCacheMiss):
+        await replayer.messages.create(**REQUEST)
+
+@pytest.mark.asyncio
+async def test_read_through_coalesces_in_flight_requests(cache):
+    client, calls = make_client(cache, CacheMode.READ_THROUGH, delay=0.05)
+
+    responses = await asyncio.gather(*(client.messages.create(**REQUEST) for _ in range(5)))
+
+    assert len(calls) == 1
+    assert len({r.content[0].text for r in responses}) == 1
+    assert cache.stats()["coalesced"] == 4
+
+    # Later identical requests are served from disk
+    await client.messages.create(**REQUEST)
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_read_through_propagates_errors_to_waiters(cache):
+    inner = MagicMock()
+    inner.messages.create = AsyncMock(side_effect=ValueError("provider down"))
+    client = CachingClient(inner, cache, CacheMode.READ_THROUGH)
+
+    results = await asyncio.gather(
+        *(client.messages.create(**REQUEST) for _ in range(3)),
+        return_exceptions=True
+    )
+    assert all(isinstance(r, ValueError) for r in results)
+    assert cache.get(LLMCache.make_key(REQUEST)) is None
+
+@pytest.mark.asyncio
+async def test_streams_bypass_cache(cache):
+    client, calls = make_client(cache, CacheMode.READ_THROUGH)
+    await client.messages.create(**REQUEST, stream=True)
+    assert cache.get(LLMCache.make_key({**REQUEST, "stream": True})) is None
+
+@pytest.mark.asyncio
+async def test_read_through_waiters_survive_cancelled_leader(cache):
+    client, calls = make_client(cache, CacheMode.READ_THROUGH, delay=0.05)
+
+    leader = asyncio.create_task(client.messages.create(**REQUEST))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(client.messages.create(**REQUEST))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    response = await follower
+    assert leader.cancelled()
+    assert response.content[0].text == '{"move": "COOPERATE", "reasoning": "call 2"}'
+    assert len(calls) == 2  # The follower reissued the call itself
+    assert cache.get(LLMCache.make_key(REQUEST)) is not None
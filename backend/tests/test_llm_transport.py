@@ -0,0 +1,147 @@
+import pytest
+import asyncio
+import random
+import anthropic
+from unittest.mock import MagicMock
+from app.models.types import Move, TokenUsage
+from app.strategies.ai_strategy import AIStrategy, AIResponse
+from app.utils.rate_limiter import RateLimitedError
+from app.utils.llm_transport import (
+    BackoffPolicy, CallInfo, CircuitBreaker, CircuitState, CircuitOpenError, ErrorKind, LLMTransport,
+    LLMTransportError, LLMClientError, LLMServerError, LLMTimeoutError, classify_error
+)
+
+class FailingRequest:
+    """Request that raises the given errors in turn, then succeeds"""
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+def test_backoff_is_jittered_and_capped():
+    policy = BackoffPolicy(base_delay=1.0, max_delay=5.0, rng=random.Random(0))
+    delays = [policy.delay(retry) for retry in range(10) for _ in range(20)]
+    assert all(0 <= d <= 5.0 for d in delays)
+    assert len(set(delays)) == len(delays)
+    assert max(policy.delay(0) for _ in range(100)) <= 1.0
+
+def test_classify_error():
+    assert classify_error(LLMTimeoutError("t")) == ErrorKind.TIMEOUT
+    assert classify_error(asyncio.TimeoutError()) == ErrorKind.TIMEOUT
+    assert classify_error(LLMServerError("s")) == ErrorKind.SERVER
+    assert classify_error(LLMClientError("c")) == ErrorKind.CLIENT
+    assert classify_error(RateLimitedError("r")) == ErrorKind.RATE_LIMITED
+    assert classify_error(ValueError("v")) == ErrorKind.UNKNOWN
+
+    response = MagicMock(status_code=529, headers={})
+    assert classify_error(anthropic.APIStatusError("overloaded", response=response, body=None)) == ErrorKind.SERVER
+    response = MagicMock(status_code=400, headers={})
+    assert classify_error(anthropic.BadRequestError("bad", response=response, body=None)) == ErrorKind.CLIENT
+
+def test_circuit_breaker_cycle():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    # After the reset timeout, exactly one probe is let through
+    assert breaker.allow()
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.allow()
+
+def test_circuit_stays_open_until_timeout():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60.0)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+@pytest.mark.asyncio
+async def test_transport_retries_transient_errors():
+    transport = LLMTransport()
+    request = FailingRequest(LLMServerError("500"), LLMTimeoutError("timeout"))
+
+    assert await transport.call(request, max_retries=3, base_delay=0) == "ok"
+
+    stats = transport.stats()
+    assert request.calls == 3
+    assert stats["retries"] == 2
+    assert stats["errors_server"] == 1
+    assert stats["errors_timeout"] == 1
+    assert stats["successes"] == 1
+
+@pytest.mark.asyncio
+async def test_call_info_counts_attempts():
+    transport = LLMTransport()
+    info = CallInfo()
+    await transport.call(FailingRequest(LLMServerError("500")), max_retries=3, base_delay=0, call_info=info)
+
+    assert info.attempts == 2
+    assert info.retries == 1
+    assert info.rate_limited == 0
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried():
+    transport = LLMTransport()
+    request = FailingRequest(LLMClientError("400"))
+
+    with pytest.raises(LLMTransportError, match="Failed after 1 attempts"):
+        await transport.call(request, max_retries=3, base_delay=0)
+    assert request.calls == 1
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast():
+    transport = LLMTransport(CircuitBreaker(failure_threshold=2, reset_timeout=60.0))
+    with pytest.raises(LLMTransportError):
+        await transport.call(FailingRequest(LLMServerError("a"), LLMServerError("b")), max_retries=2, base_delay=0)
+
+    request = FailingRequest()
+    with pytest.raises(CircuitOpenError):
+        await transport.call(request, base_delay=0)
+    assert request.calls == 0
+    assert transport.stats()["circuit_rejections"] == 1
+    assert transport.stats()["circuit_state"] == "open"
+
+@pytest.mark.asyncio
+async def test_backoff_does_not_block_other_tasks():
+    transport = LLMTransport()
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        for _ in range(5):
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    request = FailingRequest(LLMServerError("500"))
+    await asyncio.gather(transport.call(request, base_delay=0.2), ticker())
+    assert ticks == 5
+
+class ServerErrorStrategy(AIStrategy):
+    def __init__(self, transport):
+        super().__init__("Mock AI", True, retry_delay=0, transport=transport)
+        self.calls = 0
+
+    async def _get_ai_response(self, current_round: int) -> AIResponse:
+        self.calls += 1
+        raise LLMServerError("Anthropic API error: 503")
+
+@pytest.mark.asyncio
+async def test_strategies_share_the_circuit():
+    transport = LLMTransport(CircuitBreaker(failure_threshold=3, reset_timeout=60.0))
+    first = ServerErrorStrategy(transport)
+    second = ServerErrorStrategy(transport)
+
+    assert await first.get_move(0) == Move.COOPERATE
+    assert "Failed after 3 attempts" in first.last_error
+
+    assert await second.get_move(0) == Move.COOPERATE
+    assert second.calls == 0
+    assert "Circuit breaker open" in second.last_error
@@ -0,0 +1,153 @@
+import pytest
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from app.models.game import Game
+from app.models.types import Move, MatrixType
+from app.strategies import StrategyType
+from app.strategies.always_defect import AlwaysDefect
+from app.strategies.haiku_strategy import HaikuStrategy
+from app.utils.experiment_runner import ExperimentConfig, ExperimentRunner
+from app.utils.lockstep import (
+    BatchBackend, ConcurrentBatchBackend, MessageBatchBackend, BatchRequestError, LockstepScheduler
+)
+
+def make_response(move="COOPERATE"):
+    response = MagicMock()
+    response.content = [MagicMock(text=json.dumps({"move": move, "reasoning": "Test reasoning"}))]
+    response.usage.input_tokens = 50
+    response.usage.output_tokens = 30
+    return response
+
+class RecordingBackend(BatchBackend):
+    """Answers every request with a cooperate move and records wave sizes"""
+    def __init__(self):
+        self.waves = []
+
+    async def submit(self, items):
+        self.waves.append(len(items))
+        return [make_response() for _ in items]
+
+def make_ai_strategy(client=None):
+    strategy = HaikuStrategy("Test Haiku", True, "fake-key")
+    strategy.rate_limiter = None
+    strategy.client = client or AsyncMock()
+    return strategy
+
+def make_games(num_games, num_rounds=3):
+    return [
+        Game(player1_strategy=make_ai_strategy(), player2_strategy=AlwaysDefect(is_player1=False), max_rounds=num_rounds)
+        for _ in range(num_games)
+    ]
+
+@pytest.mark.asyncio
+async def test_one_wave_per_round():
+    backend = RecordingBackend()
+    games = make_games(5, num_rounds=3)
+
+    rounds = await LockstepScheduler(games, backend).run()
+
+    assert backend.waves == [5, 5, 5]
+    assert all(len(game_rounds) == 3 for game_rounds in rounds)
+    assert all(r.player1_move == Move.COOPERATE for game_rounds in rounds for r in game_rounds)
+    # The strategies' own clients are never called directly
+    assert not games[0].player1_strategy.client.messages.create.called
+
+@pytest.mark.asyncio
+async def test_games_of_different_lengths():
+    backend = RecordingBackend()
+    games = make_games(2, num_rounds=1) + make_games(2, num_rounds=2)
+
+    rounds = await LockstepScheduler(games, backend).run()
+
+    assert backend.waves == [4, 2]
+    assert [len(game_rounds) for game_rounds in rounds] == [1, 1, 2, 2]
+
+@pytest.mark.asyncio
+async def test_strategies_restored_after_run():
+    client = AsyncMock()
+    strategy = make_ai_strategy(client)
+    game = Game(player1_strategy=strategy, player2_strategy=AlwaysDefect(is_player1=False), max_rounds=1)
+
+    await LockstepScheduler([game], RecordingBackend()).run()
+
+    assert strategy.client is client
+    assert strategy.request_timeout == 30.0
+
+@pytest.mark.asyncio
+async def test_failed_requests_are_retried_in_a_later_flush():
+    class FlakyBackend(RecordingBackend):
+        async def submit(self, items):
+            self.waves.append(len(items))
+            if len(self.waves) == 1:
+                return [BatchRequestError("errored")] + [make_response() for _ in items[1:]]
+            return [make_response() for _ in items]
+
+    backend = FlakyBackend()
+    games = make_games(3, num_rounds=1)
+    for game in games:
+        game.player1_strategy.retry_delay = 0
+
+    await LockstepScheduler(games, backend, linger=0.01).run()
+
+    assert backend.waves == [3, 1]
+    assert all(game.ai_errors["player1"] is None for game in games)
+
+@pytest.mark.asyncio
+async def test_concurrent_backend_calls_each_client():
+    client = AsyncMock()
+    client.messages.create.return_value = make_response("DEFECT")
+    games = [
+        Game(player1_strategy=make_ai_strategy(client), player2_strategy=AlwaysDefect(is_player1=False), max_rounds=2)
+        for _ in range(3)
+    ]
+
+    rounds = await LockstepScheduler(games, ConcurrentBatchBackend()).run()
+
+    assert client.messages.create.call_count == 6
+    assert all(r.player1_move == Move.DEFECT for game_rounds in rounds for r in game_rounds)
+
+@pytest.mark.asyncio
+async def test_message_batch_backend():
+    batch = SimpleNamespace(id="batch-1", processing_status="in_progress")
+    ended = SimpleNamespace(id="batch-1", processing_status="ended")
+    message = make_response()
+
+    async def results(batch_id):
+        async def entries():
+            yield SimpleNamespace(custom_id="req-1", result=SimpleNamespace(type="errored"))
+            yield SimpleNamespace(custom_id="req-0", result=SimpleNamespace(type="succeeded", message=message))
+        return entries()
+
+    client = MagicMock()
+    client.messages.batches.create = AsyncMock(return_value=batch)
+    client.messages.batches.retrieve = AsyncMock(return_value=ended)
+    client.messages.batches.results = results
+
+    from app.utils.lockstep import BatchItem
+    outcomes = await MessageBatchBackend(poll_interval=0).submit([
+        BatchItem(client, {"model": "m"}), BatchItem(client, {"model": "m"})
+    ])
+
+    requests = client.messages.batches.create.call_args.kwargs["requests"]
+    assert [r["custom_id"] for r in requests] == ["req-0", "req-1"]
+    assert outcomes[0] is message
+    assert isinstance(outcomes[1], BatchRequestError)
+
+@pytest.mark.asyncio
+async def test_runner_lockstep_mode():
+    config = ExperimentConfig(
+        matrix_type=MatrixType.BASELINE,
+        num_games=4,
+        num_rounds=3,
+        player1_strategy=StrategyType.ALWAYS_COOPERATE,
+        strategies_to_test=[StrategyType.ALWAYS_DEFECT],
+        lockstep=True
+    )
+    runner = ExperimentRunner(config, MagicMock())
+
+    games = await runner._run_strategy_games(StrategyType.ALWAYS_DEFECT)
+
+    assert len(games) == 4
+    assert all(g.final_scores == (0, 15) for g in games)
+    assert runner.strategy_pool.size() == 8
@@ -0,0 +1,119 @@
+import pytest
+import numpy as np
+from unittest.mock import Mock, AsyncMock
+from app.models.game import Game
+from app.models.batch_game import run_batch_games
+from app.models.types import MatrixType, MATRIX_PAYOFFS
+from app.strategies import StrategyType, create_strategy
+from app.strategies.haiku_strategy import HaikuStrategy
+from app.utils.markov_solver import solve_game, solve_strategies, memory_one_policy
+from app.utils.experiment_runner import ExperimentRunner, ExperimentConfig
+from app.utils.experiment_storage import ExperimentStorage
+
+MEMORY_ONE = [
+    StrategyType.ALWAYS_COOPERATE,
+    StrategyType.ALWAYS_DEFECT,
+    StrategyType.TIT_FOR_TAT,
+    StrategyType.PAVLOV,
+    StrategyType.GRIM,
+    StrategyType.RANDOM,
+    StrategyType.OPTIMAL,
+]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("matrix_type", list(MatrixType))
+@pytest.mark.parametrize("player1_type", MEMORY_ONE[:5])
+@pytest.mark.parametrize("player2_type", MEMORY_ONE[:5])
+async def test_deterministic_pairs_are_exact(matrix_type, player1_type, player2_type):
+    """For deterministic strategies the expectation equals the single game outcome"""
+    game = Game(
+        create_strategy(player1_type, is_player1=True),
+        create_strategy(player2_type, is_player1=False),
+        max_rounds=6,
+        payoff_matrix=MATRIX_PAYOFFS[matrix_type]
+    )
+    await game.run_all_rounds()
+
+    result = solve_strategies(player1_type, player2_type, matrix_type, max_rounds=6)
+
+    assert result.expected_scores == pytest.approx((game.player1_total_score, game.player2_total_score))
+
+@pytest.mark.parametrize("player1_type", MEMORY_ONE)
+@pytest.mark.parametrize("player2_type", [StrategyType.RANDOM, StrategyType.OPTIMAL, StrategyType.PAVLOV])
+def test_stochastic_pairs_match_simulation(player1_type, player2_type):
+    """Expected scores should agree with a large batch simulation"""
+    matrix_type = MatrixType.MIXED_30
+    exact = solve_strategies(player1_type, player2_type, matrix_type, max_rounds=10)
+    simulated = run_batch_games(player1_type, player2_type, num_games=200000, num_rounds=10, matrix_type=matrix_type, seed=3)
+
+    assert exact.expected_scores[0] == pytest.approx(simulated.player1_scores.mean(), abs=0.15)
+    assert exact.expected_scores[1] == pytest.approx(simulated.player2_scores.mean(), abs=0.15)
+    assert exact.cooperation_rates[0] == pytest.approx(simulated.player1_cooperation_rate.mean(), abs=0.01)
+
+def test_state_distributions_are_normalized():
+    result = solve_strategies(StrategyType.RANDOM, StrategyType.TIT_FOR_TAT, MatrixType.BASELINE, max_rounds=20)
+    assert result.state_distributions.shape == (20, 4)
+    assert np.allclose(result.state_distributions.sum(axis=1), 1.0)
+    assert len(result.per_round_scores) == 20
+
+def test_ai_strategy_is_not_memory_one():
+    strategy = HaikuStrategy("Test", True, "fake-key")
+    with pytest.raises(ValueError):
+        memory_one_policy(strategy, MATRIX_PAYOFFS[MatrixType.BASELINE])
+
+@pytest.mark.asyncio
+async def test_experiment_runner_analytical_mode():
+    """Runner should solve memory-one pairings instead of simulating them"""
+    storage = Mock(spec=ExperimentStorage)
+    config = ExperimentConfig(
+        matrix_type=MatrixType.BASELINE,
+        num_games=100,
+        num_rounds=10,
+        strategies_to_test=[StrategyType.ALWAYS_DEFECT],
+        player1_strategy=StrategyType.TIT_FOR_TAT,
+        analytical=True
+    )
+    runner = ExperimentRunner(config, storage)
+
+    result = await runner.run_full_experiment()
+
+    assert result.games == []
+    assert len(result.analytical_results) == 1
+    assert result.analytical_results[0].expected_scores == pytest.approx((9, 14))
+    assert result.player1_strategy == "tit_for_tat"
+    assert result.metrics.avg_score == pytest.approx(9)
+    assert result.metrics.total_rounds == 1000
+    assert result.metrics.learning_rate == 0.0
+
+@pytest.mark.asyncio
+async def test_analytical_results_are_weighted_and_survive_reload(tmp_path):
+    """Solved pairings count as num_games games and round-trip through storage"""
+    storage = ExperimentStorage(data_dir=str(tmp_path))
+    config = ExperimentConfig(
+        matrix_type=MatrixType.BASELINE,
+        num_games=4,
+        num_rounds=10,
+        strategies_to_test=[StrategyType.ALWAYS_DEFECT, StrategyType.ALWAYS_COOPERATE],
+        player1_strategy=StrategyType.TIT_FOR_TAT,
+        analytical=True
+    )
+    runner = ExperimentRunner(config, storage)
+    # Solve one pairing and simulate the other
+    runner._can_solve_analytically = lambda opponent: opponent == StrategyType.ALWAYS_DEFECT
+
+    result = await runner.run_full_experiment()
+
+    assert len(result.games) == 4
+    assert [a.opponent_strategy for a in result.analytical_results] == ["always_defect"]
+    # Four simulated games scoring 30 and four solved games expecting 9
+    assert result.metrics.avg_score == pytest.approx(19.5)
+    assert result.metrics.cooperation_rate == pytest.approx((4 * 1.0 + 4 * 0.05) / 8)
+    assert result.metrics.total_rounds == 80
+
+    loaded = storage.get_experiment_results(result.experiment_id)
+
+    assert len(loaded.games) == 4
+    assert loaded.analytical_results == result.analytical_results
+    assert loaded.metrics.cooperation_rate == pytest.approx(result.metrics.cooperation_rate)
+    assert loaded.metrics.avg_score == pytest.approx(19.5)
+    assert loaded.metrics.total_rounds == 80
@@ -0,0 +1,159 @@
+import pytest
+import json
+import time
+import anthropic
+from app.models.types import Move, RoundResult
+from app.strategies.haiku_strategy import HaikuStrategy
+from app.utils.rate_limiter import RateLimitedError
+from app.utils.mock_llm_server import (
+    MockLLMServer, MockServerConfig, load_policy, extract_opponent_moves, tit_for_tat
+)
+
+@pytest.fixture
+def make_server():
+    servers = []
+
+    def _make(**config):
+        server = MockLLMServer(MockServerConfig(**config)).start()
+        servers.append(server)
+        return server
+
+    yield _make
+    for server in servers:
+        server.stop()
+
+def make_strategy(server):
+    strategy = HaikuStrategy("Test Haiku", True, "mock-key")
+    strategy.rate_limiter = None
+    strategy.client = anthropic.AsyncAnthropic(api_key="mock-key", base_url=server.base_url, max_retries=0)
+    return strategy
+
+@pytest.mark.asyncio
+async def test_strategy_plays_against_mock(make_server):
+    server = make_server(policy=load_policy("always_defect"))
+    strategy = make_strategy(server)
+
+    response = await strategy._get_ai_response(0)
+
+    assert response.move == Move.DEFECT
+    assert response.token_usage.prompt_tokens > 0
+    assert server.counters["ok"] == 1
+
+@pytest.mark.asyncio
+async def test_policy_sees_history(make_server):
+    server = make_server(policy=tit_for_tat)
+    strategy = make_strategy(server)
+    strategy.add_round(RoundResult(
+        round_number=1,
+        player1_move=Move.COOPERATE,
+        player2_move=Move.DEFECT,
+        player1_reasoning="",
+        player2_reasoning="",
+        player1_score=0,
+        player2_score=5,
+        cumulative_player1_score=0,
+        cumulative_player2_score=5
+    ))
+
+    response = await strategy._get_ai_response(1)
+    assert response.move == Move.DEFECT
+
+@pytest.mark.asyncio
+async def test_injected_rate_limits(make_server):
+    server = make_server(rate_limit_rate=1.0, retry_after=2.5)
+    strategy = make_strategy(server)
+
+    with pytest.raises(RateLimitedError) as exc_info:
+        await strategy._get_ai_response(0)
+    assert exc_info.value.retry_after == 2.5
+    assert server.counters["rate_limited"] == 1
+
+@pytest.mark.asyncio
+async def test_injected_errors(make_server):
+    server = make_server(error_rate=1.0)
+    strategy = make_strategy(server)
+
+    with pytest.raises(ValueError, match="Anthropic API error"):
+        await strategy._get_ai_response(0)
+
+@pytest.mark.asyncio
+async def test_latency(make_server):
+    server = make_server(latency_ms=100)
+    strategy = make_strategy(server)
+
+    start = time.perf_counter()
+    await strategy._get_ai_response(0)
+    assert time.perf_counter() - start >= 0.1
+
+def test_latency_distributions():
+    import random
+    rng = random.Random(0)
+    config = MockServerConfig(latency_distribution="lognormal", latency_ms=200, latency_spread=0.5)
+    samples = [config.sample_latency(rng) for _ in range(20000)]
+    assert sum(samples) / len(samples) == pytest.approx(0.2, rel=0.05)
+
+def test_load_policy():
+    assert load_policy("p=0.25")([], {}) == 0.25
+    assert load_policy("app.utils.mock_llm_server:always_defect")([], {}) == 0.0
+    with pytest.raises(ValueError):
+        load_policy("unknown")
+
+def test_extract_opponent_moves():
+    request = {"messages": [{"role": "user", "content": [{"type": "text", "text": "- Opponent played: defect\n- Opponent played: cooperate"}]}]}
+    assert extract_opponent_moves(request) == ["defect", "cooperate"]
+
+@pytest.mark.asyncio
+async def test_streamed_move_returns_before_reasoning(make_server):
+    server = make_server(policy=load_policy("always_defect"), stream_chunk_delay_ms=20)
+    strategy = make_strategy(server)
+    strategy.stream = True
+
+    start = time.perf_counter()
+    response = await strategy._get_ai_response(0)
+    decision_time = time.perf_counter() - start
+    await strategy.drain_reasoning()
+    total_time = time.perf_counter() - start
+
+    assert response.move == Move.DEFECT
+    # The move is in the first few deltas; the reasoning takes many more
+    assert decision_time < total_time / 2
+    assert strategy._captures[0].reasoning.startswith("Mock policy")
+    assert json.loads(strategy._transcript[-1]["content"])["move"] == "DEFECT"
+
+@pytest.mark.asyncio
+async def test_streamed_move_without_reasoning_capture(make_server):
+    server = make_server(policy=load_policy("always_cooperate"), stream_chunk_delay_ms=20)
+    strategy = make_strategy(server)
+    strategy.stream = True
+    strategy.capture_reasoning = False
+
+    response = await strategy._get_ai_response(0)
+
+    assert response.move == Move.COOPERATE
+    assert response.token_usage.prompt_tokens > 0
+    assert strategy._captures == {}
+
+@pytest.mark.asyncio
+async def test_structured_output_against_mock(make_server):
+    server = make_server(policy=load_policy("always_defect"))
+    strategy = make_strategy(server)
+    strategy.structured_output = True
+
+    response = await strategy._get_ai_response(0)
+
+    assert response.move == Move.DEFECT
+    assert strategy.parse_failures == 0
+    assert json.loads(strategy._transcript[-1]["content"])["move"] == "DEFECT"
+
+@pytest.mark.asyncio
+async def test_streamed_structured_output_against_mock(make_server):
+    server = make_server(policy=load_policy("always_cooperate"), stream_chunk_delay_ms=5)
+    strategy = make_strategy(server)
+    strategy.stream = True
+    strategy.structured_output = True
+
+    response = await strategy._get_ai_response(0)
+    await strategy.drain_reasoning()
+
+    assert response.move == Move.COOPERATE
+    assert strategy._captures[0].reasoning.startswith("Mock policy")
@@ -0,0 +1,264 @@
+import pytest
+import asyncio
+import time
+from app.models.types import Move, TokenUsage
+from app.strategies.ai_strategy import AIStrategy, AIResponse
+from app.utils.rate_limiter import RateLimiter, RateLimitedError, TokenBucket, parse_retry_after
+from app.utils.llm_scheduler import FairQueue, Priority, WorkClass, current_work_class, work_class
+
+class RateLimitedAIStrategy(AIStrategy):
+    """Mock AI strategy that gets rate limited a fixed number of times"""
+    def __init__(self, rate_limiter, limited_calls=2):
+        super().__init__("Mock AI", True, rate_limiter=rate_limiter, retry_delay=0)
+        self.limited_calls = limited_calls
+        self.calls = 0
+
+    async def _get_ai_response(self, current_round: int) -> AIResponse:
+        self.calls += 1
+        if self.calls <= self.limited_calls:
+            raise RateLimitedError("429", retry_after=0.05)
+        return AIResponse(move=Move.DEFECT, reasoning="Test reasoning", token_usage=TokenUsage(100, 50, 150))
+
+def test_token_bucket_wait_time():
+    bucket = TokenBucket(rate_per_minute=60)  # 1 per second
+    now = time.monotonic()
+    assert bucket.wait_time(60, now) == 0
+    bucket.consume(60)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0, abs=0.05)
+
+def test_parse_retry_after():
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") is None
+
+@pytest.mark.asyncio
+async def test_concurrency_window_bounds_in_flight():
+    limiter = RateLimiter(initial_concurrency=2, max_concurrency=2)
+    running = 0
+    max_running = 0
+
+    async def call():
+        nonlocal running, max_running
+        async with limiter.slot():
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(call() for _ in range(8)))
+    assert max_running == 2
+    assert limiter.stats()["total_requests"] == 8
+
+@pytest.mark.asyncio
+async def test_queued_waiters_sleep_until_woken():
+    """Waiters behind the head don't poll; each checks for a slot only a few times"""
+    limiter = RateLimiter(initial_concurrency=1, max_concurrency=1)
+    attempts = 0
+    try_acquire = limiter._try_acquire
+
+    def counting_try_acquire(*args):
+        nonlocal attempts
+        attempts += 1
+        return try_acquire(*args)
+
+    limiter._try_acquire = counting_try_acquire
+
+    async def call():
+        async with limiter.slot():
+            await asyncio.sleep(0.005)
+
+    await asyncio.gather(*(call() for _ in range(40)))
+    assert limiter.stats()["total_requests"] == 40
+    assert attempts <= 3 * 40
+    assert limiter.stats()["total_wait_time"] > 0
+
+@pytest.mark.asyncio
+async def test_waiter_on_another_loop_is_woken():
+    limiter = RateLimiter(initial_concurrency=1, max_concurrency=1)
+    await limiter.acquire()
+
+    other = asyncio.create_task(asyncio.to_thread(asyncio.run, limiter.acquire()))
+    await asyncio.sleep(0.05)
+    assert limiter.stats()["batch_waiting"] == 1
+    limiter.release()
+
+    await asyncio.wait_for(other, 1.0)
+    assert limiter.stats()["in_flight"] == 1
+
+@pytest.mark.asyncio
+async def test_request_budget_throttles():
+    limiter = RateLimiter(requests_per_minute=600, initial_concurrency=10)  # 10/s, burst of 600
+    limiter.request_bucket.tokens = 0
+
+    start = time.monotonic()
+    await limiter.acquire()
+    limiter.release()
+    assert time.monotonic() - start >= 0.09
+
+def test_aimd_window():
+    limiter = RateLimiter(initial_concurrency=4, min_concurrency=1, max_concurrency=8)
+    for _ in range(4):
+        limiter.release(success=True)
+    assert limiter.concurrency_limit == pytest.approx(4.9, abs=0.1)
+
+    limiter.record_rate_limited(retry_after=0.01)
+    assert limiter.concurrency_limit == pytest.approx(2.45, abs=0.1)
+    # A second 429 from the same burst does not halve again
+    limiter.record_rate_limited(retry_after=0.01)
+    assert limiter.concurrency_limit == pytest.approx(2.45, abs=0.1)
+    assert limiter.stats()["total_rate_limited"] == 2
+
+@pytest.mark.asyncio
+async def test_ai_strategy_waits_out_rate_limits():
+    """429s should be retried after retry-after instead of falling back"""
+    limiter = RateLimiter()
+    strategy = RateLimitedAIStrategy(limiter, limited_calls=2)
+
+    start = time.monotonic()
+    move = await strategy.get_move(0)
+
+    assert move == Move.DEFECT
+    assert strategy.last_error is None
+    assert strategy.calls == 3
+    assert time.monotonic() - start >= 0.1
+    assert limiter.stats()["in_flight"] == 0
+
+@pytest.mark.asyncio
+async def test_ai_strategy_gives_up_after_rate_limit_retries():
+    limiter = RateLimiter()
+    strategy = RateLimitedAIStrategy(limiter, limited_calls=100)
+    strategy.max_rate_limit_retries = 2
+
+    move = await strategy.get_move(0)
+
+    assert move == Move.COOPERATE
+    assert "429" in strategy.last_error
+
+def test_fair_queue_serves_interactive_first():
+    queue = FairQueue()
+    batch = queue.enqueue(WorkClass(Priority.BATCH, "sweep"), 200, now=0.0)
+    interactive = queue.enqueue(WorkClass(Priority.INTERACTIVE), 200, now=1.0)
+    assert queue.head() is interactive
+
+    queue.grant(interactive, now=1.5)
+    assert queue.head() is batch
+    stats = queue.stats()
+    assert stats["interactive_granted"] == 1
+    assert stats["interactive_mean_wait"] == pytest.approx(0.5)
+    assert stats["batch_waiting"] == 1
+
+def test_fair_queue_shares_batch_capacity_by_weight():
+    queue = FairQueue()
+    for _ in range(30):
+        queue.enqueue(WorkClass(Priority.BATCH, "heavy", weight=2.0), 200, now=0.0)
+        queue.enqueue(WorkClass(Priority.BATCH, "light", weight=1.0), 200, now=0.0)
+
+    served = []
+    for _ in range(30):
+        ticket = queue.head()
+        served.append(ticket.work.flow)
+        queue.grant(ticket, now=0.0)
+
+    assert served.count("heavy") == 20
+    assert served.count("light") == 10
+    assert set(queue.flow_stats()) == {"heavy", "light"}
+
+def test_fair_queue_new_flow_is_not_starved():
+    queue = FairQueue()
+    for _ in range(10):
+        queue.enqueue(WorkClass(Priority.BATCH, "long_sweep"), 200, now=0.0)
+    for _ in range(5):
+        queue.grant(queue.head(), now=0.0)
+
+    newcomer = queue.enqueue(WorkClass(Priority.BATCH, "new_sweep"), 200, now=0.0)
+    # Alternates with the long sweep instead of waiting behind its 5 queued requests
+    queue.grant(queue.head(), now=0.0)
+    assert queue.head() is newcomer
+
+def test_failed_try_acquire_leaves_no_fair_queue_charge():
+    limiter = RateLimiter(initial_concurrency=1, max_concurrency=1)
+    sweep = WorkClass(Priority.BATCH, "sweep")
+    assert limiter.try_acquire(200, work=sweep)
+
+    # The window is full, so these probes fail and must not advance the sweep's tags
+    for _ in range(5):
+        assert not limiter.try_acquire(200, work=sweep)
+
+    assert limiter.queue.waiting() == 0
+    queued = limiter.queue.enqueue(sweep, 200, now=0.0)
+    other = limiter.queue.enqueue(WorkClass(Priority.BATCH, "other"), 200, now=0.0)
+    assert queued.finish == other.finish
+    assert limiter.stats()["total_requests"] == 1
+
+@pytest.mark.asyncio
+async def test_work_class_is_inherited_by_tasks():
+    async def read():
+        return current_work_class()
+
+    with work_class(Priority.INTERACTIVE):
+        inherited = await asyncio.create_task(read())
+    assert inherited.priority == Priority.INTERACTIVE
+    assert current_work_class().priority == Priority.BATCH
+
+@pytest.mark.asyncio
+async def test_interactive_requests_jump_the_batch_queue():
+    limiter = RateLimiter(initial_concurrency=1, max_concurrency=1)
+    order = []
+
+    async def call(name, work):
+        async with limiter.slot(work=work):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    batch = [asyncio.create_task(call(f"batch{i}", WorkClass(Priority.BATCH))) for i in range(4)]
+    await asyncio.sleep(0.005)
+    await call("interactive", WorkClass(Priority.INTERACTIVE))
+    await asyncio.gather(*batch)
+
+    assert order.index("interactive") <= 1
+    assert limiter.stats()["interactive_granted"] == 1
+
+@pytest.mark.asyncio
+async def test_interactive_request_is_woken_ahead_of_sleeping_batch_waiters():
+    """Batch waiters behind the head stay asleep while an interactive request takes the next slot"""
+    limiter = RateLimiter(initial_concurrency=1, max_concurrency=1)
+    await limiter.acquire(work=WorkClass(Priority.BATCH))
+    batch = [asyncio.create_task(limiter.acquire(work=WorkClass(Priority.BATCH, f"sweep{i % 3}"))) for i in range(30)]
+    await asyncio.sleep(0.01)
+
+    attempts = 0
+    try_acquire = limiter._try_acquire
+
+    def counting_try_acquire(*args):
+        nonlocal attempts
+        attempts += 1
+        return try_acquire(*args)
+
+    limiter._try_acquire = counting_try_acquire
+    interactive = asyncio.create_task(limiter.acquire(work=WorkClass(Priority.INTERACTIVE)))
+    await asyncio.sleep(0.05)
+    assert not interactive.done()
+    limiter.release()
+
+    await asyncio.wait_for(interactive, 0.5)
+    assert not any(task.done() for task in batch)
+    assert attempts <= 3  # Its own first try, the wakeup after the release, and at most one batch head check
+    for task in batch:
+        task.cancel()
+    await asyncio.gather(*batch, return_exceptions=True)
+    assert limiter.stats()["batch_waiting"] == 0
+
+@pytest.mark.asyncio
+async def test_interactive_reserve_holds_back_batch():
+    limiter = RateLimiter(initial_concurrency=2, max_concurrency=2, interactive_reserve=1)
+    await limiter.acquire(work=WorkClass(Priority.BATCH))
+
+    waiting = asyncio.create_task(limiter.acquire(work=WorkClass(Priority.BATCH)))
+    await asyncio.sleep(0.02)
+    assert not waiting.done()
+
+    await asyncio.wait_for(limiter.acquire(work=WorkClass(Priority.INTERACTIVE)), 0.1)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert limiter.stats()["batch_waiting"] == 0
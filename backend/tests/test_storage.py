@@ -1,6 +1,8 @@
 # tests/test_storage.py
 import pytest
-from app.utils.storage import GameStorage
+import asyncio
+import time
+from app.utils.storage import GameBusyError, GameStorage
 from app.utils.history import GameHistory
 from app.models.game import Game
 from app.strategies.always_cooperate import AlwaysCooperate
@@ -53,4 +55,78 @@ async def test_game_history_save_and_retrieve(history):
     saved_game = history.get_game(game_id)
     assert saved_game is not None
     assert saved_game["game_id"] == game_id
-    assert len(saved_game["rounds"]) == 1
\ No newline at end of file
+    assert len(saved_game["rounds"]) == 1
+def new_game(storage):
+    return storage.create_game(AlwaysCooperate(is_player1=True), AlwaysCooperate(is_player1=False))
+
+def test_capacity_evicts_least_recently_used():
+    evicted = []
+    storage = GameStorage(max_games=2, on_evict=lambda game_id, game, reason: evicted.append((game_id, reason)))
+    first, _ = new_game(storage)
+    second, _ = new_game(storage)
+    storage.get_game(first)  # first is now the most recently used
+    third, _ = new_game(storage)
+
+    assert evicted == [(second, "capacity")]
+    assert storage.get_game(second) is None
+    assert storage.get_game(first) is not None and storage.get_game(third) is not None
+    assert storage.stats()["evicted_capacity"] == 1
+
+def test_idle_games_expire():
+    evicted = []
+    storage = GameStorage(idle_ttl=0.05, on_evict=lambda game_id, game, reason: evicted.append(reason))
+    idle, _ = new_game(storage)
+    busy, _ = new_game(storage)
+
+    with storage.in_use(busy):
+        time.sleep(0.06)
+        assert storage.evict_expired() == 1
+    assert evicted == ["idle"]
+    assert storage.get_game(idle) is None
+    # Work just finished on the pinned game, so it counts as fresh
+    assert storage.get_game(busy) is not None
+
+def test_storage_gauges_track_resident_games():
+    storage = GameStorage()
+    game_id, game = new_game(storage)
+    before = storage.stats()
+
+    asyncio.run(game.run_all_rounds())
+    after = storage.stats()
+
+    assert before["resident_games"] == after["resident_games"] == 1
+    assert after["resident_bytes"] > before["resident_bytes"]
+    storage.remove_game(game_id)
+    assert storage.stats() == {**after, "resident_games": 0, "resident_bytes": 0}
+
+@pytest.mark.asyncio
+async def test_evicted_games_are_marked_in_history(history):
+    game = Game(AlwaysCooperate(is_player1=True), AlwaysCooperate(is_player1=False), max_rounds=5)
+    await game.process_round()
+    history.save_game("abandoned", game, evicted=True)
+
+    saved = history.get_game("abandoned")
+    assert saved["evicted"] is True
+    assert len(saved["rounds"]) == 1 and saved["max_rounds"] == 5
+
+def test_in_use_returns_the_game_or_none():
+    storage = GameStorage()
+    game_id, game = new_game(storage)
+
+    with storage.in_use(game_id) as held:
+        assert held is game
+        assert storage.stats()["in_use"] == 1
+    with storage.in_use("missing") as held:
+        assert held is None
+        assert storage.stats()["in_use"] == 0
+
+def test_in_use_is_exclusive():
+    storage = GameStorage()
+    game_id, _ = new_game(storage)
+
+    with storage.in_use(game_id):
+        with pytest.raises(GameBusyError):
+            with storage.in_use(game_id):
+                pass
+    with storage.in_use(game_id) as held:
+        assert held is not None
@@ -4,6 +4,8 @@ from app.strategies.tit_for_tat import TitForTat
 from app.strategies.pavlov import Pavlov
 from app.strategies.random_strategy import RandomStrategy
 from app.strategies.grim import GrimTrigger
+from app.strategies import StrategyType
+from app.strategies.pool import StrategyPool
 
 def create_round_result(round_num: int, p1_move: Move, p2_move: Move) -> RoundResult:
     """Helper to create round results with proper scoring"""
@@ -148,4 +150,31 @@ class TestGrimTrigger:
         strategy.add_round(create_round_result(1, Move.DEFECT, Move.COOPERATE))
         assert strategy.get_move(1) == Move.DEFECT
         strategy.add_round(create_round_result(2, Move.COOPERATE, Move.DEFECT))
-        assert strategy.get_move(2) == Move.DEFECT
\ No newline at end of file
+        assert strategy.get_move(2) == Move.DEFECT
+
+
+class TestStrategyPool:
+    def test_reuses_released_strategies(self):
+        pool = StrategyPool()
+        strategy = pool.acquire(StrategyType.GRIM, is_player1=True)
+        strategy.add_round(create_round_result(1, Move.COOPERATE, Move.DEFECT))
+        assert strategy.get_move(1) == Move.DEFECT
+
+        pool.release(strategy)
+        assert pool.size() == 1
+
+        reused = pool.acquire(StrategyType.GRIM, is_player1=True)
+        assert reused is strategy
+        assert reused.history == []
+        assert reused.get_move(0) == Move.COOPERATE
+
+    def test_keys_by_side(self):
+        pool = StrategyPool()
+        strategy = pool.acquire(StrategyType.TIT_FOR_TAT, is_player1=True)
+        pool.release(strategy)
+        assert pool.acquire(StrategyType.TIT_FOR_TAT, is_player1=False) is not strategy
+
+    def test_ignores_unknown_strategies(self):
+        pool = StrategyPool()
+        pool.release(GrimTrigger(is_player1=True))
+        assert pool.size() == 0
@@ -0,0 +1,61 @@
+# tests/test_telemetry.py
+import pytest
+from app.models.types import Move, RoundResult, TokenUsage
+from app.utils.telemetry import estimate_cost, model_pricing, percentile, round_usages, summarize_usage
+
+def make_round(number, p1_usage=None, p2_usage=None):
+    return RoundResult(
+        number, Move.COOPERATE, Move.COOPERATE, "", "", 3, 3, 3 * number, 3 * number,
+        player1_token_usage=p1_usage, player2_token_usage=p2_usage
+    )
+
+def test_model_pricing_matches_dated_names():
+    assert model_pricing("claude-3-5-haiku-20241022") == model_pricing("claude-3-5-haiku-latest")
+    assert model_pricing("claude-3-haiku-20240307") != model_pricing("claude-3-5-haiku-20241022")
+    assert model_pricing("unknown-model") is None
+    assert model_pricing(None) is None
+
+def test_estimate_cost_discounts_cache_reads():
+    uncached = estimate_cost(TokenUsage(1_000_000, 0, 1_000_000), "claude-3-5-haiku-latest")
+    cached = estimate_cost(
+        TokenUsage(1_000_000, 0, 1_000_000, cache_read_tokens=1_000_000), "claude-3-5-haiku-latest"
+    )
+    assert uncached == pytest.approx(0.80)
+    assert cached == pytest.approx(0.08)
+    assert estimate_cost(TokenUsage(100, 10, 110), "unknown-model") is None
+
+def test_round_usages_skip_non_ai_players():
+    rounds = [make_round(1, p1_usage=TokenUsage(100, 10, 110)), make_round(2, p1_usage=TokenUsage(120, 10, 130))]
+    usages = round_usages(rounds, "claude-3-5-haiku-latest", None)
+
+    assert [usage.total_tokens for usage, _ in usages] == [110, 130]
+    assert all(model == "claude-3-5-haiku-latest" for _, model in usages)
+
+def test_summarize_usage():
+    usages = [
+        (TokenUsage(100, 10, 110, latency_seconds=0.1 * i, retries=i % 2), "claude-3-5-haiku-latest")
+        for i in range(1, 21)
+    ]
+    usages.append((TokenUsage(100, 10, 110, latency_seconds=1.0), "unknown-model"))
+    summary = summarize_usage(usages, rounds=21, wall_seconds=10.0)
+
+    assert summary.requests == 21
+    assert summary.total_tokens == 21 * 110
+    assert summary.retries == 10
+    assert summary.p95_latency_seconds == pytest.approx(1.9)
+    assert summary.unpriced_requests == 1
+    assert summary.estimated_cost_usd == pytest.approx(20 * (100 * 0.80 + 10 * 4.00) / 1_000_000)
+    assert summary.tokens_per_round == pytest.approx(110)
+    assert summary.to_dict()["rounds_per_second"] == pytest.approx(2.1)
+
+def test_summarize_no_usage():
+    summary = summarize_usage([], rounds=5, wall_seconds=0.0)
+    assert summary.requests == 0
+    assert summary.mean_latency_seconds == 0.0
+    assert summary.rounds_per_second == 0.0
+
+def test_nearest_rank_percentile():
+    assert percentile([], 0.95) is None
+    assert percentile([], 0.95, default=0.0) == 0.0
+    assert percentile([3.0, 1.0, 2.0], 0.5) == 2.0
+    assert percentile(range(1, 101), 0.95) == 95
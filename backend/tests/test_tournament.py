@@ -0,0 +1,39 @@
+import pytest
+from app.models.types import MatrixType
+from app.strategies import StrategyType
+from app.utils.tournament import Tournament
+from app.utils.markov_solver import solve_strategies
+
+@pytest.fixture(scope="module")
+def result():
+    tournament = Tournament(
+        matrix_types=[MatrixType.BASELINE, MatrixType.STAG_HUNT],
+        num_games=200,
+        num_rounds=10,
+        max_workers=2,
+        seed=0
+    )
+    return tournament.run()
+
+def test_payoff_matrix_shape(result):
+    n = len(result.strategies)
+    assert result.payoffs.shape == (2, n, n)
+    assert StrategyType.CLAUDE_HAIKU not in result.strategies
+
+def test_deterministic_cells_are_exact(result):
+    """Cells for deterministic pairings should equal the exact expectation"""
+    i = result.strategies.index(StrategyType.TIT_FOR_TAT)
+    j = result.strategies.index(StrategyType.ALWAYS_DEFECT)
+    expected = solve_strategies(StrategyType.TIT_FOR_TAT, StrategyType.ALWAYS_DEFECT, MatrixType.BASELINE, max_rounds=10)
+    assert result.payoffs[0, i, j] == pytest.approx(expected.expected_scores[0] / 10)
+
+def test_leaderboard_is_ranked(result):
+    leaderboard = result.leaderboard(MatrixType.BASELINE)
+    assert [e.rank for e in leaderboard] == list(range(1, len(result.strategies) + 1))
+    scores = [e.avg_score_per_round for e in leaderboard]
+    assert scores == sorted(scores, reverse=True)
+    assert len(result.leaderboard()) == len(result.strategies)
+
+def test_rejects_strategies_without_kernels():
+    with pytest.raises(ValueError):
+        Tournament(strategies=[StrategyType.CLAUDE_HAIKU])
@@ -1,11 +1,15 @@
 // src/components/GameBoard.jsx
-import React, { useState } from 'react';
-import { completeGame, makeMove } from '../utils/api';
+import React, { useEffect, useRef, useState } from 'react';
+import { makeMove, streamCompleteGame } from '../utils/api';
 import './GameBoard.css';
 
 function GameBoard({ gameId, gameState, onGameComplete, onNewGame }) {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
+  // Aborts a streaming auto-complete, e.g. when the board is closed mid-game
+  const streamController = useRef(null);
+
+  useEffect(() => () => streamController.current?.abort(), []);
 
   const scores = gameState?.is_game_over ?
     (gameState?.final_scores || gameState?.scores) :
@@ -29,14 +33,22 @@ function GameBoard({ gameId, gameState, onGameComplete, onNewGame }) {
   };
 
   const handleAutoComplete = async () => {
+    const controller = new AbortController();
+    streamController.current = controller;
     try {
       setLoading(true);
       setError(null);
-      const result = await completeGame(gameId);
-      onGameComplete(result);
+      // Rounds are added to the board as they are played
+      await streamCompleteGame(gameId, {
+        onRound: onGameComplete,
+        signal: controller.signal
+      });
     } catch (err) {
-      setError(err.message || 'Failed to complete game');
+      if (err.name !== 'AbortError') {
+        setError(err.message || 'Failed to complete game');
+      }
     } finally {
+      streamController.current = null;
       setLoading(false);
     }
   };
@@ -2,7 +2,7 @@
 import { render, screen, fireEvent, waitFor } from '@testing-library/react';
 import '@testing-library/jest-dom';
 import GameBoard from './GameBoard';
-import { completeGame } from '../utils/api';
+import { streamCompleteGame } from '../utils/api';
 
 jest.mock('../utils/api');
 
@@ -53,23 +53,20 @@ describe('GameBoard', () => {
 
   test('handles auto-complete click', async () => {
     const mockComplete = jest.fn();
-    const completedGameState = {
-      rounds: [
-        {
-          round_number: 1,
-          player1_move: 'cooperate',
-          player2_move: 'cooperate',
-          player1_score: 3,
-          player2_score: 3
-        }
-      ],
-      final_scores: {
-        player1: 3,
-        player2: 3
-      }
+    const streamedRound = {
+      round_number: 1,
+      player1_move: 'cooperate',
+      player2_move: 'cooperate',
+      player1_score: 3,
+      player2_score: 3,
+      scores: { player1: 3, player2: 3 },
+      game_over: true
     };
 
-    completeGame.mockResolvedValue(completedGameState);
+    streamCompleteGame.mockImplementation(async (gameId, { onRound }) => {
+      onRound(streamedRound);
+      return { final_scores: { player1: 3, player2: 3 } };
+    });
 
     render(
       <GameBoard 
@@ -82,13 +79,13 @@ describe('GameBoard', () => {
     fireEvent.click(screen.getByText('Auto-Complete Game'));
 
     await waitFor(() => {
-      expect(completeGame).toHaveBeenCalledWith('test-123');
-      expect(mockComplete).toHaveBeenCalledWith(completedGameState);
+      expect(streamCompleteGame).toHaveBeenCalledWith('test-123', expect.any(Object));
+      expect(mockComplete).toHaveBeenCalledWith(streamedRound);
     });
   });
 
   test('displays error message on completion failure', async () => {
-    completeGame.mockRejectedValue(new Error('Failed to complete game'));
+    streamCompleteGame.mockRejectedValue(new Error('Failed to complete game'));
 
     render(
       <GameBoard 
@@ -55,6 +55,54 @@ export const completeGame = async (gameId) => {
   }
 };
 
+// Plays the rest of the game, calling onRound with each round (same shape as
+// makeMove's result) as soon as the server scores it. Resolves with the final
+// scores; aborting `signal` closes the stream, which stops the game server-side.
+export const streamCompleteGame = async (gameId, { onRound, signal } = {}) => {
+  console.log(`Streaming completion of game ${gameId}`);
+  const response = await fetch(`${BASE_URL}/game/${gameId}/complete/stream`, {
+    method: 'POST',
+    headers: { Accept: 'text/event-stream' },
+    signal
+  });
+  if (!response.ok) {
+    const body = await response.json().catch(() => ({}));
+    throw new Error(body.error || 'Failed to complete game');
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // Events are separated by a blank line; keep any partial event for the next chunk
+    const blocks = buffer.split('\n\n');
+    buffer = blocks.pop();
+    for (const block of blocks) {
+      const event = parseEvent(block);
+      if (!event) continue;
+      if (event.type === 'round') onRound?.(event.data);
+      if (event.type === 'complete') return event.data;
+      if (event.type === 'error') throw new Error(event.data.error);
+    }
+  }
+  throw new Error('Game stream ended unexpectedly');
+};
+
+const parseEvent = (block) => {
+  let type = 'message';
+  const data = [];
+  for (const line of block.split('\n')) {
+    if (line.startsWith(':')) continue;  // Heartbeat comment
+    if (line.startsWith('event: ')) type = line.slice(7);
+    if (line.startsWith('data: ')) data.push(line.slice(6));
+  }
+  return data.length ? { type, data: JSON.parse(data.join('\n')) } : null;
+};
+
 export const getGameHistory = async (gameId) => {
   const response = await api.get(`/game/${gameId}/history`);
   return response.data;